@@ -1,6 +1,8 @@
 """The CYLTek integration."""
 import asyncio
 import logging
+import time
+from functools import partial
 from pprint import pformat
 
 from homeassistant.config_entries import ConfigEntry
@@ -9,9 +11,11 @@ from homeassistant.core import HomeAssistant
 from homeassistant.helpers import device_registry as dr
 from homeassistant.helpers import entity_registry as er
 
-from .const import CONF_ENTITY_TYPE, CONF_INTERNET, DOMAIN, PLATFORMS
+from .const import (CONF_ENTITY_TYPE, CONF_INTERNET, DATA_COORDINATORS, DOMAIN,
+                    PLATFORMS)
 from .cyltek import globalvar as gl
 from .cyltek.cylcontroller_ex import CYLControllerEx
+from .store import async_get_store
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -48,6 +52,10 @@ async def async_setup_entry(
     # Forward the setup to the sensor platform.
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
+    ## the things were built from a cache which the background revalidation found outdated
+    if async_get_store(hass).async_take_reload(entry.data[CONF_MAC]):
+        _LOGGER.info(f'{entry.title}: the gateway changed since cached, reloading')
+        hass.async_create_task(hass.config_entries.async_reload(entry.entry_id))
 
     return True
 
@@ -59,6 +67,9 @@ async def async_unload_entry(
     if unload_ok := await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
         # Remove config entry from domain.
         data = hass.data[DOMAIN].pop(entry.entry_id)
+        ## a reload builds a new coordinator, the one of the unloaded entities is stale
+        if coordinator := hass.data.get(DATA_COORDINATORS, {}).pop(entry.data[CONF_MAC], None):
+            await coordinator.async_shutdown()
         if not hass.config_entries.async_entries(DOMAIN):
             hass.data.pop(DOMAIN)
 
@@ -85,12 +96,38 @@ async def async_remove_entry(hass: HomeAssistant, config_entry: ConfigEntry) ->
     # If a component needs to clean up code when an entry is removed, it can define a removal method:
     controllers_map = gl.get_controllers_map()
     mac = config_entry.data[CONF_MAC]
+    hass.data.get(DATA_COORDINATORS, {}).pop(mac, None)
+    store = async_get_store(hass)
+    await store.async_load()
+    store.async_remove(mac)
     if controllers_map.get(mac):
-        controllers_map.pop(mac)
+        ## close() waits for the background probe to end
+        await hass.async_add_executor_job(controllers_map.pop(mac).close)
 
 
 async def async_setup(hass: HomeAssistant, config: dict) -> bool:
     """initial data from configuration yaml."""
     # print(pformat(config))
     hass.data.setdefault(DOMAIN, {})
+    await async_bootstrap_controllers(hass)
     return True
+
+
+async def async_bootstrap_controllers(hass: HomeAssistant) -> None:
+    """Bootstrap the gateways of all config entries in parallel, before their platforms set up.
+
+    A gateway cached by an earlier run starts from the cache and is revalidated in the background.
+    """
+    entries = hass.config_entries.async_entries(DOMAIN)
+    if not entries:
+        return
+
+    start_time = time.monotonic()
+    store = async_get_store(hass)
+    await asyncio.gather(*(gl.async_get_controller(entry.data[CONF_MAC],
+                                                   partial(store.async_create_controller,
+                                                           entry.data[CONF_MAC],
+                                                           internet=entry.data.get(CONF_INTERNET, 'eth0')))
+                           for entry in entries),
+                         return_exceptions=True)
+    _LOGGER.debug(f'{len(entries)} gateways bootstrapped in {time.monotonic() - start_time:.3f}s')
@@ -2,7 +2,7 @@
 from __future__ import annotations
 
 import logging
-from datetime import timedelta
+from functools import partial
 from pprint import pformat
 
 import homeassistant.helpers.config_validation as cv
@@ -21,7 +21,7 @@ from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import (ATTR_TEMPERATURE, CONF_DEVICES, CONF_MAC,
                                  CONF_NAME, PRECISION_WHOLE, TEMP_CELSIUS,
                                  TEMP_FAHRENHEIT, Platform)
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.typing import ConfigType, DiscoveryInfoType
 
@@ -29,6 +29,7 @@ from . import util
 from .const import (CONF_AC_ID, CONF_CHANNELS, CONF_CONFIG_JSON,
                     CONF_ENTITY_TYPE, CONF_INTERNET, CONF_MODEL, DEFAULT_NAMES,
                     DOMAIN)
+from .coordinator import CYLGatewayCoordinator, async_get_coordinator
 from .cyltek import cylclimate
 from .cyltek.cylclimate import CYLClimate
 from .entity import CYLDeviceEntity
@@ -39,7 +40,6 @@ DEFAULT_NAME = DEFAULT_NAMES["climate"]
 DEFAULT_MODEL = "Standard"
 CONF_TYPE = 'type'
 
-SCAN_INTERVAL = timedelta(seconds=10)
 
 DEVICE_SCHEMA = vol.Schema(
     {
@@ -69,14 +69,15 @@ async def async_setup_platform(
 
     for dinfo in config[CONF_DEVICES]:
 
-        ac = cylclimate.create_cylclimate(config[CONF_MAC],
-                                    dinfo[CONF_AC_ID],
-                                    dinfo[CONF_CONFIG_JSON],
-                                    {'default': 1},
-                                    internet=config[CONF_INTERNET],
-                                    auto_on=False,
-                                    model=dinfo[CONF_MODEL])
-        async_add_entities([CYLTekClimate(ac, dinfo[CONF_NAME])], True)
+        ac = await cylclimate.async_create_cylclimate(config[CONF_MAC],
+                                                dinfo[CONF_AC_ID],
+                                                dinfo[CONF_CONFIG_JSON],
+                                                {'default': 1},
+                                                internet=config[CONF_INTERNET],
+                                                auto_on=False,
+                                                model=dinfo[CONF_MODEL])
+        coordinator = async_get_coordinator(hass, ac.cyl_controller)
+        async_add_entities([CYLTekClimate(coordinator, ac, dinfo[CONF_NAME])])
     return True
 
 async def async_setup_entry(
@@ -93,21 +94,22 @@ async def async_setup_entry(
 
     for dinfo in config[CONF_DEVICES]:
         if dinfo[CONF_ENTITY_TYPE] == Platform.CLIMATE:
-            ac = cylclimate.create_cylclimate(config[CONF_MAC],
-                                        dinfo[CONF_AC_ID],
-                                        dinfo[CONF_CONFIG_JSON],
-                                        dinfo[CONF_CHANNELS],
-                                        internet=config[CONF_INTERNET],
-                                        auto_on=False,
-                                        model=dinfo[CONF_MODEL])
-            async_add_entities([CYLTekClimate(ac, dinfo[CONF_NAME])], True)
+            ac = await cylclimate.async_create_cylclimate(config[CONF_MAC],
+                                                    dinfo[CONF_AC_ID],
+                                                    dinfo[CONF_CONFIG_JSON],
+                                                    dinfo[CONF_CHANNELS],
+                                                    internet=config[CONF_INTERNET],
+                                                    auto_on=False,
+                                                    model=dinfo[CONF_MODEL])
+            coordinator = async_get_coordinator(hass, ac.cyl_controller)
+            async_add_entities([CYLTekClimate(coordinator, ac, dinfo[CONF_NAME])])
 
 class CYLTekClimate(CYLDeviceEntity, ClimateEntity):
 
-    def __init__(self, climate, name: str="CYLTekHumi"):
+    def __init__(self, coordinator: CYLGatewayCoordinator, climate: CYLClimate, name: str="CYLTekHumi"):
         """Initialize the humidifier."""
+        super().__init__(coordinator, climate)
         self._climate = climate
-        self._available = True
         self._need_update = True
     
         self._current_humidity = None
@@ -145,24 +147,13 @@ class CYLTekClimate(CYLDeviceEntity, ClimateEntity):
         # ):
         #     self._attr_supported_features |= ClimateEntityFeature.PRESET_MODE
 
-    @property
-    def available(self) -> bool:
-        return self._available
-
-    async def async_update(self):
+    # @override(CYLDeviceEntity)
+    def _update_from_thing(self):
 
         if self._need_update is False:
             self._need_update = True
             return
 
-        self._available = await self._async_try_command(
-                f'{self.name}, {self.unique_id} climate is unavalible !',
-                self._climate.is_available
-            )
-            
-        if self._available is False:
-            return
-
         if self._pw_state != self._climate.get_last_attribute('power'):
             self._pw_state = self._climate.get_last_attribute('power')
         self._is_on = self._climate.get_last_attribute('power') != 'OFF'
@@ -289,44 +280,59 @@ class CYLTekClimate(CYLDeviceEntity, ClimateEntity):
         """Return if the dehumidifier is on."""
         return self._is_on
   
+    @callback
+    def _async_queue_changes(self, msg_failed, changes: dict):
+        """Queue the changes on the climate, the ones of a scene go out in one write."""
+        future = self._climate.async_schedule_apply(changes)
+        future.add_done_callback(partial(self._async_changes_done, msg_failed))
+        self._need_update = False
+        self.async_write_ha_state()
+
+    @callback
+    def _async_changes_done(self, msg_failed, future):
+        if future.cancelled():
+            return
+        if (exc := future.exception()) is None and future.result() is not False:
+            return
+        _LOGGER.warning(f'{msg_failed} {exc or ""}')
+        ## drop the optimistic state
+        self.hass.async_create_task(self.coordinator.async_request_refresh())
+
+    def _hvac_changes(self, hvac_mode) -> dict:
+        if hvac_mode == HVACMode.OFF:
+            self._is_on = False
+            self._hvac_mode = HVACMode.OFF
+            return {'power': 'OFF'}
+
+        self._is_on = True
+        self._hvac_mode = hvac_mode
+        return {'power': 'ON', 'mode': hvac_mode}
+
     async def async_set_temperature(self, **kwargs):
         """Set new target temperatures."""
         if self._available is False:
             return
 
-        # hvac_mode = kwargs.get(ATTR_HVAC_MODE)  
         temperature = kwargs.get(ATTR_TEMPERATURE)
-
-        # if hvac_mode:
-        #     await self.async_set_hvac_mode(hvac_mode)
-        
-        if await self._async_try_command(
-            f'{self.name}, {self.unique_id} set_temperature failed.',
-            self._climate.set_target_temperature,
-            temperature
-        ):
+        changes = {}
+        if (hvac_mode := kwargs.get(ATTR_HVAC_MODE)):
+            changes.update(self._hvac_changes(hvac_mode))
+        if temperature is not None:
+            changes['target_temperature'] = temperature
             self._target_temperature = temperature
-            self._need_update = False
+
+        if changes:
+            self._async_queue_changes(f'{self.name}, {self.unique_id} set_temperature failed.', changes)
 
     async def async_set_hvac_mode(self, hvac_mode):
         """Set new target hvac mode."""
-        print(hvac_mode)
         if self._available is False:
             return
 
-        if hvac_mode == HVACMode.OFF:
-            await self.async_turn_off()
-            return
-        else:
-            await self.async_turn_on()
-            # if hvac_mode != self._hvac_mode:
-            if await self._async_try_command(
-                f'{self.name}, {self.unique_id} the climate setting mode failed.',
-                self._climate.set_mode,
-                hvac_mode
-            ):
-                self._hvac_mode = hvac_mode
-                self._need_update = False
+        self._async_queue_changes(
+            f'{self.name}, {self.unique_id} the climate setting mode failed.',
+            self._hvac_changes(hvac_mode)
+        )
 
     # async def async_set_preset_mode(self, preset_mode):
     #     """Set target humidity."""
@@ -352,41 +358,25 @@ class CYLTekClimate(CYLDeviceEntity, ClimateEntity):
         if self._available is False:
             return
 
-        # if self._is_on is False:
-        if await self._async_try_command(
-            f'{self.name}, {self.unique_id} Turning the climate on failed.',
-            self._climate.turn_on
-        ):
-            self._is_on = True
-            if self._climate.mode in HVAC_MODES:
-                self._hvac_mode = self._climate.mode
-            self._need_update = False
-  
+        self._is_on = True
+        if self._climate.mode in HVAC_MODES:
+            self._hvac_mode = self._climate.mode
+        self._async_queue_changes(f'{self.name}, {self.unique_id} Turning the climate on failed.', {'power': 'ON'})
+
     async def async_turn_off(self, **kwargs):
         """Turn the device OFF."""
         if self._available is False:
             return
-            
-        # if self._is_on is True:
-        if await self._async_try_command(
-            f'{self.name}, {self.unique_id} Turning the climate off failed.',
-            self._climate.turn_off
-        ):
-            self._is_on = False
-            self._hvac_mode = HVACMode.OFF
-            self._need_update = False
+
+        self._is_on = False
+        self._hvac_mode = HVACMode.OFF
+        self._async_queue_changes(f'{self.name}, {self.unique_id} Turning the climate off failed.', {'power': 'OFF'})
 
     async def async_set_fan_mode(self, fan_mode: str):
         """Set new target fan mode."""
         if self._available is False:
             return
 
-        # if fan_mode != self._fan_mode:
-        if await self._async_try_command(
-            f'{self.name}, {self.unique_id} async_set_fan_mode failed.',
-            self._climate.set_fan_mode,
-            fan_mode
-        ):
-            self._fan_mode = fan_mode
-            self._need_update = False
+        self._fan_mode = fan_mode
+        self._async_queue_changes(f'{self.name}, {self.unique_id} async_set_fan_mode failed.', {'fan_mode': fan_mode})
   
\ No newline at end of file
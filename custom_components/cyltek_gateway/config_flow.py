@@ -15,8 +15,8 @@ from homeassistant.helpers import selector
 
 from . import scanner
 from .const import (CONF_CHANNELS, CONF_CONFIG_JSON, CONF_ENTITY_TYPE,
-                    CONF_INTERNET, CONF_MODEL, CONF_TYPE, DEFAULT_NAMES,
-                    DOMAIN, PLATFORMS)
+                    CONF_INTERNET, CONF_MODEL, CONF_TRAVEL_TIME, CONF_TYPE,
+                    DEFAULT_NAMES, DOMAIN, PLATFORMS)
 from .cover import CoverType
 from .cyltek import globalvar as gl
 from .cyltek import util
@@ -73,6 +73,8 @@ def _fill_the_form_by_value_dict(target_entity_type: str,
                 vol.Optional('level channel', default=df['level channel'])  : cv.positive_int,
                 vol.Optional(CONF_TYPE,       default=df[CONF_TYPE])        : vol.In([e.value for e in CoverType]),
                 vol.Required('config json',   default=df['config json'])    : cv.string,
+                vol.Optional('open time',     default=df['open time'])      : vol.All(vol.Coerce(float), vol.Range(min=0)),
+                vol.Optional('close time',    default=df['close time'])     : vol.All(vol.Coerce(float), vol.Range(min=0)),
                 vol.Optional("add another",   default=df['add another'])    : cv.boolean,
             }
         )
@@ -128,6 +130,8 @@ cover_schema_default_values = {
     'level channel'     : 0,
     'type'              : CoverType.Curtain,
     'config json'       : "cover",
+    'open time'         : 0,    # seconds of a full travel, 0 when not measured
+    'close time'        : 0,
     "add another"       : False
 }
 
@@ -202,6 +206,8 @@ def _get_device_info_from_user_input(target_entity_type: str,
                         CONF_TYPE: user_input[CONF_TYPE],
                         CONF_CONFIG_JSON: user_input['config json'],
                       }
+        if user_input.get('open time') and user_input.get('close time'):
+            device_info[CONF_TRAVEL_TIME] = {'open': user_input['open time'], 'close': user_input['close time']}
         device_info[CONF_UNIQUE_ID] = util.make_unique_id(device_info[CONF_ENTITY_TYPE],
                                                           CYL_IOT_MAC,
                                                           device_info[CONF_CHANNELS].values())
@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+from datetime import timedelta
 from typing import Final
 
 from homeassistant.const import Platform
@@ -18,6 +19,10 @@ DEFAULT_NAMES: Final = { Platform.SWITCH : "CYLTek-Switch",
                          Platform.HUMIDIFIER : "CYLTek-Humidifier"
 }
 
+DATA_COORDINATORS: Final = f"{DOMAIN}_coordinators"
+UPDATE_INTERVAL: Final = timedelta(seconds=10)
+SAFETY_POLL_INTERVAL: Final = timedelta(seconds=60)
+
 CONF_INTERNET: Final = "internet"
 CONF_CHANNELS: Final = "channels"
 CONF_CONFIG_JSON: Final = 'config_json'
@@ -25,6 +30,9 @@ CONF_CONFIG_JSON: Final = 'config_json'
 CONF_ENTITY_TYPE: Final = "entity_type"
 CONF_TYPE: Final = 'type'
 
+# cover
+CONF_TRAVEL_TIME: Final = "travel_time"
+
 # humidifier
 CONF_HUMI_ID: Final = "humi_id"
 CONF_MODEL: Final = "model"
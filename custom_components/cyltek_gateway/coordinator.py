@@ -0,0 +1,94 @@
+"""Update coordinator polling every thing of one CYL-Tek gateway."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Callable, Dict
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+
+from .const import (DATA_COORDINATORS, DOMAIN, SAFETY_POLL_INTERVAL,
+                    UPDATE_INTERVAL)
+from .cyltek.cylcontroller_ex import CYLControllerEx
+from .cyltek.IOThings import IOThings
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@callback
+def async_get_coordinator(hass: HomeAssistant, controller: CYLControllerEx) -> CYLGatewayCoordinator:
+    """Return the coordinator of the gateway, created on first use."""
+    coordinators = hass.data.setdefault(DATA_COORDINATORS, {})
+    coordinator = coordinators.get(controller.MAC)
+    if coordinator is None or coordinator.controller is not controller:
+        coordinator = CYLGatewayCoordinator(hass, controller)
+        coordinators[controller.MAC] = coordinator
+    return coordinator
+
+
+class CYLGatewayCoordinator(DataUpdateCoordinator[Dict[str, bool]]):
+    """Fetch the state of all things on one gateway in a single sweep.
+
+    One liveness probe of the gateway is shared by the sweep, the things are then read
+    concurrently and the data maps every thing's unique_id to its availability.
+    While the gateway's listener session is up, attribute reports are pushed
+    to the entities as they arrive, and once reports do arrive the sweep
+    slows down to a safety poll.
+    """
+
+    def __init__(self, hass: HomeAssistant, controller: CYLControllerEx) -> None:
+        super().__init__(
+            hass,
+            _LOGGER,
+            name=f"{DOMAIN} {controller.MAC}",
+            update_interval=UPDATE_INTERVAL,
+        )
+        self._controller = controller
+        self._things: Dict[str, IOThings] = {}
+
+    @property
+    def controller(self) -> CYLControllerEx:
+        return self._controller
+
+    @callback
+    def register(self, thing: IOThings) -> Callable[[], None]:
+        """Poll the thing in every sweep, return the function to stop it."""
+        self._things[thing.unique_id] = thing
+        thing.start_listening(self.async_update_listeners)
+
+        @callback
+        def _unregister() -> None:
+            if self._things.get(thing.unique_id) is thing:
+                self._things.pop(thing.unique_id)
+                thing.stop_listening()
+
+        return _unregister
+
+    def _reports_arrive(self) -> bool:
+        """A report came within the safety interval, a connected listener alone proves nothing."""
+        last = self._controller.last_notification
+        return last is not None and time.monotonic() - last < SAFETY_POLL_INTERVAL.total_seconds()
+
+    async def _async_update_data(self) -> Dict[str, bool]:
+        things = list(self._things.values())
+        if not things:
+            return {}
+
+        if await self._controller.async_is_available() is False:
+            return {thing.unique_id: False for thing in things}
+
+        listening = await self._controller.async_start_listening()
+        self.update_interval = SAFETY_POLL_INTERVAL if listening and self._reports_arrive() else UPDATE_INTERVAL
+
+        results = await asyncio.gather(*(thing.async_update_attributes() for thing in things),
+                                       return_exceptions=True)
+
+        available = {}
+        for thing, result in zip(things, results):
+            if isinstance(result, Exception):
+                _LOGGER.warning(f'{thing.alias}, {thing.unique_id} update_attributes raised {type(result).__name__}: {result}')
+                result = False
+            available[thing.unique_id] = thing.count_availability(result is not False, 'Failed to update_attributes')
+        return available
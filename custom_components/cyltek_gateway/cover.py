@@ -8,7 +8,8 @@ import homeassistant.helpers.config_validation as cv
 # pylint: disable=import-error, no-member
 import voluptuous as vol
 # Import the device class
-from homeassistant.components.cover import (ATTR_POSITION, DEVICE_CLASS_AWNING,
+from homeassistant.components.cover import (ATTR_CURRENT_POSITION,
+                                            ATTR_POSITION, DEVICE_CLASS_AWNING,
                                             DEVICE_CLASS_BLIND,
                                             DEVICE_CLASS_CURTAIN,
                                             DEVICE_CLASS_DAMPER,
@@ -25,18 +26,22 @@ from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import (CONF_DEVICES, CONF_MAC, CONF_NAME,
                                  STATE_CLOSED, STATE_CLOSING, STATE_OPEN,
                                  STATE_OPENING, Platform)
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.typing import ConfigType, DiscoveryInfoType
 
 from . import util
 from .const import (CONF_CHANNELS, CONF_CONFIG_JSON, CONF_ENTITY_TYPE,
-                    CONF_INTERNET, CONF_TYPE, DEFAULT_NAMES, DOMAIN)
+                    CONF_INTERNET, CONF_TRAVEL_TIME, CONF_TYPE, DEFAULT_NAMES,
+                    DOMAIN)
+from .coordinator import CYLGatewayCoordinator, async_get_coordinator
 from .cyltek import cylcover
 from .cyltek.cylcover import CoverState, CoverType, CYLCover
 from .entity import CYLDeviceEntity
 
 SWITCHBOT_WAIT_SEC = 10 #seconds
+TRAVEL_REFRESH_SEC = 1 #seconds, state refresh of a moving cover without a level channel
 BLE_RETRY_COUNT = 5
 
 # Initialize the logger
@@ -57,12 +62,21 @@ CHANNEL_SCHEMA = vol.Schema(
     }
 )
 
+VALID_TRAVEL_TIME = vol.All(vol.Coerce(float), vol.Range(min=0, min_included=False))
+TRAVEL_TIME_SCHEMA = vol.Schema(
+    {
+        vol.Required('open'):   VALID_TRAVEL_TIME,
+        vol.Required('close'):  VALID_TRAVEL_TIME,
+    }
+)
+
 DEVICE_SCHEMA = vol.Schema(
     {
         vol.Required(CONF_CHANNELS):                   CHANNEL_SCHEMA,
         vol.Optional(CONF_NAME, default=DEFAULT_NAME): cv.string,
         vol.Optional(CONF_TYPE, default=CURTAIN_TYPE): cv.string,
         vol.Required(CONF_CONFIG_JSON):                cv.string,
+        vol.Optional(CONF_TRAVEL_TIME):                TRAVEL_TIME_SCHEMA,
     }
 )
 
@@ -87,13 +101,15 @@ async def async_setup_platform(
 
     for dinfo in config[CONF_DEVICES]:
 
-        cover = cylcover.create_cylcover(config[CONF_MAC],
-                                       dinfo[CONF_CONFIG_JSON],
-                                       dinfo[CONF_CHANNELS],
-                                       internet=config[CONF_INTERNET],
-                                       auto_on=False,
-                                       model=None)
-        async_add_entities([CYLTekCovers(cover, dinfo[CONF_TYPE], dinfo[CONF_NAME])], True)
+        cover = await cylcover.async_create_cylcover(config[CONF_MAC],
+                                                   dinfo[CONF_CONFIG_JSON],
+                                                   dinfo[CONF_CHANNELS],
+                                                   internet=config[CONF_INTERNET],
+                                                   auto_on=False,
+                                                   model=None,
+                                                   travel_time=dinfo.get(CONF_TRAVEL_TIME))
+        coordinator = async_get_coordinator(hass, cover.cyl_controller)
+        async_add_entities([CYLTekCovers(coordinator, cover, dinfo[CONF_TYPE], dinfo[CONF_NAME])])
 
 
 async def async_setup_entry(
@@ -110,13 +126,15 @@ async def async_setup_entry(
 
     for dinfo in config[CONF_DEVICES]:
         if dinfo[CONF_ENTITY_TYPE] == Platform.COVER:
-            cover = cylcover.create_cylcover(config[CONF_MAC],
-                                        dinfo[CONF_CONFIG_JSON],
-                                        dinfo[CONF_CHANNELS],
-                                        internet=config[CONF_INTERNET],
-                                        auto_on=False,
-                                        model=None)
-            async_add_entities([CYLTekCovers(cover, dinfo[CONF_TYPE], dinfo[CONF_NAME])], True)
+            cover = await cylcover.async_create_cylcover(config[CONF_MAC],
+                                                    dinfo[CONF_CONFIG_JSON],
+                                                    dinfo[CONF_CHANNELS],
+                                                    internet=config[CONF_INTERNET],
+                                                    auto_on=False,
+                                                    model=None,
+                                                    travel_time=dinfo.get(CONF_TRAVEL_TIME))
+            coordinator = async_get_coordinator(hass, cover.cyl_controller)
+            async_add_entities([CYLTekCovers(coordinator, cover, dinfo[CONF_TYPE], dinfo[CONF_NAME])])
 
 class CYLTekCovers(CYLDeviceEntity, CoverEntity):
     """Representation of a CYL-Tek Cover."""
@@ -141,35 +159,47 @@ class CYLTekCovers(CYLDeviceEntity, CoverEntity):
         CoverType.Window    : DEVICE_CLASS_WINDOW,
     }
 
-    def __init__(self, cover: CYLCover, type: str, name: str="CYLTekCover") -> None:
+    def __init__(self, coordinator: CYLGatewayCoordinator, cover: CYLCover, type: str, name: str="CYLTekCover") -> None:
         """Initialize an CYLTekCover."""
-        super().__init__(cover.cyl_controller)
+        super().__init__(coordinator, cover)
         self._cover = cover
         self._cover.alias = name
         self._type = type
         self._state = None
         self._current_position = None
-
-        self._available = True
-
-    @property
-    def available(self) -> bool:
-        return self._available
-
-    async def async_update(self) -> None:
-        """Fetch new state data for this cover.
-        This is the only method that should fetch new data for Home Assistant.
-        """
+        self._cancel_travel_refresh = None
+
+    async def async_added_to_hass(self) -> None:
+        """Start the travel model from the position before the restart."""
+        if self._cover.travel and (last_state := await self.async_get_last_state()):
+            self._cover.restore_position(last_state.attributes.get(ATTR_CURRENT_POSITION))
+            self._update_from_thing()
+        await super().async_added_to_hass()
+
+    async def async_will_remove_from_hass(self) -> None:
+        """Stop the travel refresh, the base class shuts down the cover and its timed stop."""
+        if self._cancel_travel_refresh:
+            self._cancel_travel_refresh()
+            self._cancel_travel_refresh = None
+        await super().async_will_remove_from_hass()
+
+    @callback
+    def _async_track_travel(self, _now=None) -> None:
+        """Write the estimated position every TRAVEL_REFRESH_SEC while the cover moves."""
+        self._cancel_travel_refresh = None
+        self._update_from_thing()
+        self.async_write_ha_state()
+        if self._cover.is_moving:
+            self._cancel_travel_refresh = async_call_later(self.hass, TRAVEL_REFRESH_SEC, self._async_track_travel)
+
+    def _async_start_tracking(self) -> None:
+        if self._cancel_travel_refresh is None and self._cover.is_moving:
+            self._cancel_travel_refresh = async_call_later(self.hass, TRAVEL_REFRESH_SEC, self._async_track_travel)
+
+    # @override(CYLDeviceEntity)
+    def _update_from_thing(self) -> None:
         """Synchronise internal state with the actual cover state."""
 
-        self._available = await self._async_try_command(
-                f'{self.name}, {self.unique_id} is unavalible !',
-                self._cover.is_available
-            )
-
-        if self._available is False:
-            return
-
         self._state = self._cover.state
         self._current_position = self._cover.position
 
@@ -191,22 +221,23 @@ class CYLTekCovers(CYLDeviceEntity, CoverEntity):
     def current_cover_position(self):
         return self._current_position
 
+    ## the HA state comes from is_opening, is_closing and is_closed
     @property
     def is_opening(self):
-        return self._state == STATE_OPENING
+        return self.state_map.get(self._state) == STATE_OPENING
 
     @property
     def is_closing(self):
-        return self._state == STATE_CLOSING
+        return self.state_map.get(self._state) == STATE_CLOSING
 
     @property
     def is_closed(self):
+        if self._current_position is None:
+            if self._state is None:
+                return None
+            return self.state_map.get(self._state) == STATE_CLOSED
         return self._current_position == 0
 
-    @property
-    def state(self):
-        return self._state
-
     @property
     def supported_features(self):
         # Bitfield of features supported by the cover entity
@@ -232,7 +263,7 @@ class CYLTekCovers(CYLDeviceEntity, CoverEntity):
         return self._cover.channels['stop'] != 0
 
     def support_set_position(self):
-        return self._cover.channels['level'] != 0
+        return self._cover.supports_set_position
 
 
     async def async_open_cover(self, **kwargs):
@@ -243,9 +274,11 @@ class CYLTekCovers(CYLDeviceEntity, CoverEntity):
         if self._state != CoverState.Opening:
             if await self._async_try_command(
                 f'{self.name}, {self.unique_id} Turning the cover off failed.',
-                self._cover.open
+                self._cover.async_open
             ):
-                self._state = self._cover.state
+                self._update_from_thing()
+                self._async_start_tracking()
+                self.async_write_ha_state()
 
     async def async_close_cover(self, **kwargs):
         """Close cover."""
@@ -255,9 +288,11 @@ class CYLTekCovers(CYLDeviceEntity, CoverEntity):
         if self._state != CoverState.Closing:
             if await self._async_try_command(
                 f'{self.name}, {self.unique_id} Turning the cover off failed.',
-                self._cover.close
+                self._cover.async_close
             ):
-                self._state = self._cover.state
+                self._update_from_thing()
+                self._async_start_tracking()
+                self.async_write_ha_state()
 
     async def async_stop_cover(self, **kwargs):
         """Stop the cover."""
@@ -267,9 +302,11 @@ class CYLTekCovers(CYLDeviceEntity, CoverEntity):
         if self._state == CoverState.Closing or self._state == CoverState.Opening:
             if await self._async_try_command(
                 f'{self.name}, {self.unique_id} Turning the cover off failed.',
-                self._cover.stop
+                self._cover.async_stop
             ):
-                self._state = self._cover.state
+                self._update_from_thing()
+                self._async_start_tracking()
+                self.async_write_ha_state()
 
     async def async_set_cover_position(self, **kwargs):
         if self._available is False:
@@ -278,9 +315,14 @@ class CYLTekCovers(CYLDeviceEntity, CoverEntity):
         percent = kwargs[ATTR_POSITION]
         if await self._async_try_command(
             f'{self.name}, {self.unique_id} the cover setting position failed.',
-            self._cover.set_position,
+            self._cover.async_set_position,
             percent
         ):
-            self._current_position = percent
+            if self._cover.travel is None:
+                self._current_position = percent
+            else:
+                self._update_from_thing()
+                self._async_start_tracking()
+            self.async_write_ha_state()
 
 
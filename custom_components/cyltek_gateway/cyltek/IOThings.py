@@ -1,5 +1,7 @@
+import asyncio
 import logging
 from abc import ABC, abstractmethod
+from typing import Callable, Dict, Tuple
 
 from . import util
 from .cylcontroller_ex import CYLControllerEx
@@ -27,6 +29,8 @@ class IOThings(ABC):
 
         self._notification_socket = None  # The socket to get update notifications
         self._is_listening = False  # Indicate if we are listening
+        self._unsubscribe = None
+        self._on_notification = None
 
     @abstractmethod
     def update_attributes(self):
@@ -57,41 +61,127 @@ class IOThings(ABC):
     @property
     def last_attributes(self):
         """
-        This might potentially be out of date, as there's no background listener
-        for the iot's notifications. 
+        This might potentially be out of date unless start_listening() was called.
         Call update_attributes() to update it.
         """
         return self._last_attributes
 
-    def is_available(self):
-        """Check is_available iot."""
-        msg = 'Yes'
-        ## check connection
-        if self._cyl_controller.try_connect() is False:
+    @property
+    def is_listening(self):
+        return self._is_listening
+
+    def _notification_attributes(self) -> Dict[Tuple[str, str], str]:
+        """The reported (target-id, attr) to follow and the last attribute each one updates."""
+        return {}
+
+    def start_listening(self, on_notification: Callable[[], None] = None) -> bool:
+        """Update the last attributes from the gateway's reports, on_notification is called after each change."""
+        routes = self._notification_attributes()
+        if not routes:
+            return False
+
+        self.stop_listening()
+        self._on_notification = on_notification
+        self._unsubscribe = self._cyl_controller.subscribe({target_id for target_id, _ in routes}, self.handle_notification)
+        self._notification_socket = self._cyl_controller.listener
+        self._is_listening = True
+        return True
+
+    def stop_listening(self):
+        if self._unsubscribe:
+            self._unsubscribe()
+        self._unsubscribe = None
+        self._on_notification = None
+        self._notification_socket = None
+        self._is_listening = False
+
+    def shutdown(self):
+        """Cancel the work the thing still has scheduled, it is being removed."""
+        pass
+
+    def handle_notification(self, frame: dict) -> bool:
+        """Keep the value of an attribute report, return True if it belongs to this thing."""
+        key = self._notification_attributes().get((frame.get('target-id'), frame.get('attr')))
+        if key is None or frame.get('value') is None:
+            return False
+
+        _LOGGER.debug(f'{self.alias}, {self.unique_id} notification {key}: {frame["value"]}')
+        self._last_attributes[key] = frame['value']
+        if self._on_notification:
+            self._on_notification()
+        return True
+
+    async def async_update_attributes(self):
+        """update_attributes() from the event loop, native async devices override it."""
+        return await asyncio.get_running_loop().run_in_executor(None, self.update_attributes)
+
+    def count_availability(self, ok: bool, msg: str):
+        """Count a read of the thing, it is unavailable after MAX_UNAVAILABLE_TIMES failed reads in a row."""
+        if ok is False:
             self._unavailable_counter = 4 if self._unavailable_counter >= IOThings.MAX_UNAVAILABLE_TIMES else (self._unavailable_counter + 1)
-            msg = f'Failed to connected'
         else:
-            ## update attributes data
-            if self.update_attributes() is False:
-                self._unavailable_counter = 4 if self._unavailable_counter >= IOThings.MAX_UNAVAILABLE_TIMES else (self._unavailable_counter + 1)
-                msg = f'Failed to update_attributes'
-            else:
-                self._unavailable_counter = 0
-
-        # pre_status = self._is_available
+            self._unavailable_counter = 0
+
         self._is_available = False if self._unavailable_counter > IOThings.MAX_UNAVAILABLE_TIMES else True
-        # if pre_status != self._is_available:
-            # _LOGGER.warning(f'Check is_available: {msg} ({self.alias}, {self.unique_id})')
         if not self._is_available:
             _LOGGER.error(f'Check is_available: {msg} ({self.alias}, {self.unique_id})')
-            ip_type = '4' if util.is_valid_IP(self._cyl_controller.host) else '6'
-            ret, out = util.do_command(f"ping -{ip_type} -c 3 -W 1 {self._cyl_controller.host}")
-            _LOGGER.warning(f'{self._cyl_controller.host}, {self.alias}, PING: ret: {ret}, out: {out}')
         return self._is_available
 
+    def is_available(self):
+        """Check is_available iot, the gateway liveness is shared by all things on it."""
+        if self._cyl_controller.is_available() is False:
+            self._is_available = False
+            return self._is_available
+
+        return self.count_availability(self.update_attributes() is not False, 'Failed to update_attributes')
+
+    async def async_is_available(self):
+        """is_available() from the event loop."""
+        if await self._cyl_controller.async_is_available() is False:
+            self._is_available = False
+            return self._is_available
+
+        return self.count_availability(await self.async_update_attributes() is not False, 'Failed to update_attributes')
+
+    def _apply_read_result(self, key: str, attr: str, ret: bool, out):
+        """Keep the value of a read-attr response as last attribute 'key'.
+
+        Return None when the device is offline and the gateway needs an
+        enumerate refresh, otherwise the update result.
+        """
+        if ret is True:
+            self._offline_retry = 0
+            if out.get('value') != None:
+                self._last_attributes[key] = out['value']
+            return True
+
+        _LOGGER.warning(f'{self.alias} {self.unique_id}, Failed to get {attr}')
+
+        if self._offline_retry >= 3:
+            return False
+
+        if isinstance (out, dict) and out.get('code') == 13 and out.get('reason') == 'device offline(unavailable)':
+            _LOGGER.warning(f'{self.alias}, {self.MAC} device offline(unavailable) send enumerate !')
+            self._offline_retry += 1
+            return None
+        return False
+
     def get_last_attribute(self, attr):
         return self._last_attributes.get(attr)
 
+    def restore_attributes(self, attributes: dict) -> bool:
+        """Fill the attributes not read yet with those saved before a restart, True if any was.
+
+        An attribute is not read yet when it is missing or None, things seed
+        some of theirs with None.
+        """
+        restored = False
+        for key, value in attributes.items():
+            if value is not None and self._last_attributes.get(key) is None:
+                self._last_attributes[key] = value
+                restored = True
+        return restored
+
     def _set_last_attributes(self, attributes, update=True):
         
         if update:
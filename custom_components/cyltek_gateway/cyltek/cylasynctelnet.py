@@ -0,0 +1,198 @@
+import asyncio
+import logging
+import sys
+from typing import Callable, List, Optional, Tuple, TypeVar
+
+from . import util
+from .cyltelnet import CYLFrameDecoder, CYLTelnet
+
+_LOGGER = logging.getLogger(__name__)
+_LOGGER.setLevel(logging.ERROR)
+
+class CYLPendingRequest(object):
+    """A request written to the gateway and waiting for its response."""
+
+    def __init__(self, key: tuple, future: asyncio.Future) -> None:
+        self.key = key
+        self.future = future
+        self.other: List[dict] = []  # frames without 'code' received while waiting
+
+
+class CYLAsyncTelnet(object):
+    """asyncio streams client of the 9528 protocol. Default expect string is ':#'
+
+    Several requests may be in flight on the one connection. A background
+    reader matches every response to its waiting request by
+    (target-id, cmd, attr). A response no waiting request matches, e.g.
+    the late one of a request which timed out, is dropped.
+    """
+
+    CONNECTION_TIMEOUT: float = 3
+    READ_SIZE: int = 4096
+    EPILOG: str = CYLTelnet.EPILOG
+    ENTER: str = CYLTelnet.ENTER
+    ENCODING: str = CYLTelnet.ENCODING
+
+    def __init__(self, host='192.168.2.200',
+                       port=9528,
+                       on_unsolicited: Callable[[dict], None] = None) -> None:
+
+        self.host: str = host
+        self.port: int = port
+        self.on_unsolicited = on_unsolicited
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._read_task: Optional[asyncio.Task] = None
+        self._pending: List[CYLPendingRequest] = []
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._pending)
+
+    async def connect(self, timeout: float = None) -> bool:
+        timeout = CYLAsyncTelnet.CONNECTION_TIMEOUT if timeout is None else timeout
+        await self.close()
+        try:
+            self._reader, self._writer = await asyncio.wait_for(
+                asyncio.open_connection(self.host, self.port), timeout)
+        except (OSError, asyncio.TimeoutError) as e:
+            _LOGGER.debug(f"host: {self.host}:{self.port} {str(e)}")
+            self._reader, self._writer = None, None
+            return False
+
+        self._read_task = asyncio.ensure_future(self._read_loop(self._reader))
+        return True
+
+    def is_connected(self) -> bool:
+        return self._writer is not None and not self._writer.is_closing() \
+               and self._read_task is not None and not self._read_task.done()
+
+    @staticmethod
+    def _response_key(content: dict) -> tuple:
+        return (content.get('target-id'), content.get('cmd'), content.get('attr'))
+
+    async def _read_loop(self, reader: asyncio.StreamReader) -> None:
+        decoder = CYLFrameDecoder()
+        try:
+            while True:
+                data = await reader.read(CYLAsyncTelnet.READ_SIZE)
+                if not data:
+                    raise EOFError("connection closed by the gateway")
+                for frame in decoder.feed(data):
+                    _LOGGER.debug(f'_read_loop() <RECEIVE>\n{frame}\n</RECEIVE>')
+                    self._dispatch(frame)
+
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            _LOGGER.debug(f"host: {self.host}:{self.port} read loop stopped, {type(e).__name__}: {str(e)}")
+            self._fail_pending(e)
+
+    def _dispatch(self, frame: dict) -> None:
+        if frame.get('code') is None:
+            if self._pending:
+                self._pending[0].other.append(frame)
+            elif self.on_unsolicited:
+                self.on_unsolicited(frame)
+            return
+
+        key = self._response_key(frame)
+        request = next((p for p in self._pending if p.key == key), None)
+        if request is None:
+            ## late, or it can not be correlated; the caller's check would reject it anyway
+            _LOGGER.debug(f'{self.host}:{self.port} drop the response of no request: {frame}')
+            return
+
+        self._pending.remove(request)
+        if not request.future.done():
+            frame['other'] = request.other
+            request.future.set_result(frame)
+
+    def _release_other(self, request: CYLPendingRequest) -> None:
+        """The reports collected for a request which got no response go to on_unsolicited."""
+        future = request.future
+        if future.done() and not future.cancelled() and future.exception() is None:
+            return  # they are delivered with the response
+        other, request.other = request.other, []
+        if self.on_unsolicited:
+            for frame in other:
+                self.on_unsolicited(frame)
+
+    def _fail_pending(self, exc: Exception) -> None:
+        pending, self._pending = self._pending, []
+        for request in pending:
+            if not request.future.done():
+                request.future.set_exception(ConnectionError(f"connection lost, {type(exc).__name__}: {exc}"))
+
+    T = TypeVar('T', None, dict, str)
+    async def sends(self, content: str,
+                          just_send: bool = False,
+                          timeout: float = 3,
+                          encoding: str = None,
+                          **kwargs) -> Tuple[bool, T]:
+
+        """
+        sends error code:
+          1: no response until timeout
+         -1: not connected
+         -2: Exception
+        """
+
+        encoding = CYLAsyncTelnet.ENCODING if encoding is None else encoding
+
+        if not self.is_connected():
+            return (False, {"err_code": -1, "reason": "sends Error: not connected", "out": None})
+
+        request = None
+        try:
+            if not just_send:
+                request = CYLPendingRequest(self._response_key(util.content9528_to_dict(content) or {}),
+                                            asyncio.get_running_loop().create_future())
+                self._pending.append(request)
+
+            self._writer.write(str(content + CYLAsyncTelnet.ENTER).encode(encoding))
+            await self._writer.drain()
+            if just_send:
+                return (True, 'just send !')
+
+            out = await asyncio.wait_for(request.future, timeout)
+            return (True, out)
+
+        except asyncio.TimeoutError:
+            return (False, {"err_code": 1, "reason": "receive Error: Output is None !", "out": None})
+
+        except Exception as e:
+            e_type, e_object, traceback = sys.exc_info()
+            filename = traceback.tb_frame.f_code.co_filename
+            line_number = traceback.tb_lineno
+            msg = f"[Exception] {e_type}: {str(e)} ({filename}:{line_number})"
+            return (False, {"err_code": -2, "reason": "sends Error: " + msg, "out": None})
+
+        finally:
+            if request in self._pending:
+                self._pending.remove(request)
+            if request is not None:
+                self._release_other(request)
+
+    def abort(self) -> None:
+        """Drop the connection without waiting, safe to call outside a coroutine."""
+        if self._read_task:
+            self._read_task.cancel()
+        if self._writer:
+            self._writer.transport.abort()
+        self._reader, self._writer, self._read_task = None, None, None
+
+    async def close(self) -> None:
+        if self._read_task:
+            self._read_task.cancel()
+            self._read_task = None
+        self._fail_pending(ConnectionAbortedError("closed"))
+
+        if self._writer:
+            writer = self._writer
+            self._reader, self._writer = None, None
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except Exception:
+                pass
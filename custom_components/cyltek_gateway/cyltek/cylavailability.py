@@ -0,0 +1,80 @@
+import logging
+import threading
+import time
+
+from .enums import StrEnum
+
+_LOGGER = logging.getLogger(__name__)
+
+class Liveness(StrEnum):
+    """Liveness of a gateway."""
+
+    Online = "online"
+    Suspect = "suspect"  # failed lately, still reported as available
+    Offline = "offline"
+
+
+class CYLAvailability(object):
+    """Liveness state machine of one gateway, shared by all of its things.
+
+    A probe is due at most once per probe_interval, the callers in between
+    get the last state. The gateway goes Offline after fail_threshold failed
+    probes in a row, and back Online after recover_threshold good ones.
+    """
+
+    PROBE_INTERVAL: float = 10
+    FAIL_THRESHOLD: int = 3
+    RECOVER_THRESHOLD: int = 1
+
+    def __init__(self, probe_interval: float = None,
+                       fail_threshold: int = None,
+                       recover_threshold: int = None) -> None:
+
+        self._probe_interval = CYLAvailability.PROBE_INTERVAL if probe_interval is None else probe_interval
+        self._fail_threshold = CYLAvailability.FAIL_THRESHOLD if fail_threshold is None else fail_threshold
+        self._recover_threshold = CYLAvailability.RECOVER_THRESHOLD if recover_threshold is None else recover_threshold
+
+        self._lock = threading.Lock()
+        self._state = Liveness.Online
+        self._failures = 0
+        self._successes = 0
+        self._last_probe = None
+
+        self.probes = 0
+
+    @property
+    def state(self) -> Liveness:
+        return self._state
+
+    @property
+    def is_available(self) -> bool:
+        return self._state != Liveness.Offline
+
+    def begin_probe(self) -> bool:
+        """Claim the probe of this interval, False if it is not due or already claimed."""
+        now = time.monotonic()
+        with self._lock:
+            if self._last_probe is not None and now - self._last_probe < self._probe_interval:
+                return False
+            self._last_probe = now
+            self.probes += 1
+            return True
+
+    def record(self, ok: bool) -> bool:
+        """Count a probe result, return True if the state changed."""
+        with self._lock:
+            previous = self._state
+            if ok:
+                self._failures = 0
+                self._successes += 1
+                if self._state == Liveness.Suspect or self._successes >= self._recover_threshold:
+                    self._state = Liveness.Online
+            else:
+                self._successes = 0
+                self._failures += 1
+                self._state = Liveness.Offline if self._failures >= self._fail_threshold else \
+                              (Liveness.Suspect if self._state == Liveness.Online else self._state)
+
+        if self._state != previous:
+            _LOGGER.debug(f'liveness {previous} -> {self._state}')
+        return self._state != previous
@@ -0,0 +1,118 @@
+import logging
+import threading
+import time
+from typing import Optional
+
+from .enums import StrEnum
+
+_LOGGER = logging.getLogger(__name__)
+
+class BreakerState(StrEnum):
+    """State of a circuit breaker."""
+
+    Closed = "closed"        # commands go through
+    Open = "open"            # commands fail fast
+    HalfOpen = "half-open"   # one trial command decides
+
+
+class CYLBreakerPermit(object):
+    """What allow() hands to a command, the one of the half-open trial decides the state."""
+
+    def __init__(self, trial: bool) -> None:
+        self.trial = trial
+
+
+class CYLCircuitBreaker(object):
+    """Circuit breaker of one gateway.
+
+    It opens after failure_threshold transport failures in a row, commands
+    are then rejected without touching the network. Something outside,
+    the controller's background probe, moves it to half-open when the
+    gateway answers again; the next command is the trial which closes it
+    on success or opens it again on failure.
+    """
+
+    FAILURE_THRESHOLD: int = 3
+    PROBE_INTERVAL: float = 5
+    REJECT_REASON: str = "circuit open: gateway unreachable"
+    PASS = CYLBreakerPermit(trial=False)
+
+    def __init__(self, failure_threshold: int = None) -> None:
+        self._failure_threshold = CYLCircuitBreaker.FAILURE_THRESHOLD if failure_threshold is None else failure_threshold
+
+        self._lock = threading.Lock()
+        self._state = BreakerState.Closed
+        self._failures = 0
+        self._trial: Optional[CYLBreakerPermit] = None  # the half-open trial in flight
+        self._opened_at = None
+
+        self.rejected = 0
+        self.opened = 0
+
+    @property
+    def state(self) -> BreakerState:
+        return self._state
+
+    @property
+    def is_open(self) -> bool:
+        return self._state == BreakerState.Open
+
+    @property
+    def opened_for(self) -> float:
+        """Seconds since the breaker opened, 0 when it is not open."""
+        return time.monotonic() - self._opened_at if self.is_open else 0
+
+    def allow(self) -> Optional[CYLBreakerPermit]:
+        """The permit of a command which may go out, None if it is rejected.
+
+        The caller must record() the outcome with the permit, or release()
+        it when the command ended without one.
+        """
+        with self._lock:
+            if self._state == BreakerState.Closed:
+                return CYLCircuitBreaker.PASS
+            if self._state == BreakerState.HalfOpen and self._trial is None:
+                self._trial = CYLBreakerPermit(trial=True)
+                return self._trial
+            self.rejected += 1
+            return None
+
+    def record(self, ok: bool, permit: CYLBreakerPermit = None) -> bool:
+        """Count the outcome of an allowed command, return True if the breaker has just opened."""
+        with self._lock:
+            if permit is not None and permit is self._trial:
+                self._trial = None
+            elif self._state != BreakerState.Closed:
+                ## only the trial decides, not a command which went out before the breaker opened
+                return False
+
+            if ok:
+                if self._state != BreakerState.Closed:
+                    _LOGGER.debug(f'circuit {self._state} -> {BreakerState.Closed}')
+                self._state = BreakerState.Closed
+                self._failures = 0
+                return False
+
+            self._failures += 1
+            if self._state == BreakerState.HalfOpen or \
+               (self._state == BreakerState.Closed and self._failures >= self._failure_threshold):
+                _LOGGER.debug(f'circuit {self._state} -> {BreakerState.Open}, failures: {self._failures}')
+                self._state = BreakerState.Open
+                self._opened_at = time.monotonic()
+                self.opened += 1
+                return True
+            return False
+
+    def release(self, permit: CYLBreakerPermit) -> None:
+        """Give the trial back without an outcome, the next command is the trial then."""
+        with self._lock:
+            if permit is not None and permit is self._trial:
+                self._trial = None
+
+    def half_open(self) -> None:
+        """Let one trial command through, called when the gateway is reachable again."""
+        with self._lock:
+            if self._state == BreakerState.Open:
+                _LOGGER.debug(f'circuit {self._state} -> {BreakerState.HalfOpen}')
+                self._state = BreakerState.HalfOpen
+                self._trial = None
@@ -0,0 +1,185 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import threading
+import time
+from enum import IntEnum
+from typing import Optional
+
+from .cyltelnet import CYLLatencyStats
+
+_LOGGER = logging.getLogger(__name__)
+
+## commands which end up on the RS-485 bus behind the target endpoint
+BUS_COMMANDS = ('modbus-cmd', 'daikin-cmd', 'altrason-cmd', 'supply-raw-data')
+MODBUS_READ_FUNCTIONS = (1, 2, 3)
+
+class BusPriority(IntEnum):
+    """Priority of a bus transaction, the lower goes first."""
+
+    Write = 0  # user commands
+    Poll = 1   # state queries
+
+
+def bus_priority(command: dict) -> Optional[BusPriority]:
+    """Priority of a 9528 command on the bus, None if it does not use the bus."""
+    if not isinstance(command, dict) or command.get('cmd') not in BUS_COMMANDS:
+        return None
+    if command['cmd'] == 'modbus-cmd':
+        return BusPriority.Poll if command.get('function') in MODBUS_READ_FUNCTIONS else BusPriority.Write
+    if str(command.get('action', '')).startswith('query'):
+        return BusPriority.Poll
+    return BusPriority.Write
+
+
+def _wake(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+class CYLBusScheduler(object):
+    """Serialize the transactions of one RS-485 bus of a gateway.
+
+    One transaction is on the bus at a time and the next one starts at
+    least FRAME_GAP seconds after the previous ended. Waiting transactions
+    go by priority, writes before polls, and in arrival order within a
+    priority. Threads wait with acquire(), coroutines with async_acquire(),
+    whose waiters are woken on their loop by the releasing thread.
+    """
+
+    FRAME_GAP: float = 0.05
+    BUSY_REASON: str = "bus busy"
+
+    def __init__(self, name: str, frame_gap: float = None) -> None:
+        self.name = name
+        self._frame_gap = CYLBusScheduler.FRAME_GAP if frame_gap is None else frame_gap
+
+        self._cond = threading.Condition()
+        self._queue = []  # heap of (priority, arrival) tickets
+        self._arrival = itertools.count()
+        self._busy = False
+        self._last_end = 0.0
+        self._async_waiters = {}  # ticket: (loop, future) of a coroutine waiting for its turn
+
+        self.transactions = 0
+        self.timeouts = 0
+        self.max_depth = 0
+        self.wait = {priority: CYLLatencyStats() for priority in BusPriority}
+
+    @property
+    def depth(self) -> int:
+        """Transactions waiting for the bus."""
+        return len(self._queue)
+
+    @property
+    def busy(self) -> bool:
+        return self._busy
+
+    def acquire(self, priority: BusPriority = BusPriority.Write, timeout: float = None) -> bool:
+        """Wait for the turn of a transaction, False if it did not come within timeout."""
+        start_time = time.monotonic()
+        ticket = (priority, next(self._arrival))
+        with self._cond:
+            heapq.heappush(self._queue, ticket)
+            self.max_depth = max(self.max_depth, len(self._queue))
+            while True:
+                now = time.monotonic()
+                wait = None
+                if not self._busy and self._queue[0] == ticket:
+                    gap = self._last_end + self._frame_gap - now
+                    if gap <= 0:
+                        break
+                    wait = gap
+
+                if timeout is not None:
+                    remaining = start_time + timeout - now
+                    if remaining <= 0:
+                        self._timed_out(ticket, timeout)
+                        return False
+                    wait = remaining if wait is None else min(wait, remaining)
+                self._cond.wait(wait)
+
+            self._take(ticket, priority, start_time)
+        return True
+
+    async def async_acquire(self, priority: BusPriority = BusPriority.Write, timeout: float = None) -> bool:
+        """acquire() on the event loop, no thread is held while waiting."""
+        loop = asyncio.get_running_loop()
+        start_time = time.monotonic()
+        ticket = (priority, next(self._arrival))
+        with self._cond:
+            heapq.heappush(self._queue, ticket)
+            self.max_depth = max(self.max_depth, len(self._queue))
+
+        try:
+            while True:
+                with self._cond:
+                    now = time.monotonic()
+                    wait = None
+                    if not self._busy and self._queue[0] == ticket:
+                        gap = self._last_end + self._frame_gap - now
+                        if gap <= 0:
+                            self._take(ticket, priority, start_time)
+                            return True
+                        wait = gap
+
+                    if timeout is not None:
+                        remaining = start_time + timeout - now
+                        if remaining <= 0:
+                            self._timed_out(ticket, timeout)
+                            return False
+                        wait = remaining if wait is None else min(wait, remaining)
+
+                    wake = loop.create_future()
+                    self._async_waiters[ticket] = (loop, wake)
+                try:
+                    await asyncio.wait_for(wake, wait)
+                except asyncio.TimeoutError:
+                    pass
+                finally:
+                    with self._cond:
+                        self._async_waiters.pop(ticket, None)
+
+        except asyncio.CancelledError:
+            with self._cond:
+                if ticket in self._queue:
+                    self._leave(ticket)
+            raise
+
+    def _take(self, ticket: tuple, priority: BusPriority, start_time: float) -> None:
+        heapq.heappop(self._queue)
+        self._busy = True
+        self.transactions += 1
+        self.wait[priority].record(time.monotonic() - start_time)
+
+    def _timed_out(self, ticket: tuple, timeout: float) -> None:
+        self._leave(ticket)
+        self.timeouts += 1
+        _LOGGER.warning(f'{self.name}: no turn on the bus within {timeout}s, depth: {len(self._queue)}')
+
+    def _leave(self, ticket: tuple) -> None:
+        self._queue.remove(ticket)
+        heapq.heapify(self._queue)
+        self._notify()
+
+    def _notify(self) -> None:
+        """Wake every waiter to check its turn, call it with the lock held."""
+        self._cond.notify_all()
+        for loop, wake in self._async_waiters.values():
+            loop.call_soon_threadsafe(_wake, wake)
+
+    def release(self) -> None:
+        with self._cond:
+            self._busy = False
+            self._last_end = time.monotonic()
+            self._notify()
+
+    def as_dict(self) -> dict:
+        return {
+            "depth": self.depth,
+            "max_depth": self.max_depth,
+            "transactions": self.transactions,
+            "timeouts": self.timeouts,
+            "wait": {priority.name.lower(): stats.as_dict() for priority, stats in self.wait.items()},
+        }
@@ -1,10 +1,13 @@
+import asyncio
 import logging
 import os
+from functools import partial
 
 from . import COMPONENT_ABS_DIR
 from . import globalvar as gl
 from . import util
 from .cylcontroller_ex import CYLControllerEx
+from .daikin_contorller import Daikin_bus, Daikin_verification, compile_register_maps
 # from .daikin_contorller import Daikin_cyl485
 from .Interface import (IFanMode, IHumidity, IMode, IPower, ISwingMode,
                         ITargetTemperature, ITemperature)
@@ -43,6 +46,21 @@ def create_cylclimate(MAC,
     return None
 
 
+async def async_create_cylclimate(MAC,
+                                  AC_id,
+                                  config_name,
+                                  channels,
+                                  internet="eth0",
+                                  auto_on=False,
+                                  model=None):
+
+    """create_cylclimate off the event loop, the controller of the MAC is built once for all callers"""
+
+    await gl.async_get_controller(MAC, partial(CYLControllerEx.async_create, MAC, internet=internet))
+    return await asyncio.get_running_loop().run_in_executor(
+        None, partial(create_cylclimate, MAC, AC_id, config_name, channels, internet, auto_on, model))
+
+
 class CYLClimate(IOThings,
                  IPower,
                  IMode,
@@ -52,17 +70,17 @@ class CYLClimate(IOThings,
                  ITemperature,
                  ITargetTemperature):
 
-    Data_Mask = {
-        "on_off":       {"num": 0, "mask": 0x1},
-        "fan_dir":      {"num": 0, "mask": 0x0700},
-        "fan_vol":      {"num": 0, "mask": 0x7000},
-        "op_mode":      {"num": 1, "mask": 0xF},
-        "op_status":    {"num": 1, "mask": 0xF00},
-        "heat_master":  {"num": 1, "mask": 0xC000},
-        "target_temp":  {"num": 2, "mask": 0xFFFF},
-        "temp":         {"num": 4, "mask": 0xFFFF},
+    ## attribute: (holding register setting, config table of its values)
+    Holding_Fields = {
+        "power":              ("power",     "power_status"),
+        "mode":               ("mode",      "operation_modes"),
+        "fan_mode":           ("volume",    "fan_modes"),
+        "swing_mode":         ("direction", "swing_modes"),
+        "target_temperature": ("setpoint",  None),
     }
 
+    APPLY_WINDOW: float = 0.3
+
     def __init__(self,
                  cyl_controller: CYLControllerEx,
                  AC_id: int,
@@ -114,9 +132,14 @@ class CYLClimate(IOThings,
         self._Temp_range_config = config.get('temperature_range')
         self._Temp_range = self._Temp_range_config.get(self._model)
         self._manufacturer = config.get('manufacturer')
+        self._register_maps = compile_register_maps(config.get('register_map'))
         unit = str(config.get('temperature_unit')).upper()
         self._Temp_unit = unit if unit in ("C", "F") else "C"
 
+        self._pending = {}             # changes waiting for the apply window
+        self._pending_future = None
+        self._flush_tasks = set()      # windows being applied and verified
+
 
     def find_ac_group(self):
         for v in self._groups.values():
@@ -350,11 +373,198 @@ class CYLClimate(IOThings,
         return self.get_last_attribute(f'temperature_{self._Temp_unit}')
 
 
+    def _daikin_bus(self):
+        """The RS-485 bus of this AC, shared by all the climates of the controller."""
+        target_id = util.make_target_id(self.MAC, self.channels['default'])
+        bus = Daikin_bus.for_owner(self._cyl_controller, self._cyl_controller.send_cmd, target_id, self._slave_address or 1,
+                                   register_maps=self._register_maps)
+        bus.add_units(self.find_ac_group() or [self.AC_id])
+        return bus
+
+    def _attributes_from_fields(self, value):
+        """The attributes of the register fields of the unit."""
+        return {
+            'power':              self.inv_power_status.get(value["on_off"]),
+            'temperature_C':      float(value["temp"]),
+            'target_temperature': float(value["target_temp"]),
+            'mode':               self.inv_operation_modes.get(value["op_mode"]),
+            'fan_mode':           self.inv_fan_modes.get(value["fan_vol"]),
+            'swing_mode':         self.inv_swing_modes.get(value["fan_dir"]),
+            'heat_master':        self.inv_heat_master.get(value["heat_master"]),
+        }
+
+    def _decode_registers(self, register):
+        """Decode the input registers of the unit with the register map of the profile."""
+        return self._attributes_from_fields(self._register_maps["input"].decode_unit(register))
+
+    def _update_temperature_range(self):
+        if self._last_attributes.get('mode') not in self._Temp_range_config:
+            self._Temp_range = self._Temp_range_config.get(self._model)
+        else:
+            self._Temp_range = self._Temp_range_config.get(self._last_attributes['mode'])
+
+    def _read_back(self):
+        """The attributes the unit reports right now, None if the bus cannot be read."""
+        bus = self._daikin_bus()
+        ## one failed read must not hold the rest of the verification off
+        if bus.snapshot(max_age=0, backoff=False) and (fields := bus.fields(self.AC_id)):
+            return self._attributes_from_fields(fields)
+        return None
+
+    async def async_verify(self, expected: dict, resend=None):
+        """Wait until the unit reports the expected attributes.
+
+        Raise CYLTekVerifyError when it does not within the deadline. A unit
+        whose bus is known to be unreadable, never read or backing off a
+        failed read, is taken as verified.
+        """
+        if not self._daikin_bus().readable:
+            _LOGGER.debug(f'{self.alias}, {self.unique_id}: bus not readable, {expected} is not verified')
+            return True
+
+        loop = asyncio.get_running_loop()
+
+        async def read():
+            return await loop.run_in_executor(None, self._read_back)
+
+        async def async_resend():
+            await loop.run_in_executor(None, resend)
+
+        verification = Daikin_verification(self.AC_id, expected)
+        return await verification.async_run(read, async_resend if resend else None)
+
+    def _apply_each(self, changes: dict):
+        """apply() without a holding register shadow, one daikin-cmd per attribute."""
+        setters = {
+            'power':              lambda value: self.turn_on() if value == 'ON' else self.turn_off(),
+            'mode':               self.set_mode,
+            'fan_mode':           self.set_fan_mode,
+            'swing_mode':         self.set_swing_mode,
+            'target_temperature': self.set_target_temperature,
+        }
+        return all([setters[name](value) for name, value in changes.items()])
+
+    def apply(self, changes: dict):
+        """Set several attributes, e.g. {'mode': 'cool', 'fan_mode': 'high', 'target_temperature': 24}.
+
+        They go out in one holding register write built on the shadow of
+        the bus. A cool/heat change over is left to the gateway, which
+        knows the master of the group.
+        """
+        if self.channels['default'] == 0:
+            return False
+
+        changes = dict(changes)
+        unknown = [name for name in changes if name not in CYLClimate.Holding_Fields]
+        if unknown:
+            _LOGGER.error(f'{self.alias}, {self.unique_id}: unknown attributes {unknown}')
+            return False
+        invalid = {name: value for name, value in changes.items()
+                   if (table := CYLClimate.Holding_Fields[name][1]) is not None and value not in (getattr(self, table) or {})}
+        if invalid:
+            _LOGGER.error(f'{self.alias}, {self.unique_id}: invalid values {invalid}')
+            return False
+        if 'target_temperature' in changes:
+            changes['target_temperature'] = float(changes['target_temperature'])
+
+        ret = True
+        switched = {}
+        mode, last_mode = changes.get('mode'), self.get_last_attribute('mode')
+        if {mode, last_mode} == {'cool', 'heat'}:
+            switched['mode'] = changes.pop('mode')
+            ret = self.set_mode(switched['mode'])
+        if ret is False or not changes:
+            return ret
+
+        bus = self._daikin_bus()
+        dmh = bus.holding(self.AC_id)
+        if dmh is None and bus.snapshot(max_age=0):
+            dmh = bus.holding(self.AC_id)
+        if dmh is None:
+            return self._apply_each(changes)
+
+        ## the write carries every setting, with the old mode it would switch the unit back
+        for name, value in {**changes, **switched}.items():
+            field, table = CYLClimate.Holding_Fields[name]
+            setattr(dmh, field, value if table is None else getattr(self, table).get(value))
+
+        ret, out = bus.write(self.AC_id, dmh)
+        if ret:
+            self._last_attributes.update(changes)
+        else:
+            _LOGGER.warning(f'{self.alias}, {self.unique_id}: {ret}, {out}')
+        return ret
+
+    def async_schedule_apply(self, changes: dict) -> asyncio.Future:
+        """Queue changes for apply(), the ones queued within APPLY_WINDOW go out together.
+
+        Call it from the event loop. The returned future is shared by all the
+        changes of the window and has the verified result of the apply().
+        """
+        self._pending.update(changes)
+        if self._pending_future is None:
+            loop = asyncio.get_running_loop()
+            self._pending_future = loop.create_future()
+            task = loop.create_task(self._async_flush(self._pending_future))
+            self._flush_tasks.add(task)
+            task.add_done_callback(self._flush_tasks.discard)
+        return self._pending_future
+
+    async def _async_flush(self, future: asyncio.Future):
+        try:
+            await asyncio.sleep(CYLClimate.APPLY_WINDOW)
+            changes = self._pending
+            self._pending, self._pending_future = {}, None
+
+            ret = await asyncio.get_running_loop().run_in_executor(None, self.apply, changes)
+            if ret:
+                await self.async_verify(changes, resend=lambda: self.apply(changes))
+            future.set_result(ret)
+        except Exception as e:
+            future.set_exception(e)
+        finally:
+            ## cancelled, the callers of async_apply() must not wait forever
+            if not future.done():
+                future.cancel()
+            if self._pending_future is future:
+                self._pending, self._pending_future = {}, None
+
+    # @override(IOThings)
+    def shutdown(self):
+        for task in list(self._flush_tasks):
+            task.cancel()
+
+    async def async_apply(self, changes: dict):
+        return await self.async_schedule_apply(changes)
+
+    async def async_turn_on(self):
+        return await self.async_apply({'power': 'ON'})
+
+    async def async_turn_off(self):
+        return await self.async_apply({'power': 'OFF'})
+
+    async def async_set_mode(self, mode):
+        return await self.async_apply({'mode': mode})
+
+    async def async_set_fan_mode(self, mode):
+        return await self.async_apply({'fan_mode': mode})
+
+    async def async_set_target_temperature(self, intensity):
+        return await self.async_apply({'target_temperature': intensity})
+
     def update_attributes(self):
         if self.channels['default'] == 0:
             _LOGGER.warning(f'{self.alias}, {self.unique_id}: invalid update by invalid channels {self.channels}')
             return False
 
+        ## all the units of the bus from one bulk read
+        bus = self._daikin_bus()
+        if bus.snapshot() and (fields := bus.fields(self.AC_id)):
+            self._last_attributes.update(self._attributes_from_fields(fields))
+            self._update_temperature_range()
+            _LOGGER.debug(f'{self.alias}, {self.unique_id}: {self.last_attributes}')
+            return True
+
         #:{"code":0,"cmd":"daikin-cmd","target-id":"0000d01411b011e5:1","action":"query","id":0,"response":[{"power":1},{"fan-direction":0},{"fan-volume":1},{"temperature":267},{"operation-mode":2},{"operation-status":2},{"heat-master":2},{"target-temperature":230},{"err_code":0},{"sensor_status":32768}]}:#
         target_id = util.make_target_id(self.MAC, self.channels['default'])
         command = util.make_cmd("daikin-cmd", target_id=target_id, action="query", id=self.AC_id)
@@ -376,10 +586,7 @@ class CYLClimate(IOThings,
                 self._last_attributes['heat_master'] = self.inv_heat_master.get(int(response_dict.get("heat-master")))
                 update_ret = True
 
-            if self._last_attributes['mode'] not in self._Temp_range_config:
-                self._Temp_range = self._Temp_range_config.get(self._model)
-            else:
-                self._Temp_range = self._Temp_range_config.get(self._last_attributes['mode'])
+            self._update_temperature_range()
 
         if update_ret is False:
             _LOGGER.error(f'{self.alias}, {self.unique_id}: {ret}, {out}')
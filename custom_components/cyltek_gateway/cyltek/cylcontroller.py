@@ -1,8 +1,14 @@
 import logging
+import threading
 import time
 from abc import ABC, abstractmethod
 
 from . import util
+from .cylasynctelnet import CYLAsyncTelnet
+from .cylavailability import CYLAvailability, Liveness
+from .cylbreaker import CYLCircuitBreaker
+from .cylbus import CYLBusScheduler, bus_priority
+from .cylprobe import CYLProbe
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -26,6 +32,7 @@ class CYLController(ABC):
         }
 
     PORT: int = 9528
+    CLOSE_TIMEOUT: float = 3
 
     def __init__(self,
                  MAC: str="",
@@ -49,6 +56,14 @@ class CYLController(ABC):
             self._host = ip
 
         self._alias = self._MAC
+        self._availability = CYLAvailability()
+        self._probe = CYLProbe(self._host, self._port)
+        self._breaker = CYLCircuitBreaker()
+        self._recovery_thread = None
+        self._stop_recovery = threading.Event()
+        self._closed = False
+        self._buses = {}  # target-id: CYLBusScheduler of the RS-485 bus behind the endpoint
+        self._buses_lock = threading.Lock()
         pass
 
 
@@ -72,12 +87,17 @@ class CYLController(ABC):
     def port(self):
         return self._port
 
+    @property
+    def availability(self):
+        return self._availability
+
 
     def try_connect(self):
         dut = util.waitUntilConnect(self.host, self.port)
         if (dut is None):
             _LOGGER.warning(f'{self.host}:{self.port} dut is None')
             return False
+        dut.close()
         # command = util.make_cmd("bye")
         # ret, out = self.send_cmd(command)
         # dut.close()
@@ -86,6 +106,129 @@ class CYLController(ABC):
         # return ret
         return True
 
+    def is_available(self):
+        """Liveness of the gateway shared by all its things, probed at most once per interval."""
+        if self._availability.begin_probe():
+            if self._availability.record(self._try_connect_guarded()) and self._availability.state == Liveness.Offline:
+                self.ping()
+        return self._availability.is_available
+
+    async def async_is_available(self):
+        """is_available() from the event loop."""
+        if self._availability.begin_probe():
+            if self._availability.record(await self._async_try_connect_guarded()) and self._availability.state == Liveness.Offline:
+                await self.async_ping()
+        return self._availability.is_available
+
+    def _try_connect_guarded(self):
+        if not (permit := self._breaker.allow()):
+            return False
+        try:
+            ok = self.try_connect()
+            self._record_breaker(ok, permit)
+            return ok
+        finally:
+            self._breaker.release(permit)
+
+    async def _async_try_connect_guarded(self):
+        if not (permit := self._breaker.allow()):
+            return False
+        try:
+            ok = await self.async_try_connect()
+            self._record_breaker(ok, permit)
+            return ok
+        finally:
+            self._breaker.release(permit)
+
+    @property
+    def probe(self):
+        return self._probe
+
+    @property
+    def breaker(self):
+        return self._breaker
+
+    def bus(self, target_id: str) -> CYLBusScheduler:
+        """The scheduler of the RS-485 bus behind the target endpoint."""
+        with self._buses_lock:
+            if target_id not in self._buses:
+                self._buses[target_id] = CYLBusScheduler(f'{self.alias} {target_id}')
+            return self._buses[target_id]
+
+    def bus_metrics(self) -> dict:
+        return {target_id: bus.as_dict() for target_id, bus in self._buses.items()}
+
+    def _bus_for(self, cmd: str):
+        """(scheduler, priority) of a command which goes on a bus, (None, None) otherwise."""
+        command = util.content9528_to_dict(cmd)
+        priority = bus_priority(command)
+        if priority is None or not command.get('target-id'):
+            return (None, None)
+        return (self.bus(command['target-id']), priority)
+
+    @staticmethod
+    def _is_transport_failure(result) -> bool:
+        """The gateway is unreachable or did not answer at all."""
+        if result is None:
+            return True
+        ret, out = result
+        return ret is False and isinstance(out, dict) and out.get("err_code") in (1, -1, -2)
+
+    def _record_breaker(self, ok: bool, permit):
+        if self._breaker.record(ok, permit):
+            _LOGGER.warning(f'{self.host}:{self.port} is unreachable, commands fail fast until it answers again')
+            self._start_recovery_probe()
+
+    def _start_recovery_probe(self):
+        if self._closed:
+            return
+        if self._recovery_thread is not None and self._recovery_thread.is_alive():
+            return
+        self._recovery_thread = threading.Thread(target=self._recovery_probe, name=f'cyltek-probe-{self.MAC}', daemon=True)
+        self._recovery_thread.start()
+
+    def _recovery_probe(self):
+        """Probe the 9528 port in the background while the breaker is open, half-open it once the port answers."""
+        while not self._stop_recovery.wait(CYLCircuitBreaker.PROBE_INTERVAL):
+            if not self._breaker.is_open:
+                return
+            if self._probe.probe().tcp_rtt is not None:
+                _LOGGER.debug(f'{self.host}:{self.port} answers again after {self._breaker.opened_for:.1f}s')
+                self._breaker.half_open()
+                return
+
+    def close(self):
+        """Stop the background probe, it is not started again."""
+        self._closed = True
+        self._stop_recovery.set()
+        thread = self._recovery_thread
+        if thread is not None and thread is not threading.current_thread():
+            ## a probe in progress ends within its timeouts
+            thread.join(CYLController.CLOSE_TIMEOUT)
+
+    def ping(self):
+        """Check the gateway is reachable at all, the result is shared for a few seconds."""
+        result = self._probe.probe()
+        _LOGGER.warning(f'{self.host}, {self.alias}, PROBE: {result}')
+        return result.reachable
+
+    async def async_ping(self):
+        """ping() from the event loop."""
+        result = await self._probe.async_probe()
+        _LOGGER.warning(f'{self.host}, {self.alias}, PROBE: {result}')
+        return result.reachable
+
+    def _sends(self, cmd: str, just_send: bool = False, **kwargs):
+        """Send over a new connection, return None if the host is unreachable."""
+        dut = util.waitUntilConnect(self.host, self.port)
+        if (dut is None):
+            return None
+
+        try:
+            return dut.sends(cmd, just_send, **kwargs)
+        finally:
+            dut.close()
+
     def send_cmd(self, cmd: str,
                        just_send: bool = False,
                        timeout: float = 3,
@@ -93,37 +236,132 @@ class CYLController(ABC):
                        expect_string: str = ':#',
                        read_until: bool = False,
                        encoding: str = 'utf-8'):
+        """Send a command, the ones for a serial bus wait for their turn on it."""
+
+        bus, priority = self._bus_for(cmd)
+        if bus is None:
+            return self._send_cmd(cmd, just_send, timeout, resend, expect_string, read_until, encoding)
+
+        if not bus.acquire(priority, timeout):
+            return (False, CYLBusScheduler.BUSY_REASON)
+        try:
+            return self._send_cmd(cmd, just_send, timeout, resend, expect_string, read_until, encoding)
+        finally:
+            bus.release()
+
+    def _send_cmd(self, cmd, just_send, timeout, resend, expect_string, read_until, encoding):
+        if not (permit := self._breaker.allow()):
+            return (False, CYLCircuitBreaker.REJECT_REASON)
+        ## a trial which ends without an outcome, e.g. on an exception, is given back
+        try:
+            return self._send_cmd_permitted(permit, cmd, just_send, timeout, resend, expect_string, read_until, encoding)
+        finally:
+            self._breaker.release(permit)
 
+    def _send_cmd_permitted(self, permit, cmd, just_send, timeout, resend, expect_string, read_until, encoding):
         start_time = time.time()
         msg = "timeout"
         out = dict()
         ret = True
         while (time.time() - start_time < timeout):
-            dut = util.waitUntilConnect(self.host, self.port)
-            if (dut is None):
+            result = self._sends(cmd, just_send, timeout=timeout, expect_string=expect_string, read_until=read_until, encoding=encoding)
+            self._record_breaker(not self._is_transport_failure(result), permit)
+            if (result is None):
                 return (False, msg)
-            
-            ret, out = dut.sends(cmd, just_send, timeout=timeout, expect_string=expect_string, read_until=read_until, encoding=encoding)
 
-            dut.close()
+            ret, out = result
             if ret and just_send:
                 return (True, out)
 
-            is_sync = True
-            input_cmd = util.content9528_to_dict(cmd)
-            if ret:
-                if out.get('target-id') != input_cmd.get('target-id')\
-                   or out.get("cmd") != input_cmd.get("cmd")\
-                   or out.get("attr") != input_cmd.get("attr"):
-                    is_sync = False
-            
-            if ret and is_sync:
-                if out.get('code') == 0:
-                    return (True, out)
-            else:
-                _LOGGER.warning(f'ret: {ret}, is_sync: {is_sync}, in: {str(input_cmd)}, out: {out}')
+            if self._check_response(cmd, ret, out):
+                return (True, out)
+
+            if resend is False or self._breaker.is_open:
+                break
+
+        return (False, out)
+
+    def _check_response(self, cmd: str, ret: bool, out) -> bool:
+        """The response is a success and belongs to the cmd."""
+        is_sync = True
+        input_cmd = util.content9528_to_dict(cmd)
+        if ret:
+            if out.get('target-id') != input_cmd.get('target-id')\
+               or out.get("cmd") != input_cmd.get("cmd")\
+               or out.get("attr") != input_cmd.get("attr"):
+                is_sync = False
+
+        if ret and is_sync:
+            return out.get('code') == 0
+
+        _LOGGER.warning(f'ret: {ret}, is_sync: {is_sync}, in: {str(input_cmd)}, out: {out}')
+        return False
+
+    async def async_try_connect(self):
+        dut = CYLAsyncTelnet(self.host, self.port)
+        if not await dut.connect():
+            _LOGGER.warning(f'{self.host}:{self.port} dut is None')
+            return False
+        await dut.close()
+        return True
+
+    async def _async_sends(self, cmd: str, just_send: bool = False, **kwargs):
+        """Send over a new connection, return None if the host is unreachable."""
+        dut = CYLAsyncTelnet(self.host, self.port)
+        if not await dut.connect():
+            return None
+
+        try:
+            return await dut.sends(cmd, just_send, **kwargs)
+        finally:
+            await dut.close()
+
+    async def async_send_cmd(self, cmd: str,
+                                   just_send: bool = False,
+                                   timeout: float = 3,
+                                   resend: bool = False,
+                                   encoding: str = 'utf-8'):
+        """send_cmd() on the event loop, no executor thread is held while waiting."""
+
+        bus, priority = self._bus_for(cmd)
+        if bus is None:
+            return await self._async_send_cmd(cmd, just_send, timeout, resend, encoding)
+
+        ## the bus is shared with executor threads, the releasing one wakes the loop
+        if not await bus.async_acquire(priority, timeout):
+            return (False, CYLBusScheduler.BUSY_REASON)
+        try:
+            return await self._async_send_cmd(cmd, just_send, timeout, resend, encoding)
+        finally:
+            bus.release()
+
+    async def _async_send_cmd(self, cmd, just_send, timeout, resend, encoding):
+        if not (permit := self._breaker.allow()):
+            return (False, CYLCircuitBreaker.REJECT_REASON)
+        ## a trial which ends without an outcome, e.g. cancelled, is given back
+        try:
+            return await self._async_send_cmd_permitted(permit, cmd, just_send, timeout, resend, encoding)
+        finally:
+            self._breaker.release(permit)
+
+    async def _async_send_cmd_permitted(self, permit, cmd, just_send, timeout, resend, encoding):
+        start_time = time.time()
+        msg = "timeout"
+        out = dict()
+        while (time.time() - start_time < timeout):
+            result = await self._async_sends(cmd, just_send, timeout=timeout, encoding=encoding)
+            self._record_breaker(not self._is_transport_failure(result), permit)
+            if (result is None):
+                return (False, msg)
+
+            ret, out = result
+            if ret and just_send:
+                return (True, out)
+
+            if self._check_response(cmd, ret, out):
+                return (True, out)
 
-            if resend is False:
+            if resend is False or self._breaker.is_open:
                 break
 
         return (False, out)
\ No newline at end of file
@@ -1,7 +1,13 @@
+import asyncio
 import logging
+import time
+from typing import Callable, Dict, Iterable, List, Optional
 
 from . import util
+from .cylasynctelnet import CYLAsyncTelnet
 from .cylcontroller import CYLController
+from .cylpool import CYLConnectionPool
+from .cylpulse import CYLPulsePlayer, CYLPulseStep
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -11,20 +17,117 @@ class CYLControllerEx(CYLController):
     def __init__(self,
                  MAC: str,
                  ip: str="",
-                 internet: str='eth0') -> None:
-        """Initialize device."""
+                 internet: str='eth0',
+                 bootstrap: bool=True) -> None:
+        """Initialize device, bootstrap=False leaves the queries to async_bootstrap()."""
         super().__init__(MAC, ip=ip, internet=internet)
 
         self._config = {}
         self._capabilities = {}
+        self._devices = {}      # target-id: device of the enumerate result
+        self._attrs = set()     # (target-id, attr) of the enumerate result
         self._model_id = "UNKNOWN"
+        self._pool = CYLConnectionPool(self.host, self.port)
+        self._async_session = CYLAsyncTelnet(self.host, self.port, on_unsolicited=self._dispatch_notification)
+        self._async_lock = asyncio.Lock()
+        self._listener = CYLAsyncTelnet(self.host, self.port, on_unsolicited=self._dispatch_notification)
+        self._subscribers: Dict[str, List[Callable[[dict], None]]] = {}  # target-id: callbacks
+        self._last_notification = None  # monotonic time of the last report
+        self._pulse_player = CYLPulsePlayer(self)
+
+        self._bootstrap_timings = {}  # phase: seconds
 
         self.init_ret = False
 
-        if (self.try_connect()):
-            self.init_ret = self.update_config() and self.update_capabilities() and self.update_model_id()
+        if bootstrap:
+            start_time = time.monotonic()
+            if self._timed("connect", self.try_connect):
+                self.init_ret = self._timed("configure", self.update_config) \
+                                and self._timed("enumerate", self.update_capabilities) \
+                                and self._timed("model-id", self.update_model_id)
+            self._bootstrap_timings["total"] = round(time.monotonic() - start_time, 3)
         pass
 
+    @staticmethod
+    async def async_create(MAC: str, ip: str="", internet: str='eth0') -> "CYLControllerEx":
+        """Build a controller and bootstrap it on the event loop."""
+        controller = CYLControllerEx(MAC, ip=ip, internet=internet, bootstrap=False)
+        await controller.async_bootstrap()
+        return controller
+
+    @staticmethod
+    def from_snapshot(MAC: str, snapshot: dict, ip: str="", internet: str='eth0') -> "CYLControllerEx":
+        """Build a controller from a snapshot of an earlier bootstrap, nothing is queried."""
+        controller = CYLControllerEx(MAC, ip=ip, internet=internet, bootstrap=False)
+        controller.restore(snapshot)
+        controller.init_ret = True
+        return controller
+
+    def snapshot(self) -> dict:
+        """What the bootstrap learned of the gateway, to be cached."""
+        return {
+            "server-version": self._config.get("server-version"),
+            "config": self._config,
+            "capabilities": self._capabilities,
+            "model_id": self._model_id,
+        }
+
+    def restore(self, snapshot: dict) -> None:
+        self._config = snapshot.get("config", self._config)
+        self._set_capabilities(snapshot.get("capabilities", self._capabilities))
+        self._model_id = snapshot.get("model_id", self._model_id)
+
+    async def async_revalidate(self) -> List[str]:
+        """Bootstrap again, keep what did not change, return the names of the parts which changed.
+
+        A new server-version replaces the whole snapshot, every part counts as changed.
+        """
+        cached, init_ret = self.snapshot(), self.init_ret
+        if not await self.async_bootstrap():
+            ## keep serving the snapshot, the gateway answers later
+            self.restore(cached)
+            self.init_ret = init_ret
+            return []
+
+        fresh = self.snapshot()
+        if fresh["server-version"] != cached["server-version"]:
+            ## the snapshot of another firmware is dropped as a whole
+            _LOGGER.info(f'{self.alias}: server-version {cached["server-version"]} -> {fresh["server-version"]}, cache dropped')
+            return ["server-version", "config", "capabilities", "model_id"]
+
+        changed = [key for key in ("config", "capabilities", "model_id") if fresh[key] != cached[key]]
+        self.restore({**cached, **{key: fresh[key] for key in changed}})
+        return changed
+
+    async def async_bootstrap(self) -> bool:
+        """Query configure, enumerate and model-id at once, pipelined over the async session."""
+        start_time = time.monotonic()
+        try:
+            if not await self._async_timed("connect", self.async_try_connect()):
+                return False
+            results = await asyncio.gather(self._async_timed("configure", self.async_update_config()),
+                                           self._async_timed("enumerate", self.async_update_capabilities()),
+                                           self._async_timed("model-id", self.async_update_model_id()))
+            self.init_ret = all(results)
+            return self.init_ret
+        finally:
+            self._bootstrap_timings["total"] = round(time.monotonic() - start_time, 3)
+            _LOGGER.debug(f'{self.alias} bootstrap: {self.init_ret}, timings: {self._bootstrap_timings}')
+
+    def _timed(self, phase: str, func: Callable):
+        start_time = time.monotonic()
+        try:
+            return func()
+        finally:
+            self._bootstrap_timings[phase] = round(time.monotonic() - start_time, 3)
+
+    async def _async_timed(self, phase: str, coro):
+        start_time = time.monotonic()
+        try:
+            return await coro
+        finally:
+            self._bootstrap_timings[phase] = round(time.monotonic() - start_time, 3)
+
     @property
     def model(self):
         return f"{self._model_id}, {self.config.get('product-id')}"
@@ -41,6 +144,125 @@ class CYLControllerEx(CYLController):
     def capabilities(self):
         return self._capabilities
 
+    @property
+    def pool(self):
+        return self._pool
+
+    @property
+    def listener(self):
+        return self._listener
+
+    @property
+    def is_listening(self):
+        return self._listener.is_connected()
+
+    @property
+    def last_notification(self) -> Optional[float]:
+        """time.monotonic() of the last report of the gateway, None if none came yet."""
+        return self._last_notification
+
+    @property
+    def bootstrap_timings(self):
+        """Seconds taken by every phase of the last bootstrap."""
+        return self._bootstrap_timings
+
+    @property
+    def pulse_player(self):
+        return self._pulse_player
+
+    # @override(CYLController)
+    def try_connect(self):
+        dut, _ = self._pool.acquire()
+        if (dut is None):
+            _LOGGER.warning(f'{self.host}:{self.port} dut is None')
+            return False
+        self._pool.release(dut)
+        return True
+
+    # @override(CYLController)
+    def _sends(self, cmd: str, just_send: bool = False, **kwargs):
+        return self._pool.sends(cmd, just_send, **kwargs)
+
+    # @override(CYLController)
+    async def async_try_connect(self):
+        async with self._async_lock:
+            if self._async_session.is_connected() or await self._async_session.connect():
+                return True
+        _LOGGER.warning(f'{self.host}:{self.port} dut is None')
+        return False
+
+    # @override(CYLController)
+    async def _async_sends(self, cmd: str, just_send: bool = False, **kwargs):
+        """Pipeline the command on the long-lived session, responses are correlated by the session."""
+        async with self._async_lock:
+            reused = self._async_session.is_connected()
+            if not reused and not await self._async_session.connect():
+                return None
+
+        ret, out = await self._async_session.sends(cmd, just_send, **kwargs)
+        if ret is False and reused and out.get("err_code") in (-1, -2):
+            ## the long-lived session went stale, reconnect once
+            _LOGGER.debug(f'{self.host}:{self.port} reconnect stale session, out: {out}')
+            async with self._async_lock:
+                if not self._async_session.is_connected() and not await self._async_session.connect():
+                    return None
+            ret, out = await self._async_session.sends(cmd, just_send, **kwargs)
+
+        ## reports which arrived while the request was waiting
+        if ret is True and isinstance(out, dict):
+            for frame in out.get('other', []):
+                self._dispatch_notification(frame)
+        return (ret, out)
+
+    async def async_play_group(self, sequences: List[List[CYLPulseStep]]) -> List[bool]:
+        """Play the signal sequences of several things as one, return the result of each.
+
+        The switch-on frames of all sequences go out back to back, the shared
+        gap is waited once and then all switch-off frames go out.
+        """
+        return await self._pulse_player.async_play_group([CYLPulsePlayer.timeline(steps) for steps in sequences])
+
+    def subscribe(self, target_ids: Iterable[str], callback: Callable[[dict], None]) -> Callable[[], None]:
+        """Call callback with every unsolicited frame of the target ids, return the function to unsubscribe."""
+        target_ids = set(target_ids)
+        for target_id in target_ids:
+            self._subscribers.setdefault(target_id, []).append(callback)
+
+        def unsubscribe():
+            for target_id in target_ids:
+                callbacks = self._subscribers.get(target_id, [])
+                if callback in callbacks:
+                    callbacks.remove(callback)
+                if not callbacks:
+                    self._subscribers.pop(target_id, None)
+
+        return unsubscribe
+
+    def _dispatch_notification(self, frame: dict) -> None:
+        self._last_notification = time.monotonic()
+        for callback in list(self._subscribers.get(frame.get('target-id'), [])):
+            try:
+                callback(frame)
+            except Exception as e:
+                _LOGGER.warning(f'{self.host}:{self.port} notification callback raised {type(e).__name__}: {str(e)}, frame: {frame}')
+
+    async def async_start_listening(self):
+        """Keep the listener session open, the gateway reports attribute changes on it."""
+        if self._listener.is_connected():
+            return True
+        if await self._listener.connect():
+            _LOGGER.debug(f'{self.host}:{self.port} listening for notifications')
+            return True
+        return False
+
+    # @override(CYLController)
+    def close(self):
+        """Close all the pooled connections."""
+        super().close()
+        self._pool.close()
+        self._async_session.abort()
+        self._listener.abort()
+
 
     def update_config(self):
         res, out = self.send_cmd(util.make_cmd(cmd="configure", pretty_print=False), timeout=3, just_send=False)
@@ -49,10 +271,34 @@ class CYLControllerEx(CYLController):
         
         return res
 
+    def _set_capabilities(self, capabilities: dict) -> None:
+        """Take the enumerate result and index it, the index is rebuilt only when it changed."""
+        if capabilities == self._capabilities:
+            return
+        self._capabilities = capabilities
+
+        devices = {}
+        attrs = set()
+        if capabilities.get("code") == 0:
+            for device in capabilities.get("devices", []):
+                devices[device['id']] = device
+                attrs.update((device['id'], a['attr']) for a in device.get("attrs", []))
+        self._devices, self._attrs = devices, attrs
+
+    def device(self, target_id: str) -> Optional[dict]:
+        """The enumerated device of the target id, None if it is unknown."""
+        return self._devices.get(target_id)
+
+    def supports(self, target_id: str, attr: str) -> Optional[bool]:
+        """Whether the device of the target id has the attr, None if the gateway was not enumerated."""
+        if not self._devices:
+            return None
+        return (target_id, attr) in self._attrs
+
     def update_capabilities(self):
         res, out = self.send_cmd(util.make_cmd(cmd="enumerate", refresh=False), timeout=10, read_until=True, just_send=False)
         if res:
-            self._capabilities = out
+            self._set_capabilities(out)
         
         return res
 
@@ -63,3 +309,26 @@ class CYLControllerEx(CYLController):
             self._model_id = out.get('value')
         
         return res
+
+    async def async_update_config(self):
+        res, out = await self.async_send_cmd(util.make_cmd(cmd="configure", pretty_print=False), timeout=3, just_send=False)
+        if res:
+            self._config = out
+
+        return res
+
+    async def async_update_capabilities(self):
+        ## the session reassembles the whole frame, no read_until
+        res, out = await self.async_send_cmd(util.make_cmd(cmd="enumerate", refresh=False), timeout=10, just_send=False)
+        if res:
+            self._set_capabilities(out)
+
+        return res
+
+    async def async_update_model_id(self):
+        target_id = util.make_target_id(self.MAC, channel=1)
+        res, out = await self.async_send_cmd(util.make_cmd(cmd='read-attr', target_id=target_id, attr='model-id'), just_send=False)
+        if res and out.get('code') == 0:
+            self._model_id = out.get('value')
+
+        return res
@@ -1,17 +1,20 @@
+import asyncio
 import logging
 import os
 import time
+from functools import partial
 
 from . import COMPONENT_ABS_DIR
 from . import globalvar as gl
 from . import util
 from .cylcontroller_ex import CYLControllerEx
+from .cylpulse import CYLPulseStep
 from .enums import StrEnum
 from .IOThings import IOThings
 
 _LOGGER = logging.getLogger(__name__)
 
-def create_cylcover(MAC, config_name, channels, internet="eth0", auto_on=False, model=None):
+def create_cylcover(MAC, config_name, channels, internet="eth0", auto_on=False, model=None, travel_time=None):
     controllers_map = gl.get_controllers_map()
     if controllers_map.get(MAC) is None:
         controllers_map[MAC] = CYLControllerEx(MAC, internet=internet)
@@ -26,10 +29,19 @@ def create_cylcover(MAC, config_name, channels, internet="eth0", auto_on=False,
     json_path = os.path.join(json_absdir, json_filename)
 
     if (config := util.load_config_json(json_path)):
+        ## the travel times measured for this cover win over the profile
+        if travel_time:
+            config = {**config, "travel_time": travel_time}
         return CYLCover(controllers_map[MAC], config, channels, auto_on, model)
     
     return None
 
+async def async_create_cylcover(MAC, config_name, channels, internet="eth0", auto_on=False, model=None, travel_time=None):
+    """create_cylcover off the event loop, the controller of the MAC is built once for all callers"""
+    await gl.async_get_controller(MAC, partial(CYLControllerEx.async_create, MAC, internet=internet))
+    return await asyncio.get_running_loop().run_in_executor(None, partial(create_cylcover, MAC, config_name, channels, internet, auto_on, model, travel_time))
+
+
 class CoverState(StrEnum):
     """Type of Humidifier to control."""
     Open = 'opened'
@@ -52,8 +64,111 @@ class CoverType(StrEnum):
     Window = 'window'
 
 
+class CYLTravelModel(object):
+    """Dead reckoning of a cover position, 0 is closed and 100 open.
+
+    The position moves linearly with the time since the cover started,
+    at the speed of its full open or close travel time. It is opt-in: the
+    seconds measured for a full travel of the motor of an installation are
+    given with the cover in the integrations UI or yaml, or in its profile,
+        "travel_time": {"open": 22.5, "close": 21}
+    and a cover without them has no position estimate. A cover which
+    starts from an unknown position is taken to start from the far end,
+    so a full travel always ends at the end stop.
+    """
+
+    def __init__(self, open_time: float, close_time: float, position: float = None) -> None:
+        self.open_time = open_time
+        self.close_time = close_time
+        self._position = position  # at _since
+        self._direction = 0        # 1 opening, -1 closing
+        self._since = time.monotonic()
+
+    @staticmethod
+    def from_config(config: dict):
+        """The model of the profile, None if it has no travel times."""
+        travel = config.get("travel_time")
+        if not travel:
+            return None
+        return CYLTravelModel(float(travel["open"]), float(travel["close"]))
+
+    def _estimate(self, now: float):
+        if self._direction == 0 or self._position is None:
+            return self._position
+        travel = self.open_time if self._direction > 0 else self.close_time
+        position = self._position + self._direction * (now - self._since) / travel * 100
+        return min(100.0, max(0.0, position))
+
+    def _settle(self, now: float) -> None:
+        self._position = self._estimate(now)
+        self._since = now
+        if self._direction and self._position == (100 if self._direction > 0 else 0):
+            self._direction = 0  # at the end stop
+
+    @property
+    def position(self):
+        """The estimated position right now, None if it is unknown."""
+        self._settle(time.monotonic())
+        return None if self._position is None else int(round(self._position))
+
+    @property
+    def is_moving(self) -> bool:
+        self._settle(time.monotonic())
+        return self._direction != 0
+
+    @property
+    def state(self):
+        self._settle(time.monotonic())
+        if self._direction > 0:
+            return CoverState.Opening
+        if self._direction < 0:
+            return CoverState.Closing
+        if self._position is None:
+            return None
+        return CoverState.Closed if self._position == 0 else CoverState.Open
+
+    def start(self, direction: int) -> None:
+        now = time.monotonic()
+        self._settle(now)
+        if self._position is None:
+            self._position = 0.0 if direction > 0 else 100.0
+        self._direction = direction
+
+    def stop(self) -> None:
+        self._settle(time.monotonic())
+        self._direction = 0
+
+    def time_to(self, target: float):
+        """(direction, seconds) of the travel from the estimated position to the target."""
+        position = self.position
+        if position is None:
+            position = 0 if target > 50 else 100
+        if target == position:
+            return (0, 0)
+        direction = 1 if target > position else -1
+        travel = self.open_time if direction > 0 else self.close_time
+        return (direction, abs(target - position) / 100 * travel)
+
+    def restore(self, position: float) -> None:
+        """Start from a position saved before a restart."""
+        self._position = float(position)
+        self._direction = 0
+        self._since = time.monotonic()
+
+
 class SignalGenerator():
-    
+    """Play the signal sequences of a cover, e.g. a pulse on the open relay.
+
+    A sequence is compiled once into its switch-on/switch-off frames and
+    gaps, the async player of the controller plays it together with the
+    sequences of the other covers started at the same time.
+    """
+
+    EDGE_COMMANDS = {
+        "Hight": "switch-on",
+        "Low":   "switch-off",
+    }
+
     def __init__(
             self,
             cyl_controller: CYLControllerEx,
@@ -61,6 +176,7 @@ class SignalGenerator():
         ) -> None:
         self._cyl_controller = cyl_controller
         self._channels = channels
+        self._sequences = {}  # operation key: compiled steps
         self.signal_dict = {
             "Hight":self.Signal_Hight,
             "Low":  self.Signal_Low,
@@ -100,6 +216,37 @@ class SignalGenerator():
                 ret &= self.signal_dict.get(s.get("signal"))(s)
         return ret
 
+    def compile(self, operation_key, signals):
+        """The steps of the sequence, None if an edge is on a channel the cover does not have."""
+        if operation_key in self._sequences:
+            return self._sequences[operation_key]
+
+        steps = []
+        for s in signals:
+            signal = s.get("signal")
+            if signal == "Sleep":
+                ## "time_us" holds milliseconds
+                steps.append(CYLPulseStep(gap=float(s.get("time_us"))/1000))
+            elif signal in SignalGenerator.EDGE_COMMANDS:
+                channel = self._channels.get(s.get("channel_key") or operation_key)
+                if channel is None:
+                    return None
+                target_id = util.make_target_id(self._cyl_controller.MAC, channel)
+                steps.append(CYLPulseStep(command=util.make_cmd(SignalGenerator.EDGE_COMMANDS[signal], target_id=target_id)))
+
+        self._sequences[operation_key] = steps
+        return steps
+
+    async def async_play(self, operation_key, signals):
+        """Play the sequence on the event loop, no thread is held during the gaps."""
+        steps = self.compile(operation_key, signals)
+        if steps is None:
+            return False
+        ret = await self._cyl_controller.pulse_player.async_play(steps)
+        if not ret:
+            _LOGGER.warning(f'{self._cyl_controller.alias}, {operation_key}: failed')
+        return ret
+
 class CYLCover(IOThings):
 
     def __init__(
@@ -116,6 +263,9 @@ class CYLCover(IOThings):
 
         self._signal_generator = SignalGenerator(cyl_controller, channels)
         self._config = config
+        ## without a level channel the position comes from the travel times
+        self._travel = CYLTravelModel.from_config(config) if channels.get('level', 0) <= 0 else None
+        self._positioning = None  # timed stop of a set_position
 
         self._offline_retry = 0
 
@@ -127,14 +277,48 @@ class CYLCover(IOThings):
     def update_attributes(self):
         return self.update_position()
 
+    # @override(IOThings)
+    def _notification_attributes(self):
+        if self.channels['level'] <= 0:
+            return {}
+        return {(util.make_target_id(self.MAC, self.channels['level']), 'current-level'): 'position'}
+
     @property
     def position(self):
+        if self._travel:
+            return self._travel.position
         return self.get_last_attribute('position')
 
     @property
     def state(self):
+        if self._travel:
+            return self._travel.state
         return self.get_last_attribute('state')
 
+    @property
+    def travel(self):
+        return self._travel
+
+    @property
+    def is_moving(self):
+        return self._travel is not None and self._travel.is_moving
+
+    @property
+    def supports_set_position(self):
+        return self.channels['level'] != 0 or (self._travel is not None and self.channels['stop'] != 0)
+
+    def restore_position(self, position):
+        if self._travel and position is not None:
+            self._travel.restore(position)
+
+    def _travel_start(self, direction):
+        if self._travel is None:
+            return
+        if direction:
+            self._travel.start(direction)
+        else:
+            self._travel.stop()
+
     def open(self):
         """Open the cover."""
         if self.channels['open'] == 0:
@@ -144,6 +328,7 @@ class CYLCover(IOThings):
         ret = self._signal_generator('open', signals)
         if ret:
             self._last_attributes['state'] = CoverState.Opening
+            self._travel_start(1)
         return ret
 
     def close(self):
@@ -155,6 +340,7 @@ class CYLCover(IOThings):
         ret = self._signal_generator('close', signals)
         if ret:
             self._last_attributes['state'] = CoverState.Closing
+            self._travel_start(-1)
         return ret
 
     def stop(self):
@@ -166,8 +352,75 @@ class CYLCover(IOThings):
         ret = self._signal_generator('stop', signals)
         if ret:
             self._last_attributes['state'] = None
+            self._travel_start(0)
         return ret
 
+    def _cancel_positioning(self):
+        if self._positioning is not None:
+            self._positioning.cancel()
+            self._positioning = None
+
+    # @override(IOThings)
+    def shutdown(self):
+        """A pending timed stop must not pulse the stop relay after the cover is removed."""
+        self._cancel_positioning()
+
+    async def _async_play(self, operation, state, direction):
+        """Play the operation, the travel model starts with its first edge."""
+        self._travel_start(direction)
+        ret = await self._signal_generator.async_play(operation, self._config["operation_signals"][operation])
+        if ret:
+            self._last_attributes['state'] = state
+        elif self._travel:
+            ## nothing moved
+            self._travel.stop()
+        return ret
+
+    async def async_open(self):
+        """open() with the async signal player."""
+        if self.channels['open'] == 0:
+            return False
+        self._cancel_positioning()
+        return await self._async_play('open', CoverState.Opening, 1)
+
+    async def async_close(self):
+        """close() with the async signal player."""
+        if self.channels['close'] == 0:
+            return False
+        self._cancel_positioning()
+        return await self._async_play('close', CoverState.Closing, -1)
+
+    async def async_stop(self):
+        """stop() with the async signal player."""
+        if self.channels['stop'] == 0:
+            return False
+        self._cancel_positioning()
+        return await self._async_play('stop', None, 0)
+
+    async def async_set_position(self, position: int):
+        """Move to the position, by the level channel or a timed travel and stop."""
+        if self.channels['level'] != 0:
+            return await asyncio.get_running_loop().run_in_executor(None, self.set_position, position)
+        if not self.supports_set_position:
+            return False
+
+        direction, duration = self._travel.time_to(position)
+        if direction == 0:
+            return True
+
+        ret = await (self.async_open() if direction > 0 else self.async_close())
+        if ret and position not in (0, 100):
+            ## the end stops finish a full travel
+            self._positioning = asyncio.ensure_future(self._async_stop_at(position))
+        return ret
+
+    async def _async_stop_at(self, position):
+        _, duration = self._travel.time_to(position)
+        await asyncio.sleep(duration)
+        self._positioning = None
+        if not await self.async_stop():
+            _LOGGER.warning(f'{self.alias}, failed to stop at {position}')
+
     def update_position(self):
         channel = self.channels['level']
         if channel <= 0:
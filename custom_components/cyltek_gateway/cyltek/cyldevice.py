@@ -44,45 +44,62 @@ class CYLOnOffDevice(IOThings, IPower):
     def update_attributes(self):
         return self.update_power()
 
-    # @override(IPower)
-    def update_power(self):
-        channel = self.channels['on-off']
-        if channel == 0:
-            return False
+    # @override(IOThings)
+    async def async_update_attributes(self):
+        return await self.async_update_power()
 
-        target_id = util.make_target_id(self.MAC, channel)
-        cmd = util.make_cmd('read-attr', target_id=target_id, attr='on-off-state')
-        ret, out = self._cyl_controller.send_cmd(cmd, False)
+    # @override(IOThings)
+    def _notification_attributes(self):
+        if self.channels['on-off'] == 0:
+            return {}
+        return {(util.make_target_id(self.MAC, self.channels['on-off']), 'on-off-state'): 'power'}
 
-        if ret is True:
-            self._offline_retry = 0
+    def _power_query_cmd(self):
+        target_id = util.make_target_id(self.MAC, self.channels['on-off'])
+        return util.make_cmd('read-attr', target_id=target_id, attr='on-off-state')
 
-            if out.get('value') != None:
-                self._last_attributes['power'] = out['value']
-        else:
-            _LOGGER.warning(f'{self.alias} {self.unique_id}, Failed to get on-off-state')
+    def _switch_cmd(self, cmd: str):
+        target_id = util.make_target_id(self.MAC, self.channels['on-off'])
+        return util.make_cmd(cmd, target_id=target_id)
 
-            if self._offline_retry >= 3:
-                return False
+    # @override(IPower)
+    def update_power(self):
+        if self.channels['on-off'] == 0:
+            return False
 
-            if isinstance (out, dict) and out.get('code') == 13 and out.get('reason') == 'device offline(unavailable)':
-                _LOGGER.warning(f'{self.alias}, {self.MAC} device offline(unavailable) send enumerate !')
-                self._cyl_controller.send_cmd(util.make_cmd("enumerate", refresh=True), True)
-                self._offline_retry += 1
-            else:
-                return False
+        ret, out = self._cyl_controller.send_cmd(self._power_query_cmd(), False)
+        result = self._apply_read_result('power', 'on-off-state', ret, out)
+        if result is None:
+            self._cyl_controller.send_cmd(util.make_cmd("enumerate", refresh=True), True)
+            return True
+        return result
+
+    async def async_update_power(self):
+        if self.channels['on-off'] == 0:
+            return False
 
-        return True
+        ret, out = await self._cyl_controller.async_send_cmd(self._power_query_cmd(), False)
+        result = self._apply_read_result('power', 'on-off-state', ret, out)
+        if result is None:
+            await self._cyl_controller.async_send_cmd(util.make_cmd("enumerate", refresh=True), True)
+            return True
+        return result
 
     # @override(IPower)
     def turn_on(self):
         if self.channels['on-off'] == 0:
             return False
 
-        target_id = util.make_target_id(self.MAC, self.channels['on-off'])
-        command = util.make_cmd("switch-on", target_id=target_id)
+        ret, out = self._cyl_controller.send_cmd(self._switch_cmd("switch-on"), just_send=False)
+        if ret:
+            self._last_attributes['power'] = True
+        return ret
+
+    async def async_turn_on(self):
+        if self.channels['on-off'] == 0:
+            return False
 
-        ret, out = self._cyl_controller.send_cmd(command, just_send=False)
+        ret, out = await self._cyl_controller.async_send_cmd(self._switch_cmd("switch-on"), just_send=False)
         if ret:
             self._last_attributes['power'] = True
         return ret
@@ -92,12 +109,16 @@ class CYLOnOffDevice(IOThings, IPower):
         if self.channels['on-off'] == 0:
             return False
 
-        target_id = util.make_target_id(self.MAC, self.channels['on-off'])
-        command = util.make_cmd("switch-off", target_id=target_id)
-
-        ret, out = self._cyl_controller.send_cmd(command, just_send=False)
+        ret, out = self._cyl_controller.send_cmd(self._switch_cmd("switch-off"), just_send=False)
         if ret:
             self._last_attributes['power'] = False
         return ret
 
+    async def async_turn_off(self):
+        if self.channels['on-off'] == 0:
+            return False
 
+        ret, out = await self._cyl_controller.async_send_cmd(self._switch_cmd("switch-off"), just_send=False)
+        if ret:
+            self._last_attributes['power'] = False
+        return ret
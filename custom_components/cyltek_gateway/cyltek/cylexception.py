@@ -14,3 +14,15 @@ class CYLTekDeviceError(CYLTekException):
     def __init__(self, error):
         self.code = error.get("code")
         self.message = error.get("message")
+
+class CYLTekVerifyError(CYLTekException):
+    """Exception raised when a setting is not read back from the device before the deadline.
+    The unit, the values which still differ as {name: (expected, actual)} and the number
+    of readbacks can be accessed with `id`, `mismatch` and `attempts` variables.
+    """
+
+    def __init__(self, id, mismatch, attempts):
+        super().__init__(f"unit {id} setting not verified after {attempts} readbacks, mismatch: {mismatch}")
+        self.id = id
+        self.mismatch = mismatch
+        self.attempts = attempts
@@ -1,5 +1,7 @@
+import asyncio
 import logging
 import os
+from functools import partial
 
 from . import COMPONENT_ABS_DIR
 from . import globalvar as gl
@@ -31,6 +33,12 @@ def create_cylhumidifier(MAC, Humi_id, config_name, channels, internet="eth0", a
     
     return None
 
+async def async_create_cylhumidifier(MAC, Humi_id, config_name, channels, internet="eth0", auto_on=False, model=None):
+    """create_cylhumidifier off the event loop, the controller of the MAC is built once for all callers"""
+    await gl.async_get_controller(MAC, partial(CYLControllerEx.async_create, MAC, internet=internet))
+    return await asyncio.get_running_loop().run_in_executor(None, partial(create_cylhumidifier, MAC, Humi_id, config_name, channels, internet, auto_on, model))
+
+
 class HumidifierType(StrEnum):
     """Type of Humidifier to control."""
     Humidifier = 'humidifier'
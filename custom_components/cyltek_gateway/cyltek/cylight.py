@@ -1,5 +1,7 @@
+import asyncio
 import logging
 import time
+from functools import partial
 
 from . import globalvar as gl
 from . import util
@@ -17,6 +19,12 @@ def create_cylight(MAC, channels, internet="eth0", auto_on=False, model=None):
     return CYLight(controllers_map[MAC], channels, auto_on, model)
 
 
+async def async_create_cylight(MAC, channels, internet="eth0", auto_on=False, model=None):
+    """create_cylight off the event loop, the controller of the MAC is built once for all callers"""
+    await gl.async_get_controller(MAC, partial(CYLControllerEx.async_create, MAC, internet=internet))
+    return await asyncio.get_running_loop().run_in_executor(None, partial(create_cylight, MAC, channels, internet, auto_on, model))
+
+
 class CYLight(CYLOnOffDevice, IBrightness):
 
     def __init__(
@@ -32,12 +40,9 @@ class CYLight(CYLOnOffDevice, IBrightness):
         self._target_level_update = True
 
         if channel := self.channels['level']:
-            if self._cyl_controller.capabilities.get("code") == 0:
-                device_capabilities = {d['id']: d for d in self._cyl_controller.capabilities["devices"]}
-                target_id = util.make_target_id(self.MAC, channel)
-                attrs = [a['attr'] for a in device_capabilities[target_id]["attrs"]]
-                if 'target-level' not in attrs:
-                    self._target_level_update = False
+            target_id = util.make_target_id(self.MAC, channel)
+            if self._cyl_controller.supports(target_id, 'target-level') is False:
+                self._target_level_update = False
 
     # @override(CYLOnOffDevice)
     def update_attributes(self):
@@ -48,49 +53,69 @@ class CYLight(CYLOnOffDevice, IBrightness):
     def brightness(self):
         return self.get_last_attribute('brightness')
 
+    # @override(CYLOnOffDevice)
+    async def async_update_attributes(self):
+        return await super().async_update_attributes() and await self.async_update_brightness()
+
+    # @override(CYLOnOffDevice)
+    def _notification_attributes(self):
+        routes = super()._notification_attributes()
+        if self.channels['level'] > 0:
+            attr, _ = self._brightness_query()
+            routes[(util.make_target_id(self.MAC, self.channels['level']), attr)] = 'brightness'
+        return routes
+
+    def _brightness_query(self):
+        target_id = util.make_target_id(self.MAC, self.channels['level'])
+        attr = 'target-level' if self._target_level_update else 'current-level'
+        return attr, util.make_cmd('read-attr', target_id=target_id, attr=attr)
+
+    def _brightness_cmd(self, intensity: int):
+        target_id = util.make_target_id(self.MAC, self.channels['level'])
+        return util.make_cmd("level-move-to", target_id=target_id, level=intensity, duration=50)
+
     # @override(IBrightness)
     def update_brightness(self):
-        channel = self.channels['level']
-        if channel <= 0:
+        if self.channels['level'] <= 0:
             return True
 
-        target_id = util.make_target_id(self.MAC, channel)
-        attr = 'target-level' if self._target_level_update else 'current-level'
-        cmd = util.make_cmd('read-attr', target_id=target_id, attr=attr)
+        attr, cmd = self._brightness_query()
         ret, out = self._cyl_controller.send_cmd(cmd, False)
+        result = self._apply_read_result('brightness', attr, ret, out)
+        if result is None:
+            self._cyl_controller.send_cmd(util.make_cmd("enumerate", refresh=True), True)
 
-        if ret is True:
-            self._offline_retry = 0
-            if out.get('value') != None:
-                self._last_attributes['brightness'] = out['value']
-        else:
-            _LOGGER.warning(f'{self.alias}, Failed to get {attr}')
-
-            if self._offline_retry >= 3:
-                return False
-
-            if isinstance (out, dict) and out.get('code') == 13 and out.get('reason') == 'device offline(unavailable)':
-                _LOGGER.warning(f'{self.alias}, {self.MAC} device offline(unavailable) send enumerate !')
-                self._cyl_controller.send_cmd(util.make_cmd("enumerate", refresh=True), True)
-                self._offline_retry += 1
-            else:
-                # if attr == 'target-level':
-                #     if isinstance (out, dict) and out.get('code') == 15 and out.get('reason') == 'unsupported attribute':
-                #         self._target_level_update = False
-                return False
+        _LOGGER.debug(f'{self.alias}, {self.unique_id}: {self.last_attributes}')
+        return result is not False
+
+    async def async_update_brightness(self):
+        if self.channels['level'] <= 0:
+            return True
+
+        attr, cmd = self._brightness_query()
+        ret, out = await self._cyl_controller.async_send_cmd(cmd, False)
+        result = self._apply_read_result('brightness', attr, ret, out)
+        if result is None:
+            await self._cyl_controller.async_send_cmd(util.make_cmd("enumerate", refresh=True), True)
 
         _LOGGER.debug(f'{self.alias}, {self.unique_id}: {self.last_attributes}')
-        return True
+        return result is not False
 
     # @override(IBrightness)
     def set_brightness(self, intensity: int):
         if self.channels['level'] == 0:
             return False
 
-        target_id = util.make_target_id(self.MAC, self.channels['level'])
-        command = util.make_cmd("level-move-to", target_id=target_id, level=intensity, duration=50)
-        ret, out = self._cyl_controller.send_cmd(command, just_send=False)
+        ret, out = self._cyl_controller.send_cmd(self._brightness_cmd(intensity), just_send=False)
         if ret:
             self._last_attributes['brightness'] = intensity
         return ret
 
+    async def async_set_brightness(self, intensity: int):
+        if self.channels['level'] == 0:
+            return False
+
+        ret, out = await self._cyl_controller.async_send_cmd(self._brightness_cmd(intensity), just_send=False)
+        if ret:
+            self._last_attributes['brightness'] = intensity
+        return ret
@@ -0,0 +1,110 @@
+import logging
+import threading
+import time
+from typing import List, Optional, Tuple
+
+from . import util
+from .cyltelnet import CYLTelnet
+
+_LOGGER = logging.getLogger(__name__)
+
+class CYLConnectionPool(object):
+    """Keep live 9528 sessions of one gateway and reuse them between commands.
+
+    Sessions are health checked before reuse, closed after IDLE_TIMEOUT
+    seconds without use, and a stale session is replaced by a fresh one
+    transparently when it fails in the middle of a command.
+    """
+
+    MAX_IDLE: int = 2
+    IDLE_TIMEOUT: float = 30
+    CONNECT_TIMEOUT: float = 5
+
+    def __init__(self, host: str,
+                       port: int,
+                       max_idle: int = None,
+                       idle_timeout: float = None) -> None:
+
+        self._host = host
+        self._port = port
+        self._max_idle = CYLConnectionPool.MAX_IDLE if max_idle is None else max_idle
+        self._idle_timeout = CYLConnectionPool.IDLE_TIMEOUT if idle_timeout is None else idle_timeout
+
+        self._idle: List[Tuple[CYLTelnet, float]] = []  # (session, last used time)
+        self._lock = threading.Lock()
+
+        self.created = 0
+        self.reused = 0
+
+    @property
+    def idle_count(self) -> int:
+        return len(self._idle)
+
+    def acquire(self, fresh: bool = False) -> Tuple[Optional[CYLTelnet], bool]:
+        """Get a session, return (session, is_reused). session is None if unreachable."""
+        self.reap()
+        while not fresh:
+            with self._lock:
+                if not self._idle:
+                    break
+                dut, _ = self._idle.pop()
+
+            if dut.is_alive():
+                self.reused += 1
+                return (dut, True)
+            dut.close()
+
+        dut = util.waitUntilConnect(self._host, self._port, CYLConnectionPool.CONNECT_TIMEOUT)
+        if dut is not None:
+            self.created += 1
+        return (dut, False)
+
+    def release(self, dut: CYLTelnet, reusable: bool = True) -> None:
+        """Give the session back, it is closed when it can not be reused."""
+        if dut is None:
+            return
+
+        if reusable and dut.is_connected():
+            with self._lock:
+                if len(self._idle) < self._max_idle:
+                    self._idle.append((dut, time.monotonic()))
+                    return
+        dut.close()
+
+    def reap(self) -> None:
+        """Close the sessions idle longer than idle_timeout."""
+        now = time.monotonic()
+        with self._lock:
+            expired = [dut for dut, t in self._idle if now - t > self._idle_timeout]
+            self._idle = [(dut, t) for dut, t in self._idle if now - t <= self._idle_timeout]
+
+        for dut in expired:
+            dut.close()
+
+    def sends(self, content: str, just_send: bool = False, **kwargs):
+        """CYLTelnet.sends() over a pooled session, None if the gateway is unreachable."""
+        dut, reused = self.acquire()
+        if dut is None:
+            return None
+
+        ret, out = dut.sends(content, just_send, **kwargs)
+        if ret is False and reused and isinstance(out, dict) and out.get("err_code") == -2:
+            ## the pooled session went stale, reconnect once
+            _LOGGER.debug(f'{self._host}:{self._port} reconnect stale session, out: {out}')
+            dut.close()
+            dut, reused = self.acquire(fresh=True)
+            if dut is None:
+                return None
+            ret, out = dut.sends(content, just_send, **kwargs)
+
+        ## the response of a just-sent command would arrive in the next user's read
+        self.release(dut, reusable=(ret is True and not just_send))
+        return (ret, out)
+
+    def close(self) -> None:
+        with self._lock:
+            idle = self._idle
+            self._idle = []
+
+        for dut, _ in idle:
+            dut.close()
@@ -0,0 +1,223 @@
+import asyncio
+import logging
+import socket
+import struct
+import threading
+import time
+from typing import Optional
+
+_LOGGER = logging.getLogger(__name__)
+
+ICMP_ECHO_REQUEST = {socket.AF_INET: 8, socket.AF_INET6: 128}
+ICMP_ECHO_REPLY = {socket.AF_INET: 0, socket.AF_INET6: 129}
+ICMP_PROTO = {socket.AF_INET: socket.IPPROTO_ICMP, socket.AF_INET6: socket.IPPROTO_ICMPV6}
+
+def _checksum(data: bytes) -> int:
+    if len(data) % 2:
+        data += b'\x00'
+    total = sum(struct.unpack(f'!{len(data) // 2}H', data))
+    total = (total >> 16) + (total & 0xffff)
+    total += total >> 16
+    return ~total & 0xffff
+
+def _echo_request(family: int, seq: int) -> bytes:
+    """ICMP echo request, the identifier is set by the kernel for datagram sockets."""
+    payload = struct.pack('!d', time.monotonic())
+    header = struct.pack('!BBHHH', ICMP_ECHO_REQUEST[family], 0, 0, 0, seq)
+    if family == socket.AF_INET:
+        header = struct.pack('!BBHHH', ICMP_ECHO_REQUEST[family], 0, _checksum(header + payload), 0, seq)
+    return header + payload
+
+def _is_echo_reply(family: int, seq: int, data: bytes) -> bool:
+    if len(data) < 8:
+        return False
+    icmp_type, _, _, _, reply_seq = struct.unpack('!BBHHH', data[:8])
+    return icmp_type == ICMP_ECHO_REPLY[family] and reply_seq == seq
+
+
+class CYLProbeResult(object):
+    """Result of one reachability probe, round trip times in seconds."""
+
+    def __init__(self, tcp_rtt: Optional[float], icmp_rtt: Optional[float]) -> None:
+        self.tcp_rtt = tcp_rtt
+        self.icmp_rtt = icmp_rtt
+        self.time = time.monotonic()
+
+    @property
+    def reachable(self) -> bool:
+        return self.tcp_rtt is not None or self.icmp_rtt is not None
+
+    def __repr__(self) -> str:
+        tcp = 'NA' if self.tcp_rtt is None else f'{self.tcp_rtt * 1000:.1f} ms'
+        icmp = 'NA' if self.icmp_rtt is None else f'{self.icmp_rtt * 1000:.1f} ms'
+        return f'reachable: {self.reachable}, tcp: {tcp}, icmp: {icmp}'
+
+
+class CYLProbe(object):
+    """In-process reachability probe of a gateway, no 'ping' subprocess.
+
+    A TCP connect to the 9528 port, plus an ICMP echo over an unprivileged
+    datagram socket when the system allows it (net.ipv4.ping_group_range).
+    Link-local hosts with a '%iface' scope are resolved by getaddrinfo.
+    A result is shared by all callers for CACHE_TTL seconds and concurrent
+    callers wait for the one probe in flight.
+    """
+
+    TCP_TIMEOUT: float = 1
+    ICMP_TIMEOUT: float = 1
+    CACHE_TTL: float = 5
+
+    def __init__(self, host: str, port: int, icmp: bool = True) -> None:
+        self.host = host
+        self.port = port
+        self._icmp = icmp  # turned off once the system refuses ICMP datagram sockets
+        self._seq = 0
+        self._last: Optional[CYLProbeResult] = None
+        self._inflight: Optional[asyncio.Future] = None
+        self._lock = threading.Lock()
+
+    @property
+    def last(self) -> Optional[CYLProbeResult]:
+        return self._last
+
+    def _cached(self) -> Optional[CYLProbeResult]:
+        if self._last is not None and time.monotonic() - self._last.time < CYLProbe.CACHE_TTL:
+            return self._last
+        return None
+
+    def _next_seq(self) -> int:
+        self._seq = (self._seq + 1) & 0xffff
+        return self._seq
+
+    def _icmp_socket(self, family: int, sockaddr: tuple) -> Optional[socket.socket]:
+        if not self._icmp:
+            return None
+        try:
+            sock = socket.socket(family, socket.SOCK_DGRAM, ICMP_PROTO[family])
+        except OSError as e:
+            _LOGGER.debug(f'ICMP datagram socket is not allowed, probe with TCP only: {str(e)}')
+            self._icmp = False
+            return None
+
+        try:
+            sock.connect((sockaddr[0], 0) + tuple(sockaddr[2:]))
+        except OSError:
+            sock.close()
+            return None
+        return sock
+
+    ## -------------------------------- asyncio --------------------------------
+
+    async def async_probe(self) -> CYLProbeResult:
+        """Probe the gateway, or share the result of a recent or in-flight probe."""
+        if not self.host:
+            return CYLProbeResult(None, None)
+        if (result := self._cached()) is not None:
+            return result
+        if self._inflight is None:
+            self._inflight = asyncio.ensure_future(self._async_probe_once())
+            ## retrieved, no warning when every caller is gone
+            self._inflight.add_done_callback(lambda task: task.cancelled() or task.exception())
+        ## the probe is a task of its own, a cancelled caller does not cancel it for the others
+        return await asyncio.shield(self._inflight)
+
+    async def _async_probe_once(self) -> CYLProbeResult:
+        try:
+            tcp_rtt, icmp_rtt = await asyncio.gather(self._async_tcp_probe(), self._async_icmp_probe())
+            self._last = CYLProbeResult(tcp_rtt, icmp_rtt)
+            return self._last
+        finally:
+            self._inflight = None
+
+    async def _async_tcp_probe(self) -> Optional[float]:
+        start_time = time.monotonic()
+        try:
+            _, writer = await asyncio.wait_for(asyncio.open_connection(self.host, self.port), CYLProbe.TCP_TIMEOUT)
+        except (OSError, asyncio.TimeoutError) as e:
+            _LOGGER.debug(f'{self.host}:{self.port} TCP probe failed, {type(e).__name__}: {str(e)}')
+            return None
+
+        rtt = time.monotonic() - start_time
+        writer.transport.abort()
+        return rtt
+
+    async def _async_icmp_probe(self) -> Optional[float]:
+        if not self._icmp:
+            return None
+
+        loop = asyncio.get_running_loop()
+        try:
+            infos = await loop.getaddrinfo(self.host, None, type=socket.SOCK_DGRAM)
+        except OSError:
+            return None
+        family, _, _, _, sockaddr = infos[0]
+
+        sock = self._icmp_socket(family, sockaddr)
+        if sock is None:
+            return None
+
+        sock.setblocking(False)
+        seq = self._next_seq()
+        start_time = time.monotonic()
+        try:
+            await loop.sock_sendall(sock, _echo_request(family, seq))
+            deadline = start_time + CYLProbe.ICMP_TIMEOUT
+            while (remaining := deadline - time.monotonic()) > 0:
+                data = await asyncio.wait_for(loop.sock_recv(sock, 1024), remaining)
+                if _is_echo_reply(family, seq, data):
+                    return time.monotonic() - start_time
+        except (OSError, asyncio.TimeoutError) as e:
+            _LOGGER.debug(f'{self.host} ICMP probe failed, {type(e).__name__}: {str(e)}')
+        finally:
+            sock.close()
+        return None
+
+    ## -------------------------------- blocking --------------------------------
+
+    def probe(self) -> CYLProbeResult:
+        """async_probe() for executor threads, the same result cache is shared."""
+        if not self.host:
+            return CYLProbeResult(None, None)
+
+        with self._lock:
+            if (result := self._cached()) is not None:
+                return result
+            self._last = CYLProbeResult(self._tcp_probe(), self._icmp_probe())
+            return self._last
+
+    def _tcp_probe(self) -> Optional[float]:
+        start_time = time.monotonic()
+        try:
+            with socket.create_connection((self.host, self.port), CYLProbe.TCP_TIMEOUT):
+                return time.monotonic() - start_time
+        except OSError as e:
+            _LOGGER.debug(f'{self.host}:{self.port} TCP probe failed, {type(e).__name__}: {str(e)}')
+            return None
+
+    def _icmp_probe(self) -> Optional[float]:
+        if not self._icmp:
+            return None
+
+        try:
+            family, _, _, _, sockaddr = socket.getaddrinfo(self.host, None, type=socket.SOCK_DGRAM)[0]
+        except OSError:
+            return None
+
+        sock = self._icmp_socket(family, sockaddr)
+        if sock is None:
+            return None
+
+        seq = self._next_seq()
+        start_time = time.monotonic()
+        try:
+            sock.send(_echo_request(family, seq))
+            deadline = start_time + CYLProbe.ICMP_TIMEOUT
+            while (remaining := deadline - time.monotonic()) > 0:
+                sock.settimeout(remaining)
+                if _is_echo_reply(family, seq, sock.recv(1024)):
+                    return time.monotonic() - start_time
+        except OSError as e:
+            _LOGGER.debug(f'{self.host} ICMP probe failed, {type(e).__name__}: {str(e)}')
+        finally:
+            sock.close()
+        return None
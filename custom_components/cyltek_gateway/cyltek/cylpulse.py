@@ -0,0 +1,132 @@
+import asyncio
+import itertools
+import logging
+from functools import partial
+from typing import List, Tuple
+
+from .cyltelnet import CYLLatencyStats
+
+_LOGGER = logging.getLogger(__name__)
+
+class CYLPulseStep(object):
+    """One step of a signal sequence: an edge frame to send, or a gap in seconds."""
+
+    def __init__(self, command: str = None, gap: float = None) -> None:
+        self.command = command
+        self.gap = gap
+
+    @property
+    def is_edge(self) -> bool:
+        return self.command is not None
+
+
+class CYLPulsePlayer(object):
+    """Play the signal sequences of the things of one controller.
+
+    The sequences queued within BATCH_WINDOW are played as one group: the
+    frames due at the same time go out back to back over the held session
+    of the controller, and every gap is waited once with a loop timer, so
+    e.g. the curtains of a room move together for the cost of one
+    sequence. The drift of every gap is recorded in PULSE_JITTER.
+    """
+
+    BATCH_WINDOW: float = 0.05
+    PULSE_JITTER = CYLLatencyStats()
+
+    def __init__(self, controller) -> None:
+        self._controller = controller
+        self._batch = []  # (timeline, future) of the window which is open
+        self._batch_task = None
+
+        self.groups = 0
+        self.sequences = 0
+
+    @staticmethod
+    def timeline(steps: List[CYLPulseStep]) -> Tuple[List[Tuple[float, str]], float]:
+        """([(offset, command)], length) of a sequence, the offsets in seconds from its start."""
+        events = []
+        offset = 0
+        for step in steps:
+            if step.is_edge:
+                events.append((offset, step.command))
+            else:
+                offset += step.gap
+        return (events, offset)
+
+    async def async_play(self, steps: List[CYLPulseStep]) -> bool:
+        """Play the sequence in the group of the current window, True if all its frames succeeded."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        if self._batch_task is None:
+            self._batch = []
+            self._batch_task = loop.create_task(self._async_flush(self._batch))
+            self._batch_task.add_done_callback(partial(self._flush_done, self._batch))
+        self._batch.append((self.timeline(steps), future))
+        return await future
+
+    def _flush_done(self, batch, task) -> None:
+        ## cancelled in the window or while playing, no caller is left waiting
+        if self._batch is batch:
+            self._batch, self._batch_task = [], None
+        for _, future in batch:
+            future.cancel()
+
+    async def _async_flush(self, batch) -> None:
+        await asyncio.sleep(CYLPulsePlayer.BATCH_WINDOW)
+        self._batch, self._batch_task = [], None
+
+        try:
+            results = await self.async_play_group([timeline for timeline, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), ret in zip(batch, results):
+            if not future.done():
+                future.set_result(ret)
+
+    async def async_play_group(self, timelines: List[Tuple[List[Tuple[float, str]], float]]) -> List[bool]:
+        """Play the timelines together, return the result of each."""
+        if not timelines:
+            return []
+        ## the session is up before the first edge, connecting does not stretch a pulse
+        if not await self._controller.async_try_connect():
+            return [False] * len(timelines)
+
+        self.groups += 1
+        self.sequences += len(timelines)
+        if len(timelines) > 1:
+            _LOGGER.debug(f'{self._controller.alias}: {len(timelines)} sequences in one group')
+
+        loop = asyncio.get_running_loop()
+        events = sorted((offset, index, command) for index, (timeline, _) in enumerate(timelines)
+                                                 for offset, command in timeline)
+        sends = []  # (index, task)
+        mark, mark_offset = loop.time(), 0  # the gaps count from the last edge, or the start
+        last_edge = None
+        for offset, group in itertools.groupby(events, key=lambda event: event[0]):
+            planned = offset - mark_offset
+            if planned > 0:
+                await asyncio.sleep(mark + planned - loop.time())
+            for _, index, command in group:
+                sends.append((index, asyncio.ensure_future(self._controller.async_send_cmd(command))))
+            await asyncio.sleep(0)  # the frames are written now, the responses are awaited later
+
+            now = loop.time()
+            if last_edge is not None and planned > 0:
+                CYLPulsePlayer.PULSE_JITTER.record(abs(now - last_edge - planned))
+            last_edge = mark = now
+            mark_offset = offset
+
+        length = max(length for _, length in timelines)
+        if length > mark_offset:
+            await asyncio.sleep(mark + length - mark_offset - loop.time())
+
+        results = [True] * len(timelines)
+        for (index, _), (ret, out) in zip(sends, await asyncio.gather(*(task for _, task in sends))):
+            if not ret:
+                _LOGGER.warning(f'{self._controller.alias}: {out}')
+                results[index] = False
+        return results
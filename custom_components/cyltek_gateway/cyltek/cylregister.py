@@ -0,0 +1,147 @@
+import logging
+import sys
+from array import array
+from typing import Dict, List, Optional
+
+from . import util
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+_LOGGER = logging.getLogger(__name__)
+
+SIGN_MAGNITUDE = "sign-magnitude"
+TWOS_COMPLEMENT = "twos-complement"
+
+class CYLRegisterField(object):
+    """One field of a unit: the bits of a 16 bit register, with scale and signedness."""
+
+    def __init__(self, name: str,
+                       register: int,
+                       mask: int = 0xFFFF,
+                       scale: float = 1,
+                       signed: Optional[str] = None) -> None:
+
+        if signed not in (None, False, SIGN_MAGNITUDE, TWOS_COMPLEMENT):
+            raise ValueError(f"{name}: unknown signedness {signed}")
+
+        self.name = name
+        self.register = register
+        self.mask = mask
+        self.shift = util.mask_shift(mask)
+        self.width = (mask >> self.shift).bit_length()
+        self.scale = scale
+        self.signed = signed or None
+        self.sign_bit = 1 << (self.width - 1) if self.signed else 0
+
+        ## divide by 10 rather than multiply by 0.1, 267 / 10 is 26.7 and 267 * 0.1 is not
+        inverse = 1 / scale
+        self._divisor = inverse if scale < 1 and inverse == round(inverse) else None
+        self.is_plain = scale == 1 and self.signed is None
+
+    def from_raw(self, raw: int):
+        """The value of the bits of the field, already shifted down."""
+        if raw & self.sign_bit:
+            raw = -(raw ^ self.sign_bit) if self.signed == SIGN_MAGNITUDE else raw - (1 << self.width)
+        if self.scale == 1:
+            return raw
+        return raw / self._divisor if self._divisor else raw * self.scale
+
+    def to_raw(self, value) -> int:
+        """The bits of the value, in place in the register."""
+        raw = int(round(value / self.scale)) if self.scale != 1 else int(value)
+        if raw < 0:
+            raw = (-raw | self.sign_bit) if self.signed == SIGN_MAGNITUDE else raw + (1 << self.width)
+        return (raw << self.shift) & self.mask
+
+
+class CYLRegisterMap(object):
+    """Register layout of the units of an RS-485 HVAC bus, compiled from a profile.
+
+    The registers of unit n start at base_addr + unit_registers * n. A block
+    of consecutive units is decoded at once: the bytes become 16 bit words in
+    one go and every field is taken from the strided column of its register,
+    with NumPy if it is installed.
+
+    Profile section:
+        {"base_addr": 2000, "unit_registers": 6,
+         "fields": {"temp": {"register": 4, "mask": "0xFFFF", "scale": 0.1, "signed": "sign-magnitude"}}}
+    """
+
+    def __init__(self, base_addr: int, unit_registers: int, fields: List[CYLRegisterField]) -> None:
+        self.base_addr = base_addr
+        self.unit_registers = unit_registers
+        self.fields = fields
+        self._by_name = {field.name: field for field in fields}
+
+    @staticmethod
+    def from_config(config: dict) -> "CYLRegisterMap":
+        """Compile a register map section of a profile, masks may be given as "0x..." strings."""
+        def number(value):
+            return int(value, 0) if isinstance(value, str) else value
+
+        fields = []
+        for name, spec in config.get("fields", {}).items():
+            fields.append(CYLRegisterField(name,
+                                           number(spec["register"]),
+                                           number(spec.get("mask", 0xFFFF)),
+                                           spec.get("scale", 1),
+                                           spec.get("signed")))
+
+        register_map = CYLRegisterMap(number(config["base_addr"]), number(config["unit_registers"]), fields)
+        for field in fields:
+            if not 0 <= field.register < register_map.unit_registers:
+                raise ValueError(f"{field.name}: register {field.register} is out of the {register_map.unit_registers} registers of a unit")
+        return register_map
+
+    def field(self, name: str) -> Optional[CYLRegisterField]:
+        return self._by_name.get(name)
+
+    def address(self, id: int) -> int:
+        """Address of the first register of the unit."""
+        return int(self.base_addr + self.unit_registers * id)
+
+    def words(self, data) -> array:
+        """The 16 bit registers of the low byte first bytes, whole units only."""
+        size = 2 * self.unit_registers
+        words = array('H', bytes(data[:len(data) - len(data) % size]))
+        if sys.byteorder == 'big':
+            words.byteswap()
+        return words
+
+    def decode(self, data) -> Dict[str, list]:
+        """{field: [value of the 1st unit, the 2nd unit, ...]} of the register bytes of consecutive units."""
+        if np is not None:
+            size = 2 * self.unit_registers
+            units = np.frombuffer(bytes(data[:len(data) - len(data) % size]), dtype='<u2').reshape(-1, self.unit_registers)
+            columns = {field.name: ((units[:, field.register] & field.mask) >> field.shift).tolist() for field in self.fields}
+        else:
+            words = memoryview(self.words(data))
+            step = self.unit_registers
+            columns = {field.name: [(word & field.mask) >> field.shift for word in words[field.register::step]]
+                       for field in self.fields}
+
+        for field in self.fields:
+            if not field.is_plain:
+                columns[field.name] = [field.from_raw(raw) for raw in columns[field.name]]
+        return columns
+
+    def decode_unit(self, data) -> Dict[str, object]:
+        """{field: value} of the register bytes of one unit."""
+        return {name: column[0] for name, column in self.decode(data).items()}
+
+    def encode(self, values: Dict[str, object]) -> List[int]:
+        """The register bytes of a unit, low byte first, with the fields of values; the others are 0."""
+        words = [0] * self.unit_registers
+        for name, value in values.items():
+            field = self._by_name.get(name)
+            if field is None:
+                raise KeyError(f"{name} is not in the register map")
+            words[field.register] |= field.to_raw(value)
+
+        data = []
+        for word in words:
+            data += [word & 0xFF, word >> 8]
+        return data
@@ -1,4 +1,6 @@
+import asyncio
 import logging
+from functools import partial
 
 from . import globalvar as gl
 from . import util
@@ -15,6 +17,12 @@ def create_cylswitch(MAC, channels, internet="eth0", auto_on=False, model=None):
     return CYLSwitch(controllers_map[MAC], channels, auto_on, model)
 
 
+async def async_create_cylswitch(MAC, channels, internet="eth0", auto_on=False, model=None):
+    """create_cylswitch off the event loop, the controller of the MAC is built once for all callers"""
+    await gl.async_get_controller(MAC, partial(CYLControllerEx.async_create, MAC, internet=internet))
+    return await asyncio.get_running_loop().run_in_executor(None, partial(create_cylswitch, MAC, channels, internet, auto_on, model))
+
+
 class CYLSwitch(CYLOnOffDevice):
 
     def __init__(
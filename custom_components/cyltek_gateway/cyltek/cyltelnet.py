@@ -1,24 +1,140 @@
 import json
 import logging
 import platform
-import re
 import select
 import sys
 import time
 from telnetlib import Telnet
-from typing import Optional, Tuple, TypeVar
+from typing import List, Optional, Tuple, TypeVar
 
 SYS_PLATFORM = platform.system().upper()
 
 _LOGGER = logging.getLogger(__name__)
 _LOGGER.setLevel(logging.ERROR)
 
+class CYLFrameDecoder(object):
+    """Incremental decoder of the 9528 '#:{json}:#' frames.
+
+    Bytes are fed as they arrive, a frame is returned as soon as its ':#'
+    terminator shows up and a partial frame is kept until the next feed().
+    A frame which does not parse before the prolog of the next one is
+    dropped, the next one is decoded.
+    """
+
+    PROLOG: bytes = b'#:'
+    EPILOG: bytes = b':#'
+    MAX_FRAME_SIZE: int = 1 << 20
+
+    def __init__(self) -> None:
+        self._buffer = bytearray()
+        self._scan = 0  # where to look for the next terminator
+
+    @property
+    def pending(self) -> int:
+        """The number of buffered bytes of an incomplete frame."""
+        return len(self._buffer)
+
+    def reset(self) -> None:
+        self._buffer.clear()
+        self._scan = 0
+
+    def feed(self, data: bytes) -> List[dict]:
+        self._buffer += data
+        buf = self._buffer
+        frames = []
+        while True:
+            start = buf.find(self.PROLOG)
+            if start < 0:
+                ## keep a trailing '#' which may begin the next prolog
+                del buf[:len(buf) - buf.endswith(b'#')]
+                self._scan = 0
+                break
+            if start > 0:
+                del buf[:start]
+                self._scan = 0
+
+            end = buf.find(self.EPILOG, max(self._scan, len(self.PROLOG)))
+            if end < 0:
+                if len(buf) > self.MAX_FRAME_SIZE:
+                    _LOGGER.warning(f'CYLFrameDecoder drop {len(buf)} bytes without terminator')
+                    self.reset()
+                else:
+                    self._scan = max(len(buf) - len(self.EPILOG) + 1, len(self.PROLOG))
+                break
+
+            try:
+                frames.append(json.loads(bytes(buf[len(self.PROLOG):end])))
+            except ValueError:
+                following = buf.find(self.PROLOG, len(self.PROLOG))
+                if following < 0 or end + len(self.EPILOG) <= following:
+                    ## the terminator is inside the json, look for the next one
+                    self._scan = end + 1
+                    continue
+                ## the frame would run into the next one, it is garbled
+                _LOGGER.warning(f'CYLFrameDecoder drop {following} bytes of a garbled frame: {bytes(buf[:following][:200])}')
+                del buf[:following]
+                self._scan = 0
+                continue
+
+            del buf[:end + len(self.EPILOG)]
+            self._scan = 0
+
+        return frames
+
+
+class CYLLatencyStats(object):
+    """Running latency figures in seconds, from the start of a read to a complete response."""
+
+    def __init__(self) -> None:
+        self.reset()
+
+    def reset(self) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+        self.last = None
+
+    def record(self, latency: float) -> None:
+        self.count += 1
+        self.total += latency
+        self.last = latency
+        self.min = latency if self.min is None else min(self.min, latency)
+        self.max = latency if self.max is None else max(self.max, latency)
+
+    @property
+    def average(self):
+        return self.total / self.count if self.count else None
+
+    def as_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "avg_ms": None if self.average is None else round(self.average * 1000, 1),
+            "min_ms": None if self.min is None else round(self.min * 1000, 1),
+            "max_ms": None if self.max is None else round(self.max * 1000, 1),
+            "last_ms": None if self.last is None else round(self.last * 1000, 1),
+        }
+
+
 class CYLResultParser(object):
     """The result parser for response from different port."""
     def __init__(self) -> None:
         pass
 
-    def _arrange_result(self, method: str, result: str, **kwargs) -> TypeVar('T', None, dict, str):
+    @staticmethod
+    def _arrange_frames(frames: List[dict]) -> dict:
+        dict_content = {}
+        for d in frames:
+            if d.get('code') is not None:
+                dict_content.update(d)
+
+        ## record other response
+        if len(frames) >= 1:
+            dict_content['other'] = [d for d in frames if d.get('code') is None]
+
+        return dict_content
+
+    def _arrange_result(self, method: str, result: str, frames: List[dict] = None, **kwargs) -> TypeVar('T', None, dict, str):
         
         ## parse result for 23 port
         if (method == '23'):
@@ -30,19 +146,9 @@ class CYLResultParser(object):
 
         ## parse result for 9528 cmd
         elif (method == '9528'):
-            dict_content = {}
-            response_list = [word for word in re.split(':#|#:', result) if word]
-            dict_list = [eval(str(json.loads(res))) for res in response_list]
-            
-            for d in dict_list:
-                if d.get('code') is not None:
-                    dict_content.update(d)
-            
-            ## record other response
-            if len(dict_list) >= 1:
-                dict_content['other'] = [d for d in dict_list if d.get('code') is None]
-                
-            return dict_content
+            if frames is None:
+                frames = CYLFrameDecoder().feed(result.encode(CYLTelnet.ENCODING))
+            return self._arrange_frames(frames)
 
         return result
 
@@ -55,8 +161,10 @@ class CYLTelnet(object):
     """CYL Telnet wraper. Default port 9528. Default expect string is ':#' """
 
     CONNECTION_TIMEOUT: float = 3
-    READ_NON_BLOCK_INTERVAL: int = 50
+    TRAILING_FRAME_WINDOW: float = 1
+    READ_LATENCY = CYLLatencyStats()
     RESULT_PARSER = CYLResultParser()
+    TRAILING_FRAME_CMDS: Tuple[str] = ('supply-raw-data',)  # data frames may follow the 'code' frame
     EPILOG: str = ':#'
     ENTER: str = '\r\n'
     ENCODING: str = 'utf-8'
@@ -69,6 +177,7 @@ class CYLTelnet(object):
         self.port: int = port
         self.verbose: bool = verbose
         self.conn: Telnet = None
+        self._decoder = CYLFrameDecoder()
         self.telnet_connect(host, port, CYLTelnet.CONNECTION_TIMEOUT)
 
     def telnet_connect(self, host: str,
@@ -85,9 +194,27 @@ class CYLTelnet(object):
             self.conn = None
 
 
-    def is_connected(self) -> bool: 
+    def is_connected(self) -> bool:
         return self.conn is not None
 
+    def is_alive(self) -> bool:
+        """Check the session is still usable without sending anything.
+
+        A readable socket with nothing to read means the peer has closed it.
+        Stale bytes left from an earlier command are drained here as well.
+        """
+        if not self.is_connected():
+            return False
+
+        try:
+            readable, _, _ = select.select([self.conn.get_socket()], [], [], 0)
+            if readable:
+                self.conn.read_very_eager() # raise EOFError if peer closed
+        except (EOFError, OSError, ValueError) as e:
+            _LOGGER.debug(f"host: {self.host}:{self.port} session is dead, {str(e)}")
+            return False
+        return True
+
     T = TypeVar('T', None, dict, str)
     def response(self,
                  timeout: float = 5,
@@ -108,7 +235,7 @@ class CYLTelnet(object):
         try:
 
             if eventmask is None:
-                eventmask = None if "LINUX" != SYS_PLATFORM else select.POLLOUT
+                eventmask = None if "LINUX" != SYS_PLATFORM else select.POLLIN
                 
             expect_string = CYLTelnet.EPILOG if expect_string is None else expect_string
             encoding = CYLTelnet.ENCODING if encoding is None else encoding
@@ -116,12 +243,14 @@ class CYLTelnet(object):
             expect_string=str(expect_string).encode(encoding)
 
             out = None
+            frames = []
             if (read_until is False) and ("LINUX" == SYS_PLATFORM):
                 ## non-blocking
-                out = self.__read_non_block(expect_string, timeout, eventmask)
+                out, frames = self.__read_non_block(expect_string, timeout, eventmask)
             else:
                 ## Blocking
                 out = self.conn.read_until(expect_string, timeout)
+                frames = self._decoder.feed(out)
                 # i, t, out = self.conn.expect([expect_string], timeout)
                 # print(i, t, out)
                 
@@ -144,7 +273,7 @@ class CYLTelnet(object):
             if expect_string.decode(encoding) not in out:
                 return (False, {"err_code": 2, "reason": f"receive Error: Can't find expect string({expect_string.decode()})", "out": out})
 
-            cmd_result = CYLTelnet.RESULT_PARSER(str(self.port), str(out), **kwargs)
+            cmd_result = CYLTelnet.RESULT_PARSER(str(self.port), str(out), frames=frames, **kwargs)
             return (True, cmd_result)
 
         except Exception as e:
@@ -158,41 +287,66 @@ class CYLTelnet(object):
     def __read_non_block(self, expect_string,
                                timeout: float=5,
                                eventmask=None):
-        """!!! select module can not support on windows !!!"""
+        """Wait for data until the response is complete or the deadline passes.
+
+        !!! select.poll can not support on windows !!!
+        """
         if eventmask is None:
-            eventmask = None if "LINUX" != SYS_PLATFORM else select.POLLOUT
+            eventmask = select.POLLIN
 
         poller = select.poll()
-        poller.register(self.conn.get_socket(), eventmask)
-
-        timeout = 2 if timeout < 2 else timeout
-        interval = 10 if CYLTelnet.READ_NON_BLOCK_INTERVAL < 10 else CYLTelnet.READ_NON_BLOCK_INTERVAL
-        evts = poller.poll((timeout-1)*1000)
-
-        out = None
-        start_time = time.time()
-        for sock, evt in evts:
-            if evt & eventmask:
-                if sock == self.conn.fileno():
-                    out = self.conn.read_very_eager() # non-blocking
-                    ## recieve until expect_string in pre_out or timeout
-
-                    pre_out = out
-                    while (time.time() - start_time < 1):
-                        next_exts = poller.poll(interval)
-                        next_out = self.conn.read_very_eager()
-                        out += next_out
-                        if len(next_out) == 0:
-                            if expect_string == b'':
-                                break
-                            if expect_string in pre_out:
-                                break
-                        pre_out = next_out
-                    
-                    if len(out) == 0:
-                        _LOGGER.warning(f'__read_non_block() out is empty ! <NA>\n{out}\n</NA>')
-
-        return out
+        poller.register(self.conn.get_socket(), eventmask | select.POLLERR | select.POLLHUP)
+
+        start_time = time.monotonic()
+        deadline = start_time + timeout
+        trailing_deadline = None
+
+        out = b''
+        frames = []
+        while True:
+            now = time.monotonic()
+            if trailing_deadline is not None:
+                wait_until = min(deadline, trailing_deadline)
+            else:
+                wait_until = deadline
+            if now >= wait_until:
+                break
+
+            if not poller.poll((wait_until - now) * 1000):
+                continue
+
+            try:
+                data = self.conn.read_very_eager() # non-blocking
+            except EOFError:
+                _LOGGER.debug(f'__read_non_block() {self.host}:{self.port} closed by peer')
+                self.close()
+                break
+
+            out += data
+            frames += self._decoder.feed(data)
+            if self.__is_complete(expect_string, frames):
+                break
+
+            ## the data frames of some commands follow the 'code' frame
+            if trailing_deadline is None and any(f.get('code') is not None for f in frames):
+                trailing_deadline = time.monotonic() + CYLTelnet.TRAILING_FRAME_WINDOW
+
+            if expect_string != CYLFrameDecoder.EPILOG and expect_string in out:
+                break
+
+        if len(out) == 0:
+            _LOGGER.warning(f'__read_non_block() out is empty ! <NA>\n{out}\n</NA>')
+        elif any(f.get('code') is not None for f in frames):
+            CYLTelnet.READ_LATENCY.record(time.monotonic() - start_time)
+
+        return out, frames
+
+    @staticmethod
+    def __is_complete(expect_string: bytes, frames: List[dict]) -> bool:
+        """The frame carrying 'code' ends a 9528 response."""
+        if expect_string != CYLFrameDecoder.EPILOG:
+            return False
+        return any(f.get('code') is not None and f.get('cmd') not in CYLTelnet.TRAILING_FRAME_CMDS for f in frames)
 
     def sends(self, content: str,
                     just_send: bool = False,
@@ -226,6 +380,7 @@ class CYLTelnet(object):
             start_time = time.time()
             while (time.time() - start_time < timeout):
                 self.conn.read_very_eager()
+                self._decoder.reset()
 
                 self.conn.write(str(content + CYLTelnet.ENTER).encode(encoding))
                 if just_send:
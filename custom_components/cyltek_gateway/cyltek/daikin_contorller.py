@@ -1,13 +1,57 @@
+import asyncio
+import copy
 import logging
+import threading
 import time
+import weakref
 
 from . import util
+from .cylexception import CYLTekDeviceError, CYLTekVerifyError
+from .cylregister import CYLRegisterMap
 from .cyltelnet import CYLTelnet
 
 _LOGGER = logging.getLogger(__name__)
 # _LOGGER = logging.getLogger(__name__)
 # _LOGGER.setLevel(logging.INFO)
 
+## register layout of the Daikin units, the "register_map" of config/climates/daikin.json
+DAIKIN_REGISTER_MAP = {
+    "input": {
+        "base_addr": 2000,
+        "unit_registers": 6,
+        "fields": {
+            "on_off":       {"register": 0, "mask": 0x1},
+            "fan_dir":      {"register": 0, "mask": 0x0700},
+            "fan_vol":      {"register": 0, "mask": 0x7000},
+            "op_mode":      {"register": 1, "mask": 0xF},
+            "op_status":    {"register": 1, "mask": 0xF00},
+            "heat_master":  {"register": 1, "mask": 0xC000},
+            "target_temp":  {"register": 2, "mask": 0xFFFF, "scale": 0.1, "signed": "sign-magnitude"},
+            "temp":         {"register": 4, "mask": 0xFFFF, "scale": 0.1, "signed": "sign-magnitude"},
+        },
+    },
+    "holding": {
+        "base_addr": 2000,
+        "unit_registers": 3,
+        "fields": {
+            "power":        {"register": 0, "mask": 0x000F},
+            "ctrl":         {"register": 0, "mask": 0x00F0},
+            "direction":    {"register": 0, "mask": 0x0F00},
+            "volume":       {"register": 0, "mask": 0xF000},
+            "mode":         {"register": 1, "mask": 0x00FF},
+            "op_status":    {"register": 1, "mask": 0xFF00},
+            "setpoint":     {"register": 2, "mask": 0xFFFF, "scale": 0.1, "signed": "sign-magnitude"},
+        },
+    },
+}
+
+def compile_register_maps(section=None):
+    """{"input": CYLRegisterMap, "holding": CYLRegisterMap} of a profile register_map, Daikin's by default."""
+    section = section or DAIKIN_REGISTER_MAP
+    return {kind: CYLRegisterMap.from_config(section[kind]) for kind in ("input", "holding")}
+
+DAIKIN_REGISTER_MAPS = compile_register_maps()
+
 def retry_counter():
     success = True
 
@@ -86,10 +130,295 @@ class Daikin_modbus_handler(object):
 
         return holding_reg
 
+class Daikin_bus(object):
+    """Snapshot of the indoor unit input registers of one RS-485 bus.
+
+    The input registers of every unit sit in one block, so all the units
+    are read with one 'modbus-cmd' (split every MAX_REGISTERS_PER_READ
+    registers) and decoded at once with the input register map. A
+    snapshot younger than SNAPSHOT_TTL seconds is shared by every reader
+    of the bus. The comm status register is read with every snapshot, a
+    unit which dropped off the bus is left out of it.
+
+    The bus also shadows the holding registers of every unit: they mirror
+    the input registers of the last poll, or the last write if it is newer,
+    so a setting is written without reading the unit first.
+    """
+    MAX_REGISTERS_PER_READ: int = 120  # under the modbus limit of 125
+    COMM_STATUS_ADDRESS: int = 5
+    SNAPSHOT_TTL: float = 2
+    SHADOW_TTL: float = 30
+    FAILURE_BACKOFF: float = 30
+
+    _buses = weakref.WeakKeyDictionary()  # owner: {(target_id, slave_address): Daikin_bus}
+
+    def __init__(self, send, target_id, slave_address, unit_ids=(), register_maps=None):
+        """send(command) returns the (ret, out) of a 9528 command, register_maps come from compile_register_maps()."""
+        self._send      = send
+        self.target_id  = target_id
+        self.slave_addr = slave_address
+        self.unit_ids   = set(unit_ids)
+        register_maps   = register_maps or DAIKIN_REGISTER_MAPS
+        self.input_map  = register_maps["input"]
+        self.holding_map = register_maps["holding"]
+
+        self._lock      = threading.Lock()
+        self._registers = {}    # id: bytes of the input registers
+        self._fields    = {}    # id: (decoded columns of its block, index in the block)
+        self._time      = None
+        self._written   = {}    # id: (time, Daikin_modbus_handler) of the last holding write
+        self._failed_at = None  # do not hammer a bus which can not be read
+        self.reads      = 0
+
+    @staticmethod
+    def for_owner(owner, send, target_id, slave_address, register_maps=None):
+        """The one bus of (target_id, slave_address) shared by all users of the owner, e.g. a controller."""
+        buses = Daikin_bus._buses.setdefault(owner, {})
+        key = (target_id, slave_address)
+        if key not in buses:
+            buses[key] = Daikin_bus(send, target_id, slave_address, register_maps=register_maps)
+        return buses[key]
+
+    def add_units(self, unit_ids):
+        self.unit_ids.update(unit_ids)
+
+    @property
+    def age(self):
+        return None if self._time is None else time.monotonic() - self._time
+
+    @property
+    def readable(self):
+        """The bus has been read and is not backing off a failed read."""
+        if self._time is None:
+            return False
+        return self._failed_at is None or time.monotonic() - self._failed_at >= Daikin_bus.FAILURE_BACKOFF
+
+    def __blocks(self):
+        ids = sorted(self.unit_ids)
+        max_units = max(1, Daikin_bus.MAX_REGISTERS_PER_READ // self.input_map.unit_registers)
+        block = []
+        for id in ids:
+            if block and (id - block[0] >= max_units):
+                yield block[0], block[-1]
+                block = []
+            block.append(id)
+        if block:
+            yield block[0], block[-1]
+
+    def refresh(self):
+        """Read the comm status and the registers of all the units, return True if all were read."""
+        if not self.unit_ids:
+            return False
+
+        comm = self.__read(Daikin_bus.COMM_STATUS_ADDRESS, 1)
+        if comm is None:
+            _LOGGER.warning(f"{self.target_id} comm status read failed")
+            self._failed_at = time.monotonic()
+            return False
+
+        registers = {}
+        fields = {}
+        for first, last in self.__blocks():
+            number = self.input_map.unit_registers * (last - first + 1)
+            data = self.__read(self.input_map.address(first), number)
+            if data is None:
+                _LOGGER.warning(f"{self.target_id} bulk read of units {first}-{last} failed")
+                self._failed_at = time.monotonic()
+                return False
+
+            size = 2 * self.input_map.unit_registers
+            columns = self.input_map.decode(data[:2 * number])
+            for id in range(first, last + 1):
+                if not Daikin_modbus_handler.check_comm_error(id, comm):
+                    _LOGGER.debug(f"{self.target_id} ID {id} comm status error")
+                    continue
+                offset = size * (id - first)
+                registers[id] = data[offset:offset + size]
+                fields[id] = (columns, id - first)
+
+        self._registers = registers
+        self._fields = fields
+        self._time = time.monotonic()
+        self._failed_at = None
+        return True
+
+    def __read(self, start_addr, number):
+        """The bytes of number holding registers from start_addr, None if the read failed."""
+        #:{"cmd":"modbus-cmd", "target-id":"0000d01411b011E3:1","mode":"rtu","function":3,"slave-addr":1,"start-addr":2000,"number":48,"write-data":[],"timeout-ms": 1000}:#
+        command = util.make_cmd("modbus-cmd", target_id=self.target_id,
+                                mode="rtu", function=3, slave_addr=self.slave_addr,
+                                start_addr=start_addr, number=number, write_data=[])
+        ret, out = self._send(command)
+        self.reads += 1
+        data = out.get("response-register-data") if (ret and isinstance(out, dict)) else None
+        if not data or len(data) < 2 * number:
+            _LOGGER.debug(f"{self.target_id} read of {number} registers at {start_addr} failed: {ret}, {out}")
+            return None
+        return data
+
+    def snapshot(self, max_age=None, backoff=True):
+        """Make sure the snapshot is younger than max_age, only one reader refreshes it.
+
+        A bus whose read failed is not read again for FAILURE_BACKOFF
+        seconds, unless backoff is False.
+        """
+        max_age = Daikin_bus.SNAPSHOT_TTL if max_age is None else max_age
+        with self._lock:
+            now = time.monotonic()
+            if self._time is not None and now - self._time < max_age:
+                return True
+            if backoff and self._failed_at is not None and now - self._failed_at < Daikin_bus.FAILURE_BACKOFF:
+                return False
+            return self.refresh()
+
+    def registers(self, id):
+        """The bytes of the input registers of the unit, low byte first, None if it is not in the snapshot."""
+        return self._registers.get(id)
+
+    def fields(self, id):
+        """{field: value} of the unit from the decoded snapshot, None if it is not in it, e.g. on a comm error."""
+        if id not in self._fields:
+            return None
+        columns, index = self._fields[id]
+        return {name: column[index] for name, column in columns.items()}
+
+    def unit(self, id):
+        register = self.registers(id)
+        if register is None:
+            return None
+        dmh = Daikin_modbus_handler()
+        dmh.analyze_input(register)
+        return dmh
+
+    def holding(self, id, max_age=None):
+        """A copy of the shadowed holding registers of the unit, None if the shadow is older than max_age."""
+        max_age = Daikin_bus.SHADOW_TTL if max_age is None else max_age
+        now = time.monotonic()
+        written_at, written = self._written.get(id, (None, None))
+        if written is not None and (self._time is None or written_at > self._time):
+            return copy.copy(written) if now - written_at < max_age else None
+        if self._time is None or now - self._time >= max_age:
+            return None
+        return self.unit(id)
+
+    def remember(self, id, dmh):
+        """Shadow a holding register write."""
+        self._written[id] = (time.monotonic(), copy.copy(dmh))
+
+    def write(self, id, dmh, ctrl_flag=1):
+        """Write every setting of the unit in its holding registers, ctrl_flag 1 applies them."""
+        #:{"cmd":"modbus-cmd", "target-id":"0000d01411b0122f:1","mode":"rtu","function":4,"slave-addr":1, "start-addr":2002,"number":1,"write-data":[97,16] , "timeout-ms": 1000}:#
+        values = {
+            "power":     dmh.power,
+            "ctrl":      6 if ctrl_flag == 1 else 0,
+            "direction": dmh.direction,
+            "volume":    dmh.volume,
+            "mode":      dmh.mode,
+            "op_status": dmh.op_status,
+            "setpoint":  dmh.setpoint,
+        }
+        command = util.make_cmd("modbus-cmd", target_id=self.target_id,
+                                mode="rtu", function=4, slave_addr=self.slave_addr,
+                                start_addr=self.holding_map.address(id), number=self.holding_map.unit_registers,
+                                write_data=self.holding_map.encode(values), timeou_ms=1000)
+        ret, out = self._send(command)
+        if ret:
+            self.remember(id, dmh)
+        return ret, out
+
+class Daikin_verification(object):
+    """Read a setting back until it matches, bounded by a deadline.
+
+    The readback is polled with an exponential backoff and completes as
+    soon as the values match. The setting is resent at most MAX_RESEND
+    times, CYLTekVerifyError is raised when the deadline passes.
+    """
+    DEADLINE: float = 10
+    FIRST_DELAY: float = 0.5
+    BACKOFF: float = 2
+    MAX_DELAY: float = 3
+    MAX_RESEND: int = 2
+
+    def __init__(self, id, expected, deadline=None, max_resend=None):
+        self.id         = id
+        self.expected   = dict(expected)
+        self.mismatch   = {}
+        self.attempts   = 0
+        self.resends    = 0
+
+        deadline = Daikin_verification.DEADLINE if deadline is None else deadline
+        self._max_resend = Daikin_verification.MAX_RESEND if max_resend is None else max_resend
+        self._deadline  = time.monotonic() + deadline
+        self._delay     = Daikin_verification.FIRST_DELAY
+
+    def __next_delay(self):
+        remaining = self._deadline - time.monotonic()
+        if remaining <= 0:
+            return None
+        delay = min(self._delay, remaining)
+        self._delay = min(self._delay * Daikin_verification.BACKOFF, Daikin_verification.MAX_DELAY)
+        return delay
+
+    def __check(self, actual):
+        self.attempts += 1
+        actual = actual or {}
+        self.mismatch = {k: (v, actual.get(k)) for k, v in self.expected.items() if actual.get(k) != v}
+        if self.mismatch:
+            _LOGGER.debug(f"ID {self.id} verify attempt {self.attempts}, mismatch: {self.mismatch}")
+        return not self.mismatch
+
+    def __can_resend(self):
+        if self.resends >= self._max_resend:
+            return False
+        self.resends += 1
+        return True
+
+    def run(self, read, resend=None):
+        """read() returns the values now, resend() writes the setting again."""
+        while (delay := self.__next_delay()) is not None:
+            time.sleep(delay)
+            if self.__check(read()):
+                _LOGGER.info(f"ID {self.id} Verify Success, attempts: {self.attempts}")
+                return True
+            if resend and self.__can_resend():
+                _LOGGER.warning(f"ID {self.id} Verify error & resend {self.resends}")
+                resend()
+        raise CYLTekVerifyError(self.id, self.mismatch, self.attempts)
+
+    async def async_run(self, read, resend=None):
+        """run() with coroutine functions, the event loop is free while waiting.
+
+        A read() of None, e.g. a busy bus, is a failed attempt which is
+        read again; the setting is resent only on a real mismatch.
+        """
+        while (delay := self.__next_delay()) is not None:
+            await asyncio.sleep(delay)
+            actual = await read()
+            if self.__check(actual):
+                _LOGGER.info(f"ID {self.id} Verify Success, attempts: {self.attempts}")
+                return True
+            if actual is not None and resend and self.__can_resend():
+                _LOGGER.warning(f"ID {self.id} Verify error & resend {self.resends}")
+                await resend()
+        raise CYLTekVerifyError(self.id, self.mismatch, self.attempts)
+
 class Daikin(object):
     target_id: str
     endpoint:  int
 
+    SEND_RETRY: int = 3
+    SEND_RETRY_DELAY: float = 0.2
+    VERIFY_IGNORED = ('op_status', 'roomtemp')  # not part of a setting
+
+    ## the settings apply() takes, with their valid values
+    SETTINGS = {
+        'power':     (0, 1),
+        'direction': (0, 1, 2, 3, 4, 6, 7),
+        'volume':    (0, 1, 3, 5),
+        'mode':      (0, 1, 2, 3, 7),
+        'setpoint':  None,
+    }
+
     def __init__(self, mac, endpoint, connection, slave_address):
         self.mac        = mac
         self.endpoint   = endpoint
@@ -97,6 +426,7 @@ class Daikin(object):
         self.target_id  = util.make_target_id(self.mac, self.endpoint)
         self.slave_addr = slave_address
         self.master_id  = -1 # if Master for this VRV system is not decided id will still be -1
+        self.bus        = Daikin_bus(self.__send_bus, self.target_id, slave_address)
 
     def __show_id(self, id):
         num = id
@@ -104,18 +434,19 @@ class Daikin(object):
 
     def __send_9528(self, command):
         out = ""
-        while(1):
+        for retry in range(Daikin.SEND_RETRY):
+            if retry:
+                time.sleep(Daikin.SEND_RETRY_DELAY)
             ret, out = self.conn.sends(command, just_send=False, timeout=3)
             _LOGGER.debug(out)
-            time.sleep(0.2)
-            try:
-                if out["code"] == 0:
-                    break
-            except:
-                pass
-            _LOGGER.error("9528 error, retry")
+            if isinstance(out, dict) and out.get("code") == 0:
+                return out
+            _LOGGER.error(f"9528 error, retry {retry + 1}/{Daikin.SEND_RETRY}")
 
-        return out
+        raise CYLTekDeviceError(out if isinstance(out, dict) else {"message": str(out)})
+
+    def __send_bus(self, command):
+        return (True, self.__send_9528(command))
 
     def __get_status(self, id):
         if (self.endpoint) != 0:
@@ -131,13 +462,7 @@ class Daikin(object):
 
     def __update_status(self, id, ctrl_flag, dmh):
         if (self.endpoint) != 0:
-            #:{"cmd":"modbus-cmd", "target-id":"0000d01411b0122f:1","mode":"rtu","function":4,"slave-addr":1, "start-addr":2002,"number":1,"write-data":[97,16] , "timeout-ms": 1000}:#
-            modbus_reg = dmh.return_holding(ctrl_flag = ctrl_flag, dmh = dmh)
-            command = util.make_cmd("modbus-cmd", target_id = self.target_id,
-                                    mode="rtu", function = 4, slave_addr = self.slave_addr, 
-                                    start_addr = int(2000 + 3 * id), number = 3,
-                                    write_data = modbus_reg, timeou_ms = 1000)
-            out = self.__send_9528(command)
+            ret, out = self.bus.write(id, dmh, ctrl_flag = ctrl_flag)
             return out
 
     def __check_comm_status(self, id):
@@ -155,37 +480,11 @@ class Daikin(object):
                 return out
 
     def __verify_setting(self, id, set_dmh):
-        # wait for 
-        time.sleep(3)
-        # check input register make sure setting success
-        _LOGGER.debug("check input register make sure setting success")
-        now_dmh = self.__get_status(id)
-        # print status
-        _LOGGER.info("Verify set cmd result")
-        _LOGGER.info(f"power    : now {now_dmh.power    }, set {set_dmh.power}")        
-        _LOGGER.info(f"volume   : now {now_dmh.volume   }, set {set_dmh.volume}")
-        _LOGGER.info(f"mode     : now {now_dmh.mode     }, set {set_dmh.mode}")
-        _LOGGER.info(f"setpoint : now {now_dmh.setpoint }, set {set_dmh.setpoint}")
-
-        _LOGGER.debug("Verify other result")
-        _LOGGER.debug(f"direction: now {now_dmh.direction}, set {set_dmh.direction}")
-        _LOGGER.debug(f"op_status: now {now_dmh.op_status}, set {set_dmh.op_status}")
-        _LOGGER.debug(f"room remp: now {now_dmh.roomtemp }, set {set_dmh.roomtemp}")
-
-        set_dmh.op_status = now_dmh.op_status
-        set_dmh.roomtemp  = now_dmh.roomtemp
-        now = now_dmh.__dict__
-        set = set_dmh.__dict__
-
-        if now == set:
-            _LOGGER.info("Verify Success")
-
-        else:
-            _LOGGER.error("Verify error & retry")
-            # resend setting
-            self.__update_status(id, ctrl_flag = 1, dmh = set_dmh)
-            # check again
-            self.__verify_setting(id, set_dmh)
+        """Read the unit back until it has the setting, raise CYLTekVerifyError at the deadline."""
+        expected = {k: v for k, v in set_dmh.__dict__.items() if k not in Daikin.VERIFY_IGNORED}
+        verification = Daikin_verification(id, expected)
+        verification.run(read=lambda: self.__get_status(id).__dict__,
+                         resend=lambda: self.__update_status(id, ctrl_flag = 1, dmh = set_dmh))
         
     def __set_preprocess(self, id):
         _LOGGER.debug("set preprocess")
@@ -201,6 +500,21 @@ class Daikin(object):
 
         return now_dmh
 
+    def __prepare_setting(self, id):
+        """The current settings of the unit, from the shadow when the bus was polled lately."""
+        dmh = self.bus.holding(id)
+        if dmh is not None:
+            _LOGGER.debug(f"ID {id} setting from the holding register shadow")
+            return dmh
+        self.bus.add_units([id])
+        return self.__set_preprocess(id)
+
+    def __write_setting(self, id, set_dmh):
+        """One holding register write with every setting of the unit, then verify it."""
+        self.__update_status(id, ctrl_flag = 1, dmh = set_dmh)
+        # dobule check
+        self.__verify_setting(id, set_dmh)
+
     def __opposite_mode(self, value):
         if value == 1:
             return 2
@@ -208,12 +522,10 @@ class Daikin(object):
             return 1
 
     def __direct_set_mode(self, id, value):
-        set_dmh = self.__set_preprocess(id)
+        set_dmh = self.__prepare_setting(id)
         # Set Value
         set_dmh.mode = value
-        self.__update_status(id, ctrl_flag = 1, dmh = set_dmh) 
-        # dobule check
-        self.__verify_setting(id, set_dmh)
+        self.__write_setting(id, set_dmh)
 
     def __cool_heat_handle(self, id, value, group):
         if (self.master_id >= 0):
@@ -243,8 +555,12 @@ class Daikin(object):
 
     def __need_change_operation(self, id, value, group):
         change_flag = 0
+        ## one bulk read for the whole group
+        self.bus.add_units(group)
+        ## the last snapshot may be stale when the bulk read fails
+        refreshed = self.bus.refresh()
         for id in group:
-            id_dmh = self.__get_status(id)
+            id_dmh = (refreshed and self.bus.unit(id)) or self.__get_status(id)
             if (id_dmh.mode == self.__opposite_mode(value)):
                 change_flag = 1
             if (id_dmh.master == 1):
@@ -252,25 +568,42 @@ class Daikin(object):
 
         return change_flag
 
+    def apply(self, id, changes, group=None):
+        """Apply several settings of the unit with one holding write and one verification.
+
+        changes is {setting: value} of SETTINGS, e.g. {'mode': 2, 'volume': 5, 'setpoint': 24.0}.
+        A cool/heat change over of the group is handled first, like set_mode().
+        """
+        for name, value in changes.items():
+            if name not in Daikin.SETTINGS:
+                _LOGGER.error(f"Unknown setting {name}")
+                return False
+            valid = Daikin.SETTINGS[name]
+            if (valid is None and not -127.9 <= value <= 127.9) or (valid is not None and value not in valid):
+                _LOGGER.error(f"Set {name} value error: {value}")
+                return False
+
+        self.__show_id(id)
+        changes = dict(changes)
+        mode = changes.get('mode')
+        if group and mode in (1, 2) and self.__need_change_operation(id, mode, group):
+            _LOGGER.info("Need to change cool/heat mode")
+            self.__cool_heat_handle(id, changes.pop('mode'), group)
+            if not changes:
+                return True
+
+        set_dmh = self.__prepare_setting(id)
+        for name, value in changes.items():
+            setattr(set_dmh, name, value)
+        self.__write_setting(id, set_dmh)
+        return True
+
     def set_power(self, id, value):
         # 8196 command
         # cmd = util.make_cmd("daikin-cmd", target_id = self.target_id, action="on", id = id)
 
         # Simulate lightgw
-        self.__show_id(id)
-        if(value == 0 or value == 1):
-            set_dmh = self.__set_preprocess(id)
-            # Set Value
-            _LOGGER.debug("Set indoor unit status to Holding Register")
-            set_dmh.power = value
-            self.__update_status(id, ctrl_flag = 1, dmh = set_dmh) 
-            # dobule check
-            self.__verify_setting(id, set_dmh)
-
-            return True
-        else:
-            _LOGGER.error("Set power value error")
-            return False
+        return self.apply(id, {'power': value})
 
     def set_fan_volume(self, id, value):
         # 8196 command
@@ -278,20 +611,7 @@ class Daikin(object):
         # cmd = util.make_cmd("daikin-cmd", target_id = self.target_id, action = "set-fan-volume", id = id, value = value)
 
         # simulate lightgw
-        self.__show_id(id)
-        if(value == 0 or value == 1 or value == 3 or value == 5):
-            set_dmh = self.__set_preprocess(id)
-            # Set Value
-            set_dmh.volume = value
-
-            self.__update_status(id, ctrl_flag = 1, dmh = set_dmh) 
-            # dobule check
-            self.__verify_setting(id, set_dmh)
-
-            return True
-        else:
-            _LOGGER.error("Set fan volume value error")
-            return False
+        return self.apply(id, {'volume': value})
 
     def set_mode(self, id, value, group):
         # 8196 command
@@ -322,19 +642,7 @@ class Daikin(object):
         # cmd = util.make_cmd("daikin-cmd", target_id = self.target_id, action = "set-temperature", id = id, value = value)
 
         # simulate lightgw
-        self.__show_id(id)
-        if (value >= -127.9 and value <= 127.9):
-            set_dmh = self.__set_preprocess(id)
-            # Set Value
-            set_dmh.setpoint = value
-            self.__update_status(id, ctrl_flag = 1, dmh = set_dmh) 
-            # dobule check
-            self.__verify_setting(id, set_dmh)
-            
-            return True
-        else:
-            _LOGGER.error("Set temp value error")
-            return False
+        return self.apply(id, {'setpoint': value})
 
     def query(self, id):
         # simulate lightgw
@@ -348,6 +656,27 @@ class Daikin(object):
         # will return result like this json {'power': 1, 'direction': 0, 'volume': 1, 'mode': 2, 'op_status': 2, 'setpoint': 24.0, 'roomtemp': 24.0}   
         return True, res
 
+    def query_group(self, group):
+        """query() of all units in the group with one comm status read and one bulk read."""
+        if (self.endpoint) == 0:
+            return False, {}
+
+        self.bus.add_units(group)
+        if not self.bus.refresh():
+            return False, {}
+
+        res = {}
+        for id in group:
+            ## a unit with a comm error is not in the snapshot
+            dmh = self.bus.unit(id)
+            if dmh is None:
+                _LOGGER.error(f"ID {id} comm status error")
+                res[id] = None
+            else:
+                res[id] = dmh.__dict__
+        _LOGGER.info(res)
+        return True, res
+
 class Daikin_cyl485(object):
     def __init__(self, ip, mac, slave_address):
         self.device485 = CYLTelnet(host=ip, port=9528, timeout=2, verbose=False)
@@ -1,3 +1,6 @@
+import asyncio
+from typing import Callable
+
 
 class ControllersMapSingleTon:
     """The singleTon class for CYL-Tek controller's map"""
@@ -28,4 +31,22 @@ class ControllersMapSingleTon:
 
 def get_controllers_map():
     return ControllersMapSingleTon.get_instance().get_map()
-    
+
+
+## MAC: future of the controller being built
+_pending_controllers = dict()
+
+async def async_get_controller(MAC, factory: Callable):
+    """The controller of the MAC, built by the coroutine function factory once however many callers await it."""
+    controllers_map = get_controllers_map()
+    if (controller := controllers_map.get(MAC)) is not None:
+        return controller
+
+    if (future := _pending_controllers.get(MAC)) is None:
+        future = asyncio.ensure_future(factory())
+        _pending_controllers[MAC] = future
+        future.add_done_callback(lambda _: _pending_controllers.pop(MAC, None))
+
+    ## a cancelled caller does not cancel the build the others wait for
+    controller = await asyncio.shield(future)
+    return controllers_map.setdefault(MAC, controller)
@@ -1,3 +1,4 @@
+import functools
 import json
 import logging
 import os
@@ -164,7 +165,6 @@ def content9528_to_dict(content: str) -> TypeVar('T', None, dict, str):
         while "#:" in content:
             content=content.replace('#:','')
         dict_content = json.loads(content.replace(':#',''))
-        dict_content = eval(str(dict_content))
     except Exception as e:
         return None
     return dict_content
@@ -198,19 +198,14 @@ def load_config_json(json_path: str, encoding='utf-8'):
 
     return config
 
+@functools.lru_cache(maxsize=None)
+def mask_shift(mask):
+    """Position of the lowest set bit of the mask, 0 for an empty mask."""
+    return (mask & -mask).bit_length() - 1 if mask else 0
+
 def decode16bit(z, mask):
     """decode 16 bit for daikin register data"""
-    def shift(b):
-        if (b == 0x0):
-            return 0
-        move = 0
-        while(b):
-            if ((b+1) >> 1) != (b >> 1):
-                break
-            b = b >> 1
-            move+=1
-        return move
-    return (z & mask) >> shift(mask)
+    return (z & mask) >> mask_shift(mask)
 
 def is_float(elem) -> bool:
     """Is element a number ?"""
@@ -1,27 +1,110 @@
 """Support for Xiaomi Yeelight WiFi color bulb."""
 from __future__ import annotations
 
+import asyncio
 import logging
 from functools import partial
+from typing import Any, Dict, Optional
 
+from homeassistant.core import callback
 from homeassistant.helpers import device_registry as dr
 from homeassistant.helpers.entity import DeviceInfo, Entity
+from homeassistant.helpers.restore_state import ExtraStoredData, RestoreEntity
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from . import util
 from .const import DOMAIN, MANUFACTURER_NAME
-from .cyltek.cylcontroller_ex import CYLControllerEx
+from .coordinator import CYLGatewayCoordinator
 from .cyltek.cylexception import CYLTekException
+from .cyltek.IOThings import IOThings
 
 _LOGGER = logging.getLogger(__name__)
 
-class CYLDeviceEntity(Entity):
-    """Represents single CYLDevice entity."""
+class CYLThingExtraData(ExtraStoredData):
+    """The last attributes of a thing, saved across restarts."""
 
-    def __init__(self, cyl_device: CYLControllerEx) -> None:
+    def __init__(self, last_attributes: Dict[str, Any]) -> None:
+        self.last_attributes = last_attributes
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {"last_attributes": self.last_attributes}
+
+    @classmethod
+    def from_dict(cls, restored: Dict[str, Any]) -> Optional[CYLThingExtraData]:
+        if not isinstance(attributes := restored.get("last_attributes"), dict):
+            return None
+        return cls(attributes)
+
+
+class CYLDeviceEntity(CoordinatorEntity[CYLGatewayCoordinator], RestoreEntity):
+    """Represents single CYLDevice entity, updated by the gateway coordinator.
+
+    The entity is added without polling its thing first: it starts from the
+    attributes saved before the restart, assumed until the first sweep of
+    the coordinator, which runs in the background, reads the thing.
+    """
+
+    def __init__(self, coordinator: CYLGatewayCoordinator, thing: IOThings) -> None:
         """Initialize the device."""
-        self._device = cyl_device
+        super().__init__(coordinator)
+        self._device = thing.cyl_controller
+        self._thing = thing
+        self._available = True
+        self._stale = False
         self._attr_device_info = self.generate_device_info()
 
+    @property
+    def available(self) -> bool:
+        return self._available
+
+    @property
+    def assumed_state(self) -> bool:
+        """True while the state is the one restored and the thing was not read yet."""
+        return self._stale
+
+    @property
+    def extra_restore_state_data(self) -> CYLThingExtraData:
+        return CYLThingExtraData(dict(self._thing.last_attributes))
+
+    async def async_added_to_hass(self) -> None:
+        """Start with the state of the last sweep, or the one saved before the restart."""
+        await super().async_added_to_hass()
+        self.async_on_remove(self.coordinator.register(self._thing))
+        if extra := await self.async_get_last_extra_data():
+            restored = CYLThingExtraData.from_dict(extra.as_dict())
+            if restored and self._thing.restore_attributes(restored.last_attributes):
+                self._stale = True
+                self._update_from_thing()
+
+        self._sync_from_coordinator()
+        if self._thing.unique_id not in (self.coordinator.data or {}):
+            ## the requests of all entities of the gateway are debounced into one sweep
+            self.hass.async_create_background_task(self.coordinator.async_request_refresh(),
+                                                   f"{DOMAIN} refresh {self._device.MAC}")
+
+    async def async_will_remove_from_hass(self) -> None:
+        """Stop the work the thing still has scheduled, polling it stops with async_on_remove."""
+        await super().async_will_remove_from_hass()
+        self._thing.shutdown()
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Take the state of the thing from the last sweep."""
+        self._sync_from_coordinator()
+        self.async_write_ha_state()
+
+    def _sync_from_coordinator(self) -> None:
+        available = (self.coordinator.data or {}).get(self._thing.unique_id)
+        if available is None:
+            return
+        self._available = available
+        self._stale = False
+        if available:
+            self._update_from_thing()
+
+    def _update_from_thing(self) -> None:
+        """Copy the last attributes of the thing into the entity state."""
+
     def generate_device_info(self) -> DeviceInfo:
         """Information about this entity/device."""
         return DeviceInfo(
@@ -37,9 +120,12 @@ class CYLDeviceEntity(Entity):
     async def _async_try_command(self, msg_failed, func, *args, **kwargs):
         """Call a cyl device command handling error messages."""
         try:
-            result = await self.hass.async_add_executor_job(
-                partial(func, *args, **kwargs)
-            )
+            if asyncio.iscoroutinefunction(func):
+                result = await func(*args, **kwargs)
+            else:
+                result = await self.hass.async_add_executor_job(
+                    partial(func, *args, **kwargs)
+                )
             if result is False:
                 _LOGGER.warning(msg_failed)  
 
@@ -2,7 +2,6 @@
 from __future__ import annotations
 
 import logging
-from datetime import timedelta
 from pprint import pformat
 
 import homeassistant.helpers.config_validation as cv
@@ -22,6 +21,7 @@ from . import util
 from .const import (CONF_CHANNELS, CONF_CONFIG_JSON, CONF_ENTITY_TYPE,
                     CONF_HUMI_ID, CONF_INTERNET, CONF_MODEL, CONF_TYPE,
                     DEFAULT_NAMES, DOMAIN)
+from .coordinator import CYLGatewayCoordinator, async_get_coordinator
 from .cyltek import cylhumidifier
 from .cyltek.cylhumidifier import CYLHumidifier, HumidifierType
 from .entity import CYLDeviceEntity
@@ -33,7 +33,6 @@ DEFAULT_MODEL = "Standard"
 DEHUMIDIFIER_TYPE = HumidifierType.Dehumidifier
 HUMIDIFIER_TYPE = HumidifierType.Humidifier
 
-SCAN_INTERVAL = timedelta(seconds=10)
 
 DEVICE_SCHEMA = vol.Schema(
     {
@@ -64,14 +63,15 @@ async def async_setup_platform(
 
     for dinfo in config[CONF_DEVICES]:
 
-        humi = cylhumidifier.create_cylhumidifier(config[CONF_MAC],
-                                                    dinfo[CONF_HUMI_ID],
-                                                    dinfo[CONF_CONFIG_JSON],
-                                                    {'default': 1},
-                                                    internet=config[CONF_INTERNET],
-                                                    auto_on=False,
-                                                    model=dinfo[CONF_MODEL])
-        async_add_entities([CYLTekHumidifier(humi, dinfo[CONF_NAME])], True)
+        humi = await cylhumidifier.async_create_cylhumidifier(config[CONF_MAC],
+                                                                dinfo[CONF_HUMI_ID],
+                                                                dinfo[CONF_CONFIG_JSON],
+                                                                {'default': 1},
+                                                                internet=config[CONF_INTERNET],
+                                                                auto_on=False,
+                                                                model=dinfo[CONF_MODEL])
+        coordinator = async_get_coordinator(hass, humi.cyl_controller)
+        async_add_entities([CYLTekHumidifier(coordinator, humi, dinfo[CONF_NAME])])
     return True
 
 async def async_setup_entry(
@@ -88,19 +88,21 @@ async def async_setup_entry(
 
     for dinfo in config[CONF_DEVICES]:
         if dinfo[CONF_ENTITY_TYPE] == Platform.HUMIDIFIER:
-            humi = cylhumidifier.create_cylhumidifier(config[CONF_MAC],
-                                                        dinfo[CONF_HUMI_ID],
-                                                        dinfo[CONF_CONFIG_JSON],
-                                                        dinfo[CONF_CHANNELS],
-                                                        internet=config[CONF_INTERNET],
-                                                        auto_on=False,
-                                                        model=dinfo[CONF_MODEL])
-            async_add_entities([CYLTekHumidifier(humi, dinfo[CONF_NAME])], True)
+            humi = await cylhumidifier.async_create_cylhumidifier(config[CONF_MAC],
+                                                                    dinfo[CONF_HUMI_ID],
+                                                                    dinfo[CONF_CONFIG_JSON],
+                                                                    dinfo[CONF_CHANNELS],
+                                                                    internet=config[CONF_INTERNET],
+                                                                    auto_on=False,
+                                                                    model=dinfo[CONF_MODEL])
+            coordinator = async_get_coordinator(hass, humi.cyl_controller)
+            async_add_entities([CYLTekHumidifier(coordinator, humi, dinfo[CONF_NAME])])
 
 class CYLTekHumidifier(CYLDeviceEntity, HumidifierEntity):
 
-    def __init__(self, humi: CYLHumidifier, name: str="CYLTekHumi"):
+    def __init__(self, coordinator: CYLGatewayCoordinator, humi: CYLHumidifier, name: str="CYLTekHumi"):
         """Initialize the humidifier."""
+        super().__init__(coordinator, humi)
         self._humi = humi
         self._attr_supported_features = SUPPORT_MODES if self._humi.available_modes() else None
     
@@ -111,7 +113,6 @@ class CYLTekHumidifier(CYLDeviceEntity, HumidifierEntity):
 
         self._attr_mode = None
         self._attr_target_humidity = None
-        self._available = True
         self._need_update = True
     
     @property
@@ -122,29 +123,14 @@ class CYLTekHumidifier(CYLDeviceEntity, HumidifierEntity):
             "current_humi" : self._humi.humidity,
         }
 
-    @property
-    def available(self) -> bool:
-        return self._available
-
-    async def async_update(self) -> None:
-        """Fetch new state data for this humi.
-        This is the only method that should fetch new data for Home Assistant.
-        """
+    # @override(CYLDeviceEntity)
+    def _update_from_thing(self) -> None:
         """Synchronise internal state with the actual humidifier state."""
 
         if self._need_update is False:
             self._need_update = True
             return
 
-        # self._available = 
-        await self._async_try_command(
-                f'{self.name}, {self.unique_id} humidifier is unavalible !',
-                self._humi.is_available
-            )
-
-        if self._available is False:
-            return
-
         self._is_on = self._humi.power != 'OFF'
         self._attr_mode = self._humi.mode
         self._humidity = self._humi.humidity
@@ -205,6 +191,7 @@ class CYLTekHumidifier(CYLDeviceEntity, HumidifierEntity):
         ):
             self._attr_target_humidity = humidity
             self._need_update = False
+            self.async_write_ha_state()
 
     async def async_set_mode(self, mode):
         """Set target humidity."""
@@ -224,6 +211,7 @@ class CYLTekHumidifier(CYLDeviceEntity, HumidifierEntity):
             ):
                 self._attr_mode = mode
                 self._need_update = False
+                self.async_write_ha_state()
 
           
     async def async_turn_on(self, **kwargs):
@@ -239,6 +227,7 @@ class CYLTekHumidifier(CYLDeviceEntity, HumidifierEntity):
             self._is_on = True
             self._attr_mode = self._humi.mode
             self._need_update = False
+            self.async_write_ha_state()
   
     async def async_turn_off(self, **kwargs):
         """Turn the device OFF."""
@@ -253,4 +242,5 @@ class CYLTekHumidifier(CYLDeviceEntity, HumidifierEntity):
             self._is_on = False
             self._attr_mode = self._humi.mode
             self._need_update = False
+            self.async_write_ha_state()
   
\ No newline at end of file
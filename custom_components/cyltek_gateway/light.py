@@ -2,7 +2,6 @@
 from __future__ import annotations
 
 import logging
-from datetime import timedelta
 from pprint import pformat
 from typing import Any, Callable, Dict, Optional
 
@@ -24,6 +23,7 @@ from homeassistant.helpers.typing import ConfigType, DiscoveryInfoType
 from . import util
 from .const import (CONF_CHANNELS, CONF_ENTITY_TYPE, CONF_INTERNET,
                     DEFAULT_NAMES, DOMAIN)
+from .coordinator import CYLGatewayCoordinator, async_get_coordinator
 from .cyltek import cylight
 from .cyltek.cylight import CYLight
 from .entity import CYLDeviceEntity
@@ -31,7 +31,6 @@ from .entity import CYLDeviceEntity
 _LOGGER = logging.getLogger(__name__)
 
 DEFAULT_NAME = DEFAULT_NAMES["light"]
-SCAN_INTERVAL = timedelta(seconds=10)
 
 VALID_CHANNEL = vol.All(cv.positive_int, vol.Range(min=0, max=96))
 CHANNEL_SCHEMA = vol.Schema(
@@ -69,12 +68,13 @@ async def async_setup_platform(
     # print(pformat(config))
     for dinfo in config[CONF_DEVICES]:
 
-        light = cylight.create_cylight(config[CONF_MAC],
-                                       dinfo[CONF_CHANNELS],
-                                       internet=config[CONF_INTERNET],
-                                       auto_on=False,
-                                       model=None)
-        async_add_entities([CYLTekLights(light, dinfo[CONF_NAME])], True)
+        light = await cylight.async_create_cylight(config[CONF_MAC],
+                                                   dinfo[CONF_CHANNELS],
+                                                   internet=config[CONF_INTERNET],
+                                                   auto_on=False,
+                                                   model=None)
+        coordinator = async_get_coordinator(hass, light.cyl_controller)
+        async_add_entities([CYLTekLights(coordinator, light, dinfo[CONF_NAME])])
 
 # This function is called as part of the __init__.async_setup_entry (via the
 # hass.config_entries.async_forward_entry_setup call)
@@ -92,34 +92,30 @@ async def async_setup_entry(
 
     for dinfo in config[CONF_DEVICES]:
         if dinfo[CONF_ENTITY_TYPE] == Platform.LIGHT:
-            light = cylight.create_cylight(config[CONF_MAC],
-                                        dinfo[CONF_CHANNELS],
-                                        internet=config[CONF_INTERNET],
-                                        auto_on=False,
-                                        model=None)
-            async_add_entities([CYLTekLights(light, dinfo[CONF_NAME])], True)
+            light = await cylight.async_create_cylight(config[CONF_MAC],
+                                                    dinfo[CONF_CHANNELS],
+                                                    internet=config[CONF_INTERNET],
+                                                    auto_on=False,
+                                                    model=None)
+            coordinator = async_get_coordinator(hass, light.cyl_controller)
+            async_add_entities([CYLTekLights(coordinator, light, dinfo[CONF_NAME])])
 
 
 
 class CYLTekLights(CYLDeviceEntity, LightEntity):
     """Representation of an CYL-Tek Light."""
 
-    def __init__(self, light: CYLight, name: str="CYLTekLight") -> None:
+    def __init__(self, coordinator: CYLGatewayCoordinator, light: CYLight, name: str="CYLTekLight") -> None:
         """Initialize an CYLTekLight."""
-        super().__init__(light.cyl_controller)
+        super().__init__(coordinator, light)
         self._light = light
         self._light.alias = name
         
         self._is_on = None
         self._brightness = None
 
-        self._available = True
         self._need_update = True
 
-    @property
-    def available(self) -> bool:
-        return self._available
-
     @property
     def name(self) -> str:
         """Return the display name of this light."""
@@ -185,10 +181,11 @@ class CYLTekLights(CYLDeviceEntity, LightEntity):
         if ATTR_BRIGHTNESS not in kwargs:
             if await self._async_try_command(
                 f'{self.name}, {self.unique_id} Turning the light on failed.',
-                self._light.turn_on
+                self._light.async_turn_on
             ):
                 self._is_on = True
                 self._need_update = False
+                self.async_write_ha_state()
 
         else:
             brightness = kwargs.get(ATTR_BRIGHTNESS, 255)
@@ -196,11 +193,12 @@ class CYLTekLights(CYLDeviceEntity, LightEntity):
             if brightness is not None:
                 if await self._async_try_command(
                     f'{self.name}, {self.unique_id} set_brightness failed.',
-                    self._light.set_brightness,
+                    self._light.async_set_brightness,
                     brightness
                 ):
                     self._brightness = brightness
                     self._need_update = False
+                    self.async_write_ha_state()
 
 
 
@@ -213,30 +211,21 @@ class CYLTekLights(CYLDeviceEntity, LightEntity):
         # if self._is_on is True:
         if await self._async_try_command(
             f'{self.name}, {self.unique_id} Turning the light off failed.',
-            self._light.turn_off
+            self._light.async_turn_off
         ):
             self._is_on = False
             self._need_update = False
+            self.async_write_ha_state()
 
 
-    async def async_update(self) -> None:
-        """Fetch new state data for this light.
-        This is the only method that should fetch new data for Home Assistant.
-        """
+    # @override(CYLDeviceEntity)
+    def _update_from_thing(self) -> None:
         """Synchronise internal state with the actual lights state."""
 
         if self._need_update is False:
             self._need_update = True
             return
 
-        self._available = await self._async_try_command(
-                f'{self.name}, {self.unique_id} light is unavalible !',
-                self._light.is_available
-            )
-
-        if self._available is False:
-            return
-
         if self._is_on != self._light.get_last_attribute('power'):
             self._is_on = self._light.get_last_attribute('power')
         if self._brightness != self._light.get_last_attribute('brightness'):
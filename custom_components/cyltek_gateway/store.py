@@ -0,0 +1,103 @@
+"""Cache of what the bootstrap learns of every CYL-Tek gateway, in HA storage."""
+from __future__ import annotations
+
+import logging
+from typing import Dict, Optional, Set
+
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.const import CONF_MAC
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN
+from .cyltek.cylcontroller_ex import CYLControllerEx
+
+_LOGGER = logging.getLogger(__name__)
+
+DATA_STORE = f"{DOMAIN}_store"
+STORAGE_KEY = f"{DOMAIN}.controllers"
+STORAGE_VERSION = 1
+SAVE_DELAY = 10
+
+
+@callback
+def async_get_store(hass: HomeAssistant) -> CYLControllerStore:
+    """Return the store of the integration, created on first use."""
+    if (store := hass.data.get(DATA_STORE)) is None:
+        store = hass.data[DATA_STORE] = CYLControllerStore(hass)
+    return store
+
+
+class CYLControllerStore:
+    """Snapshots of config, capabilities and model-id of the gateways, by MAC.
+
+    A gateway with a snapshot gets its controller at once, without the
+    configure/enumerate/model-id round trips, and is bootstrapped again in
+    the background; only the parts which changed are applied and saved,
+    and the entry is reloaded when its capabilities or model-id did, after
+    its setup if that is in progress. A snapshot records the server-version
+    it was taken with, a gateway with another server-version replaces it.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        self._hass = hass
+        self._store = Store(hass, STORAGE_VERSION, STORAGE_KEY)
+        self._data: Optional[Dict[str, dict]] = None
+        self._reload_pending: Set[str] = set()  # MACs which changed while their entry was set up
+
+    async def async_load(self) -> None:
+        if self._data is None:
+            self._data = await self._store.async_load() or {}
+
+    def get(self, MAC: str) -> Optional[dict]:
+        return (self._data or {}).get(MAC)
+
+    @callback
+    def async_save(self, controller: CYLControllerEx) -> None:
+        self._data[controller.MAC] = controller.snapshot()
+        self._store.async_delay_save(lambda: self._data, SAVE_DELAY)
+
+    @callback
+    def async_remove(self, MAC: str) -> None:
+        if self._data and self._data.pop(MAC, None) is not None:
+            self._store.async_delay_save(lambda: self._data, SAVE_DELAY)
+
+    @callback
+    def async_take_reload(self, MAC: str) -> bool:
+        """True once if the gateway changed while its entry was set up, the entry needs a reload."""
+        if MAC in self._reload_pending:
+            self._reload_pending.discard(MAC)
+            return True
+        return False
+
+    async def async_create_controller(self, MAC: str, internet: str = 'eth0') -> CYLControllerEx:
+        """The controller of the gateway, from its snapshot when there is one."""
+        await self.async_load()
+        if (snapshot := self.get(MAC)) is None:
+            controller = await CYLControllerEx.async_create(MAC, internet=internet)
+            if controller.init_ret:
+                self.async_save(controller)
+            return controller
+
+        controller = CYLControllerEx.from_snapshot(MAC, snapshot, internet=internet)
+        _LOGGER.debug(f'{MAC}: from the cache of server-version {snapshot.get("server-version")}')
+        self._hass.async_create_background_task(self._async_revalidate(controller), f"{DOMAIN} revalidate {MAC}")
+        return controller
+
+    async def _async_revalidate(self, controller: CYLControllerEx) -> None:
+        if not (changed := await controller.async_revalidate()):
+            return
+        _LOGGER.info(f'{controller.MAC}: {", ".join(changed)} changed since cached')
+        self.async_save(controller)
+
+        ## the things and entities were built from the cached capabilities and model-id
+        if not {"capabilities", "model_id"} & set(changed):
+            return
+        for entry in self._hass.config_entries.async_entries(DOMAIN):
+            if entry.data.get(CONF_MAC) != controller.MAC:
+                continue
+            if entry.state is ConfigEntryState.LOADED:
+                self._hass.async_create_task(self._hass.config_entries.async_reload(entry.entry_id))
+            elif entry.state is ConfigEntryState.SETUP_IN_PROGRESS:
+                ## async_setup_entry takes it when its platforms are set up
+                self._reload_pending.add(controller.MAC)
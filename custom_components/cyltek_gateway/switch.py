@@ -2,7 +2,6 @@
 from __future__ import annotations
 
 import logging
-from datetime import timedelta
 from pprint import pformat
 from typing import Any, Callable, Dict, Optional
 
@@ -22,6 +21,7 @@ from homeassistant.helpers.typing import ConfigType, DiscoveryInfoType
 from . import util
 from .const import (CONF_CHANNELS, CONF_ENTITY_TYPE, CONF_INTERNET,
                     DEFAULT_NAMES, DOMAIN)
+from .coordinator import CYLGatewayCoordinator, async_get_coordinator
 from .cyltek import cylswitch
 from .cyltek.cylswitch import CYLSwitch
 from .entity import CYLDeviceEntity
@@ -30,7 +30,6 @@ _LOGGER = logging.getLogger(__name__)
 
 DEFAULT_NAME = DEFAULT_NAMES["switch"]
 
-SCAN_INTERVAL = timedelta(seconds=10)
 
 VALID_CHANNEL = vol.All(cv.positive_int, vol.Range(min=0, max=96))
 CHANNEL_SCHEMA = vol.Schema(
@@ -66,12 +65,13 @@ async def async_setup_platform(
 
     for dinfo in config[CONF_DEVICES]:
 
-        switch = cylswitch.create_cylswitch(config[CONF_MAC],
-                                       dinfo[CONF_CHANNELS],
-                                       internet=config[CONF_INTERNET],
-                                       auto_on=False,
-                                       model=None)
-        async_add_entities([CYLTekSwitch(switch, dinfo[CONF_NAME])], True)
+        switch = await cylswitch.async_create_cylswitch(config[CONF_MAC],
+                                                   dinfo[CONF_CHANNELS],
+                                                   internet=config[CONF_INTERNET],
+                                                   auto_on=False,
+                                                   model=None)
+        coordinator = async_get_coordinator(hass, switch.cyl_controller)
+        async_add_entities([CYLTekSwitch(coordinator, switch, dinfo[CONF_NAME])])
 
 
 # This function is called as part of the __init__.async_setup_entry (via the
@@ -90,33 +90,29 @@ async def async_setup_entry(
 
     for dinfo in config[CONF_DEVICES]:
         if dinfo[CONF_ENTITY_TYPE] == Platform.SWITCH:
-            switch = cylswitch.create_cylswitch(config[CONF_MAC],
-                                        dinfo[CONF_CHANNELS],
-                                        internet=config[CONF_INTERNET],
-                                        auto_on=False,
-                                        model=None)
-            async_add_entities([CYLTekSwitch(switch, dinfo[CONF_NAME])], True)
+            switch = await cylswitch.async_create_cylswitch(config[CONF_MAC],
+                                                    dinfo[CONF_CHANNELS],
+                                                    internet=config[CONF_INTERNET],
+                                                    auto_on=False,
+                                                    model=None)
+            coordinator = async_get_coordinator(hass, switch.cyl_controller)
+            async_add_entities([CYLTekSwitch(coordinator, switch, dinfo[CONF_NAME])])
 
 
 
 class CYLTekSwitch(CYLDeviceEntity, SwitchEntity):
     """Representation of an CYL-Tek Switch."""
 
-    def __init__(self, switch: CYLSwitch, name: str="CYLTekSwitch") -> None:
+    def __init__(self, coordinator: CYLGatewayCoordinator, switch: CYLSwitch, name: str="CYLTekSwitch") -> None:
         """Initialize an CYLTekSwitch."""
-        super().__init__(switch.cyl_controller)
+        super().__init__(coordinator, switch)
         self._switch = switch
         self._switch.alias = name
         
         self._is_on = None
 
-        self._available = True
         self._need_update = True
 
-    @property
-    def available(self) -> bool:
-        return self._available
-
     @property
     def name(self) -> str:
         """Return the display name of this switch."""
@@ -142,10 +138,11 @@ class CYLTekSwitch(CYLDeviceEntity, SwitchEntity):
         # if self._is_on is False:
         if await self._async_try_command(
             f'{self.name}, {self.unique_id} Turning the switch on failed.',
-            self._switch.turn_on
+            self._switch.async_turn_on
         ):
             self._is_on = True
             self._need_update = False
+            self.async_write_ha_state()
 
 
     async def async_turn_off(self, **kwargs: Any) -> None:
@@ -157,29 +154,20 @@ class CYLTekSwitch(CYLDeviceEntity, SwitchEntity):
         # if self._is_on is True:
         if await self._async_try_command(
             f'{self.name}, {self.unique_id} Turning the switch off failed.',
-            self._switch.turn_off
+            self._switch.async_turn_off
         ):
             self._is_on = False
             self._need_update = False
+            self.async_write_ha_state()
 
 
-    async def async_update(self) -> None:
-        """Fetch new state data for this switch.
-        This is the only method that should fetch new data for Home Assistant.
-        """
+    # @override(CYLDeviceEntity)
+    def _update_from_thing(self) -> None:
         """Synchronise internal state with the actual switches state."""
 
         if self._need_update is False:
             self._need_update = True
             return
 
-        self._available = await self._async_try_command(
-                f'{self.name}, {self.unique_id} switche is unavalible !',
-                self._switch.is_available
-            )
-
-        if self._available is False:
-            return
-
         if self._is_on != self._switch.get_last_attribute('power'):
             self._is_on = self._switch.get_last_attribute('power')
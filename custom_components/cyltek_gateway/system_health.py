@@ -15,6 +15,9 @@ from homeassistant.core import HomeAssistant, callback
 
 from . import util
 from .const import DOMAIN
+from .cyltek import globalvar as gl
+from .cyltek.cylpulse import CYLPulsePlayer
+from .cyltek.cyltelnet import CYLTelnet
 
 
 @callback
@@ -27,6 +30,10 @@ def async_register(
 async def system_health_info(hass: HomeAssistant):
     integration = hass.data["integrations"][DOMAIN]
     info = {"version": f"{integration.version} ({util.source_hash(os.path.join(__file__))})"}
+    info["read_latency"] = str(CYLTelnet.READ_LATENCY.as_dict())
+    info["pulse_jitter"] = str(CYLPulsePlayer.PULSE_JITTER.as_dict())
+    info["bootstrap"] = str({MAC: controller.bootstrap_timings for MAC, controller in gl.get_controllers_map().items()})
+    info["buses"] = str({MAC: controller.bus_metrics() for MAC, controller in gl.get_controllers_map().items()})
 
     if DebugView.url:
         info["debug"] = {
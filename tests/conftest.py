@@ -0,0 +1,6 @@
+import os
+import sys
+
+## the cyltek library does not depend on Home Assistant, import it on its own
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                "custom_components", "cyltek_gateway"))
@@ -0,0 +1,59 @@
+import asyncio
+import json
+
+from cyltek.cylasynctelnet import CYLAsyncTelnet
+
+
+def frame(content: dict) -> bytes:
+    return f'#:{json.dumps(content)}:#'.encode()
+
+
+async def serve(handler):
+    server = await asyncio.start_server(handler, '127.0.0.1', 0)
+    return server, server.sockets[0].getsockname()[1]
+
+
+def test_late_response_is_not_delivered_to_the_next_request():
+    async def handler(reader, writer):
+        await reader.readuntil(b':#')   # the first request times out
+        await reader.readuntil(b':#')
+        ## the late answer of the first request carries neither target-id nor cmd
+        writer.write(frame({"code": 0, "value": "late"}))
+        writer.write(frame({"code": 0, "cmd": "read-attr", "target-id": "t:2", "attr": "a", "value": "own"}))
+        await writer.drain()
+
+    async def run():
+        server, port = await serve(handler)
+        session = CYLAsyncTelnet('127.0.0.1', port)
+        assert await session.connect()
+        ret, _ = await session.sends('#:{"cmd":"read-attr","target-id":"t:1","attr":"a"}:#', timeout=0.05)
+        assert ret is False
+        ret, out = await session.sends('#:{"cmd":"read-attr","target-id":"t:2","attr":"a"}:#', timeout=1)
+        await session.close()
+        server.close()
+        return ret, out
+
+    ret, out = asyncio.run(run())
+    assert ret is True
+    assert out["value"] == "own"
+
+
+def test_reports_of_a_timed_out_request_go_to_on_unsolicited():
+    reports = []
+
+    async def handler(reader, writer):
+        await reader.readuntil(b':#')
+        writer.write(frame({"target-id": "t:3", "attr": "on-off-state", "value": 1}))
+        await writer.drain()
+
+    async def run():
+        server, port = await serve(handler)
+        session = CYLAsyncTelnet('127.0.0.1', port, on_unsolicited=reports.append)
+        assert await session.connect()
+        ret, _ = await session.sends('#:{"cmd":"read-attr","target-id":"t:1","attr":"a"}:#', timeout=0.1)
+        await session.close()
+        server.close()
+        return ret
+
+    assert asyncio.run(run()) is False
+    assert reports == [{"target-id": "t:3", "attr": "on-off-state", "value": 1}]
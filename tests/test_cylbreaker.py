@@ -0,0 +1,80 @@
+from cyltek.cylbreaker import BreakerState, CYLCircuitBreaker
+
+
+def opened_breaker():
+    breaker = CYLCircuitBreaker(failure_threshold=1)
+    assert breaker.record(False, breaker.allow()) is True
+    return breaker
+
+
+def test_one_trial_while_half_open():
+    breaker = opened_breaker()
+    breaker.half_open()
+
+    trial = breaker.allow()
+    assert trial
+    assert breaker.allow() is None
+
+
+def test_only_the_trial_settles_the_breaker():
+    breaker = CYLCircuitBreaker(failure_threshold=1)
+    stale = breaker.allow()             # went out before the breaker opened
+    assert breaker.record(False, breaker.allow()) is True
+    breaker.half_open()
+    trial = breaker.allow()
+
+    assert breaker.record(True, stale) is False
+    assert breaker.state == BreakerState.HalfOpen
+    assert breaker.allow() is None      # the trial is still in flight
+
+    assert breaker.record(True, trial) is False
+    assert breaker.state == BreakerState.Closed
+
+
+def test_failed_trial_opens_again():
+    breaker = opened_breaker()
+    breaker.half_open()
+    assert breaker.record(False, breaker.allow()) is True
+    assert breaker.is_open
+
+
+def test_released_trial_lets_the_next_command_try():
+    breaker = opened_breaker()
+    breaker.half_open()
+    trial = breaker.allow()
+
+    breaker.release(trial)
+    assert breaker.state == BreakerState.HalfOpen
+    assert breaker.allow()
+
+
+def test_cancelled_trial_does_not_lock_the_gateway_out():
+    import asyncio
+
+    from cyltek.cylcontroller_ex import CYLControllerEx
+
+    controller = CYLControllerEx("D0:14:11:B0:03:5C", ip="127.0.0.1", bootstrap=False)
+    controller._start_recovery_probe = lambda: None
+    controller.breaker.record(False, controller.breaker.allow())
+    controller.breaker.record(False, controller.breaker.allow())
+    controller.breaker.record(False, controller.breaker.allow())
+    controller.breaker.half_open()
+
+    async def hang(*args, **kwargs):
+        await asyncio.sleep(10)
+
+    async def answer(*args, **kwargs):
+        return (True, {"code": 0})
+
+    async def run():
+        controller._async_sends = hang
+        trial = asyncio.ensure_future(controller.async_send_cmd("#9528,,status,,,,,", just_send=True))
+        await asyncio.sleep(0.01)
+        trial.cancel()
+        await asyncio.gather(trial, return_exceptions=True)
+
+        controller._async_sends = answer
+        return await controller.async_send_cmd("#9528,,status,,,,,", just_send=True)
+
+    assert asyncio.run(run()) == (True, {"code": 0})
+    assert controller.breaker.state == BreakerState.Closed
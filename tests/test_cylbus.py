@@ -0,0 +1,64 @@
+import asyncio
+import threading
+import time
+
+from cyltek.cylbus import BusPriority, CYLBusScheduler
+
+
+def test_async_waiter_is_woken_by_a_releasing_thread():
+    bus = CYLBusScheduler("test", frame_gap=0)
+    assert bus.acquire()
+
+    async def run():
+        threading.Timer(0.05, bus.release).start()
+        start_time = time.monotonic()
+        assert await bus.async_acquire(timeout=1)
+        return time.monotonic() - start_time
+
+    assert asyncio.run(run()) < 0.5
+    assert bus.busy
+
+
+def test_async_writes_go_before_polls():
+    bus = CYLBusScheduler("test", frame_gap=0)
+    order = []
+
+    async def transaction(name, priority):
+        assert await bus.async_acquire(priority, timeout=1)
+        order.append(name)
+        await asyncio.sleep(0.01)
+        bus.release()
+
+    async def run():
+        assert await bus.async_acquire()
+        tasks = [asyncio.ensure_future(transaction("poll", BusPriority.Poll)),
+                 asyncio.ensure_future(transaction("write", BusPriority.Write))]
+        await asyncio.sleep(0.01)
+        bus.release()
+        await asyncio.gather(*tasks)
+
+    asyncio.run(run())
+    assert order == ["write", "poll"]
+
+
+def test_async_acquire_times_out_and_leaves_the_queue():
+    bus = CYLBusScheduler("test", frame_gap=0)
+    assert bus.acquire()
+
+    assert asyncio.run(bus.async_acquire(timeout=0.05)) is False
+    assert bus.depth == 0
+    assert bus.timeouts == 1
+
+
+def test_cancelled_async_waiter_leaves_the_queue():
+    bus = CYLBusScheduler("test", frame_gap=0)
+    assert bus.acquire()
+
+    async def run():
+        task = asyncio.ensure_future(bus.async_acquire())
+        await asyncio.sleep(0.01)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    asyncio.run(run())
+    assert bus.depth == 0
@@ -0,0 +1,31 @@
+import json
+import os
+
+import cyltek
+from cyltek.cylclimate import CYLClimate
+from cyltek.cylcontroller_ex import CYLControllerEx
+
+DAIKIN = os.path.join(os.path.dirname(cyltek.__file__), "config", "climates", "daikin.json")
+
+
+def make_climate():
+    controller = CYLControllerEx("D0:14:11:B0:03:5C", ip="127.0.0.1", bootstrap=False)
+    with open(DAIKIN) as f:
+        config = json.load(f)
+    climate = CYLClimate(controller, 0, config, {'default': 1}, model="STANDARD")
+
+    def no_bus():
+        raise AssertionError("nothing is written")
+
+    climate._daikin_bus = no_bus
+    return climate
+
+
+def test_apply_rejects_a_value_missing_from_the_profile():
+    climate = make_climate()
+    assert climate.apply({'fan_mode': 'turbo'}) is False
+    assert climate.apply({'mode': 'cool', 'swing_mode': None}) is False
+
+
+def test_apply_rejects_an_unknown_attribute():
+    assert make_climate().apply({'humidity': 50}) is False
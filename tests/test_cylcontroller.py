@@ -0,0 +1,52 @@
+import asyncio
+
+from cyltek.cylbreaker import CYLCircuitBreaker
+from cyltek.cylcontroller_ex import CYLControllerEx
+
+
+def test_close_stops_the_recovery_probe(monkeypatch):
+    monkeypatch.setattr(CYLCircuitBreaker, "PROBE_INTERVAL", 0.01)
+    controller = CYLControllerEx("D0:14:11:B0:03:5C", ip="127.0.0.1", bootstrap=False)
+    controller._start_recovery_probe()
+    thread = controller._recovery_thread
+
+    controller.close()
+    assert not thread.is_alive()
+
+    controller._start_recovery_probe()
+    assert controller._recovery_thread is thread
+
+
+SNAPSHOT = {"config": {"server-version": "1.0"}, "capabilities": {}, "model_id": "M1"}
+
+
+def revalidate(fresh):
+    controller = CYLControllerEx.from_snapshot("D0:14:11:B0:03:5C", SNAPSHOT, ip="127.0.0.1")
+
+    async def bootstrap():
+        controller.init_ret = fresh is not None
+        if fresh is not None:
+            controller.restore(fresh)
+        return controller.init_ret
+
+    controller.async_bootstrap = bootstrap
+    return controller, asyncio.run(controller.async_revalidate())
+
+
+def test_failed_revalidation_keeps_serving_the_cache():
+    controller, changed = revalidate(None)
+    assert changed == []
+    assert controller.init_ret is True
+    assert controller.model_id == "M1"
+
+
+def test_revalidation_applies_what_changed():
+    controller, changed = revalidate({**SNAPSHOT, "model_id": "M2"})
+    assert changed == ["model_id"]
+    assert controller.model_id == "M2"
+
+
+def test_new_server_version_drops_the_cache():
+    controller, changed = revalidate({**SNAPSHOT, "config": {"server-version": "2.0"}})
+    assert set(changed) >= {"capabilities", "model_id"}
+    assert controller.snapshot()["server-version"] == "2.0"
@@ -0,0 +1,137 @@
+import asyncio
+
+import pytest
+
+from cyltek import cylcover
+from cyltek.cylcontroller_ex import CYLControllerEx
+from cyltek.cylcover import CYLCover, CYLTravelModel, CoverState
+
+CHANNELS = {'open': 1, 'close': 2, 'stop': 3, 'level': 0}
+
+
+def make_cover(config=None):
+    controller = CYLControllerEx("D0:14:11:B0:03:5C", bootstrap=False)
+    return CYLCover(controller, config or {}, CHANNELS)
+
+
+def test_restore_fills_the_seeded_state():
+    cover = make_cover()
+    assert cover.last_attributes == {'state': None}
+
+    assert cover.restore_attributes({'state': CoverState.Closed, 'position': 0}) is True
+    assert cover.get_last_attribute('state') == CoverState.Closed
+    assert cover.get_last_attribute('position') == 0
+
+
+def test_restore_keeps_what_was_read():
+    cover = make_cover()
+    cover._last_attributes['state'] = CoverState.Open
+
+    assert cover.restore_attributes({'state': CoverState.Closed}) is False
+    assert cover.get_last_attribute('state') == CoverState.Open
+
+
+def test_restore_ignores_saved_none():
+    cover = make_cover()
+    assert cover.restore_attributes({'state': None}) is False
+
+
+
+def test_shutdown_cancels_the_timed_stop():
+    cover = make_cover({"travel_time": {"open": 0.1, "close": 0.1}})
+    cover.restore_position(0)
+    stops = []
+
+    async def async_stop():
+        stops.append(True)
+        return True
+
+    cover.async_stop = async_stop
+
+    async def run():
+        cover._positioning = asyncio.ensure_future(cover._async_stop_at(50))
+        await asyncio.sleep(0)
+        cover.shutdown()
+        await asyncio.sleep(0.1)
+
+    asyncio.run(run())
+    assert stops == []
+    assert cover._positioning is None
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cylcover.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_travel_model_is_opt_in():
+    assert CYLTravelModel.from_config({}) is None
+    model = CYLTravelModel.from_config({"travel_time": {"open": 20, "close": 10}})
+    assert (model.open_time, model.close_time) == (20.0, 10.0)
+    assert model.position is None and model.state is None
+
+
+def test_travel_model_estimates_the_position(clock):
+    model = CYLTravelModel(20, 10)
+    model.restore(0)
+    model.start(1)
+    clock[0] += 5
+    assert model.position == 25
+    assert model.state == CoverState.Opening
+
+    model.stop()
+    clock[0] += 5
+    assert model.position == 25
+    model.start(-1)
+    clock[0] += 1
+    assert model.position == 15
+
+
+def test_travel_model_settles_at_the_end_stop(clock):
+    model = CYLTravelModel(20, 10)
+    model.restore(90)
+    model.start(1)
+    clock[0] += 30
+    assert model.position == 100
+    assert not model.is_moving
+    assert model.state == CoverState.Open
+
+
+def test_travel_model_starts_an_unknown_position_from_the_far_end(clock):
+    model = CYLTravelModel(20, 10)
+    model.start(-1)
+    clock[0] += 10
+    assert model.position == 0
+    assert model.state == CoverState.Closed
+
+
+def test_travel_model_time_to(clock):
+    model = CYLTravelModel(20, 10)
+    assert model.time_to(100) == (1, 20)    # from the far end
+    model.restore(50)
+    assert model.time_to(75) == (1, 5)
+    assert model.time_to(0) == (-1, 5)
+    assert model.time_to(50) == (0, 0)
+
+
+def test_travel_model_restore_stops_the_travel(clock):
+    model = CYLTravelModel(20, 10)
+    model.restore(0)
+    model.start(1)
+    model.restore(40)
+    clock[0] += 5
+    assert model.position == 40
+    assert not model.is_moving
+
+
+def test_travel_time_of_the_cover_turns_the_model_on(monkeypatch):
+    from cyltek import globalvar as gl
+
+    controller = CYLControllerEx("D0:14:11:B0:03:5C", bootstrap=False)
+    monkeypatch.setitem(gl.get_controllers_map(), controller.MAC, controller)
+
+    assert cylcover.create_cylcover(controller.MAC, "cover", CHANNELS)._travel is None
+    cover = cylcover.create_cylcover(controller.MAC, "cover", CHANNELS, travel_time={"open": 30, "close": 25})
+    assert (cover._travel.open_time, cover._travel.close_time) == (30.0, 25.0)
@@ -0,0 +1,30 @@
+import asyncio
+
+from cyltek.cylprobe import CYLProbe
+
+
+def test_cancelled_caller_does_not_cancel_the_shared_probe():
+    probe = CYLProbe("127.0.0.1", 9528)
+    probes = []
+
+    async def tcp_probe():
+        probes.append(True)
+        await asyncio.sleep(0.05)
+        return 0.001
+
+    async def icmp_probe():
+        return None
+
+    probe._async_tcp_probe = tcp_probe
+    probe._async_icmp_probe = icmp_probe
+
+    async def run():
+        first = asyncio.ensure_future(probe.async_probe())
+        second = asyncio.ensure_future(probe.async_probe())
+        await asyncio.sleep(0.01)
+        first.cancel()
+        return await second
+
+    result = asyncio.run(run())
+    assert result.tcp_rtt == 0.001
+    assert probes == [True]
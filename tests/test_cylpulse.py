@@ -0,0 +1,58 @@
+import asyncio
+
+import pytest
+
+from cyltek.cylpulse import CYLPulsePlayer, CYLPulseStep
+
+
+class FakeController(object):
+    alias = "fake"
+
+    def __init__(self):
+        self.sent = []
+
+    async def async_try_connect(self):
+        return True
+
+    async def async_send_cmd(self, command):
+        self.sent.append(command)
+        return (True, {"code": 0})
+
+
+def pulse(on, off, gap=0.02):
+    return [CYLPulseStep(command=on), CYLPulseStep(gap=gap), CYLPulseStep(command=off)]
+
+
+def test_timeline_of_a_sequence():
+    assert CYLPulsePlayer.timeline(pulse("on", "off", 0.5)) == ([(0, "on"), (0.5, "off")], 0.5)
+
+
+def test_sequences_of_one_window_play_as_one_group(monkeypatch):
+    monkeypatch.setattr(CYLPulsePlayer, "BATCH_WINDOW", 0.01)
+    controller = FakeController()
+    player = CYLPulsePlayer(controller)
+
+    async def run():
+        return await asyncio.gather(player.async_play(pulse("on 1", "off 1")),
+                                    player.async_play(pulse("on 2", "off 2")))
+
+    assert asyncio.run(run()) == [True, True]
+    assert (player.groups, player.sequences) == (1, 2)
+    ## the edges due at the same time go out back to back
+    assert controller.sent == ["on 1", "on 2", "off 1", "off 2"]
+
+
+@pytest.mark.parametrize("started", [0, 0.01])
+def test_cancelled_flush_does_not_leave_the_callers_waiting(monkeypatch, started):
+    monkeypatch.setattr(CYLPulsePlayer, "BATCH_WINDOW", 10)
+    player = CYLPulsePlayer(FakeController())
+
+    async def run():
+        play = asyncio.ensure_future(player.async_play(pulse("on", "off")))
+        await asyncio.sleep(started)
+        player._batch_task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await asyncio.wait_for(play, 1)
+        assert player._batch == [] and player._batch_task is None
+
+    asyncio.run(run())
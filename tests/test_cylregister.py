@@ -0,0 +1,94 @@
+import random
+
+import pytest
+
+from cyltek.cylregister import SIGN_MAGNITUDE, TWOS_COMPLEMENT, CYLRegisterField, CYLRegisterMap
+from cyltek.daikin_contorller import DAIKIN_REGISTER_MAPS, Daikin_modbus_handler
+
+CASES = 2000
+
+## the compiled maps against the hand written Daikin decoder and encoder they replace
+INPUT_FIELDS = {"power": "on_off", "direction": "fan_dir", "volume": "fan_vol", "mode": "op_mode",
+                "op_status": "op_status", "setpoint": "target_temp", "roomtemp": "temp"}
+
+
+def daikin_temp(rng):
+    raw = rng.randrange(0, 1 << 15)
+    return [raw & 0xFF, (raw >> 8) | (0x80 if rng.random() < 0.5 else 0)]
+
+
+def unit_registers(rng):
+    """Input registers of a unit, low byte first, with the values a unit reports."""
+    return ([rng.randrange(2), rng.randrange(8) | rng.randrange(8) << 4,
+             rng.randrange(8), rng.randrange(4) | rng.randrange(2) << 7]
+            + daikin_temp(rng) + [0, 0] + daikin_temp(rng) + [0, 0])
+
+
+def test_input_map_decodes_like_analyze_input():
+    rng = random.Random(17)
+    for _ in range(CASES):
+        register = unit_registers(rng)
+        dmh = Daikin_modbus_handler()
+        dmh.analyze_input(register)
+
+        fields = DAIKIN_REGISTER_MAPS["input"].decode_unit(register)
+        assert {name: fields[field] for name, field in INPUT_FIELDS.items()} == \
+               {name: getattr(dmh, name) for name in INPUT_FIELDS}, register
+
+
+def test_input_map_decodes_a_block_of_units():
+    rng = random.Random(18)
+    units = [unit_registers(rng) for _ in range(8)]
+    columns = DAIKIN_REGISTER_MAPS["input"].decode(sum(units, []))
+    for index, register in enumerate(units):
+        assert {name: column[index] for name, column in columns.items()} == \
+               DAIKIN_REGISTER_MAPS["input"].decode_unit(register)
+
+
+def test_holding_map_encodes_like_return_holding():
+    rng = random.Random(19)
+    for _ in range(CASES):
+        dmh = Daikin_modbus_handler()
+        dmh.power = rng.randrange(2)
+        dmh.direction = rng.randrange(8)
+        dmh.volume = rng.randrange(8)
+        dmh.mode = rng.randrange(8)
+        dmh.op_status = rng.randrange(4)
+        dmh.setpoint = rng.randrange(32, 65) / 2
+        ctrl_flag = rng.randrange(2)
+
+        values = {"power": dmh.power, "ctrl": 6 if ctrl_flag else 0, "direction": dmh.direction,
+                  "volume": dmh.volume, "mode": dmh.mode, "op_status": dmh.op_status, "setpoint": dmh.setpoint}
+        assert DAIKIN_REGISTER_MAPS["holding"].encode(values) == dmh.return_holding(ctrl_flag, dmh), values
+
+
+@pytest.mark.parametrize("value, raw", [(26.7, 0x010B), (-26.7, 0x810B), (0, 0), (-0.1, 0x8001)])
+def test_sign_magnitude_field(value, raw):
+    field = CYLRegisterField("temp", 0, scale=0.1, signed=SIGN_MAGNITUDE)
+    assert field.to_raw(value) == raw
+    assert field.from_raw(raw) == value
+
+
+@pytest.mark.parametrize("value, raw", [(5, 0x0500), (-5, 0xFB00), (127, 0x7F00), (-128, 0x8000)])
+def test_twos_complement_field(value, raw):
+    field = CYLRegisterField("offset", 0, mask=0xFF00, signed=TWOS_COMPLEMENT)
+    assert field.to_raw(value) == raw
+    assert field.from_raw(raw >> field.shift) == value
+
+
+def test_signed_fields_round_trip_through_a_map():
+    register_map = CYLRegisterMap.from_config({
+        "base_addr": 0, "unit_registers": 2,
+        "fields": {"low":  {"register": 0, "mask": "0x00FF", "signed": TWOS_COMPLEMENT},
+                   "high": {"register": 0, "mask": "0xFF00", "signed": SIGN_MAGNITUDE},
+                   "temp": {"register": 1, "scale": 0.1, "signed": SIGN_MAGNITUDE}}})
+    rng = random.Random(20)
+    for _ in range(CASES):
+        values = {"low": rng.randrange(-128, 128), "high": rng.randrange(-127, 128),
+                  "temp": rng.randrange(-3000, 3001) / 10}
+        assert register_map.decode_unit(register_map.encode(values)) == values
+
+
+def test_unknown_signedness_is_rejected():
+    with pytest.raises(ValueError):
+        CYLRegisterField("temp", 0, signed="ones-complement")
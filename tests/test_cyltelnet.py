@@ -0,0 +1,33 @@
+from cyltek.cyltelnet import CYLFrameDecoder
+
+
+def test_frames_across_feeds():
+    decoder = CYLFrameDecoder()
+    assert decoder.feed(b'#:{"code":0,') == []
+    assert decoder.feed(b'"value":1}:##:{"code":') == [{"code": 0, "value": 1}]
+    assert decoder.feed(b'1}:#') == [{"code": 1}]
+    assert decoder.pending == 0
+
+
+def test_terminator_inside_the_json():
+    decoder = CYLFrameDecoder()
+    assert decoder.feed(b'#:{"value":":#x"}:##:{"code":0}:#') == [{"value": ":#x"}, {"code": 0}]
+
+
+def test_corrupt_frame_is_dropped():
+    decoder = CYLFrameDecoder()
+    assert decoder.feed(b'#:{"code":0,"val:##:{"code":1}:#') == [{"code": 1}]
+    assert decoder.pending == 0
+
+
+def test_corrupt_frame_across_feeds_is_dropped():
+    decoder = CYLFrameDecoder()
+    assert decoder.feed(b'#:{garbled:#') == []
+    assert decoder.feed(b'#:{"code":1}:#') == [{"code": 1}]
+    assert decoder.feed(b'#:{"code":2}:#') == [{"code": 2}]
+
+
+def test_unterminated_frame_is_dropped_at_the_next_one():
+    decoder = CYLFrameDecoder()
+    assert decoder.feed(b'#:{"code":0, "va') == []
+    assert decoder.feed(b'#:{"code":1}:#') == [{"code": 1}]
@@ -0,0 +1,105 @@
+import asyncio
+
+import pytest
+
+from cyltek import util
+from cyltek.cylexception import CYLTekVerifyError
+from cyltek.daikin_contorller import Daikin, Daikin_bus, Daikin_modbus_handler, Daikin_verification
+
+UNIT = [1, 0x31, 2, 0x82, 230, 0, 0, 0, 250, 0, 0, 0]
+
+
+def fake_bus(comm):
+    sent = []
+
+    def send(command):
+        request = util.content9528_to_dict(command)
+        sent.append(request)
+        if request["start-addr"] == Daikin_bus.COMM_STATUS_ADDRESS:
+            return (True, {"code": 0, "response-register-data": comm})
+        return (True, {"code": 0, "response-register-data": UNIT * (request["number"] // 6)})
+
+    return Daikin_bus(send, "0000d01411b011e3:1", 1, unit_ids=(0, 1)), sent
+
+
+def test_units_are_read_at_once():
+    bus, sent = fake_bus([0, 0])
+    assert bus.refresh()
+    assert len(sent) == 2
+    assert bus.fields(0)["target_temp"] == 23.0
+    assert bus.unit(1).roomtemp == 25.0
+
+
+def test_unit_with_a_comm_error_is_left_out(monkeypatch):
+    ## the bits of the comm status register are Daikin_modbus_handler's business
+    monkeypatch.setattr(Daikin_modbus_handler, "check_comm_error", lambda id, register: not register[0] & (1 << id))
+    bus, _ = fake_bus([0b10, 0])
+    assert bus.refresh()
+    assert bus.fields(0) is not None
+    assert bus.fields(1) is None
+    assert bus.registers(1) is None
+
+
+def test_failed_comm_status_read_fails_the_refresh():
+    bus, _ = fake_bus([])
+    assert not bus.refresh()
+    assert bus.fields(0) is None
+
+
+def test_change_over_is_not_decided_from_a_stale_snapshot():
+    heat = list(UNIT)
+    heat[2] = 1
+    bulk = {"ok": True}
+
+    class Connection(object):
+        def sends(self, command, just_send=False, timeout=3):
+            request = util.content9528_to_dict(command)
+            if request["start-addr"] == Daikin_bus.COMM_STATUS_ADDRESS:
+                return (True, {"code": 0, "response-register-data": [0, 0]})
+            if request["number"] > 6:
+                return (True, {"code": 0, "response-register-data": UNIT * (request["number"] // 6) if bulk["ok"] else []})
+            return (True, {"code": 0, "response-register-data": heat})
+
+    daikin = Daikin("d01411b011e3", 1, Connection(), 1)
+    assert daikin._Daikin__need_change_operation(0, 1, [0, 1]) == 1   # a unit cools
+
+    bulk["ok"] = False
+    assert daikin._Daikin__need_change_operation(0, 1, [0, 1]) == 0   # read one by one, all heat
+
+
+def run_verification(reads, monkeypatch, deadline=1):
+    monkeypatch.setattr(Daikin_verification, "FIRST_DELAY", 0.01)
+    monkeypatch.setattr(Daikin_verification, "MAX_DELAY", 0.01)
+    reads = iter(reads)
+    resent = []
+
+    async def read():
+        return next(reads, None)
+
+    async def resend():
+        resent.append(True)
+
+    verification = Daikin_verification(0, {"setpoint": 24.0}, deadline=deadline)
+    return verification, asyncio.run(verification.async_run(read, resend)), resent
+
+
+def test_failed_readback_is_read_again(monkeypatch):
+    verification, ret, resent = run_verification([None, None, {"setpoint": 24.0}], monkeypatch)
+    assert ret is True
+    assert verification.attempts == 3
+    assert resent == []
+
+
+def test_readback_which_never_answers_is_not_verified(monkeypatch):
+    with pytest.raises(CYLTekVerifyError):
+        run_verification([], monkeypatch, deadline=0.1)
+
+
+def test_bus_is_readable_once_read_and_not_backing_off():
+    bus, _ = fake_bus([0, 0])
+    assert not bus.readable
+    assert bus.snapshot()
+    assert bus.readable
+
+    bus._failed_at = bus._time
+    assert not bus.readable